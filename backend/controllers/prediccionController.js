@@ -1,5 +1,6 @@
 // controllers/prediccionController.js
 import { spawn } from 'child_process';
+import readline from 'readline';
 import path from 'path';
 import { fileURLToPath } from 'url';
 import { dirname } from 'path';
@@ -7,17 +8,92 @@ import { dirname } from 'path';
 const __filename = fileURLToPath(import.meta.url);
 const __dirname = dirname(__filename);
 
-function runPythonScript(args = []) {
-  return new Promise((resolve, reject) => {
-    const scriptPath = path.join(__dirname, '..', 'scripts', 'predicciones.py');
+const scriptPath = path.join(__dirname, '..', 'scripts', 'predicciones.py');
+
+// Por defecto se mantienen procesos de Python vivos (modo --serve) en lugar de
+// lanzar uno por petición. PREDICCIONES_WORKER=false regresa al modo anterior.
+const USE_WORKER = process.env.PREDICCIONES_WORKER !== 'false';
+const WORKER_TIMEOUT_MS = parseInt(process.env.PREDICCIONES_TIMEOUT_MS || '120000', 10);
+// PREDICCIONES_METRICS=true registra en el log los tiempos y memoria por etapa de cada petición.
+const LOG_METRICS = process.env.PREDICCIONES_METRICS === 'true';
+
+function logMetrics(metrics) {
+  if (metrics) console.info(`[predicciones] metrics ${JSON.stringify(metrics)}`);
+}
 
+function toList(value) {
+  if (value === undefined) return [];
+  return Array.isArray(value) ? value : [value];
+}
+
+// Filtros de la query (?store=1&store=2&priority=Alta&limit=50) que se aplican
+// dentro del script para que sólo salgan las alertas pedidas.
+function buildFilters(query) {
+  const filters = {};
+  const stores = toList(query.store).map(Number);
+  const products = toList(query.product).map(Number);
+  const priorities = toList(query.priority);
+  if (stores.length) filters.stores = stores;
+  if (products.length) filters.products = products;
+  if (priorities.length) filters.priorities = priorities;
+  for (const key of ['limit', 'top_n', 'horizon']) {
+    if (query[key] !== undefined) filters[key] = Number(query[key]);
+  }
+  return filters;
+}
+
+function filtersToArgs(filters) {
+  const args = [];
+  for (const store of filters.stores || []) args.push('--store', String(store));
+  for (const product of filters.products || []) args.push('--product', String(product));
+  for (const priority of filters.priorities || []) args.push('--priority', priority);
+  if (filters.limit !== undefined) args.push('--limit', String(filters.limit));
+  if (filters.top_n !== undefined) args.push('--top-n', String(filters.top_n));
+  if (filters.horizon !== undefined) args.push('--horizon', String(filters.horizon));
+  return args;
+}
+
+// Escribe {"success":true,"alerts":[...]} conforme llegan las alertas, sin
+// juntar toda la respuesta en memoria.
+function createAlertStream(res) {
+  let started = false;
+
+  const start = () => {
+    if (started) return;
+    started = true;
+    res.status(200).type('application/json');
+    res.write('{"success":true,"alerts":[');
+  };
+
+  return {
+    write(record) {
+      const first = !started;
+      start();
+      res.write(first ? record : ',' + record);
+    },
+    end() {
+      start();
+      res.end(']}');
+    },
+    fail(err) {
+      if (started) {
+        res.destroy(err);
+      } else {
+        res.status(500).json({ success: false, error: err.message });
+      }
+    },
+  };
+}
+
+function streamPythonScript(args, onLine) {
+  return new Promise((resolve, reject) => {
     const pyProcess = spawn('python3', [scriptPath, ...args]);
+    const lines = readline.createInterface({ input: pyProcess.stdout });
 
-    let output = '';
     let errorOutput = '';
 
-    pyProcess.stdout.on('data', (data) => {
-      output += data.toString();
+    lines.on('line', (line) => {
+      if (line) onLine(line);
     });
 
     pyProcess.stderr.on('data', (data) => {
@@ -25,8 +101,17 @@ function runPythonScript(args = []) {
     });
 
     pyProcess.on('close', (code) => {
+      for (const errLine of errorOutput.split('\n')) {
+        if (errLine.startsWith('{"metrics"')) {
+          try {
+            logMetrics(JSON.parse(errLine).metrics);
+          } catch {
+            // línea incompleta; se ignora
+          }
+        }
+      }
       if (code === 0) {
-        resolve(output.trim());
+        resolve();
       } else {
         reject(new Error(`Python script exited with code ${code}: ${errorOutput}`));
       }
@@ -34,14 +119,144 @@ function runPythonScript(args = []) {
   });
 }
 
+// Varios workers atienden en paralelo; a cada petición le toca el que tenga
+// menos pendientes. Cada PREDICCIONES_REFRESH_MS se refrescan sus datos de uno
+// en uno, fuera de rotación, para que ninguna petición espere una extracción.
+const POOL_SIZE = Math.max(1, parseInt(process.env.PREDICCIONES_WORKERS || '2', 10));
+const REFRESH_MS = parseInt(process.env.PREDICCIONES_REFRESH_MS || '300000', 10);
+
+const workers = [];
+let nextRequestId = 1;
+let refreshTimer = null;
+
+function rejectPending(worker, err) {
+  for (const { reject, timer } of worker.pending.values()) {
+    clearTimeout(timer);
+    reject(err);
+  }
+  worker.pending.clear();
+}
+
+function removeWorker(worker) {
+  const index = workers.indexOf(worker);
+  if (index !== -1) workers.splice(index, 1);
+}
+
+// Un worker que no contestó a tiempo sigue ocupado con ese trabajo y todo lo
+// que tenga en cola esperaría detrás; se mata y el siguiente pickWorker lanza otro.
+function killWorker(worker, err) {
+  removeWorker(worker);
+  rejectPending(worker, err);
+  worker.process.kill('SIGKILL');
+}
+
+function spawnWorker() {
+  const pyProcess = spawn('python3', [scriptPath, '--serve', '--refresh-seconds', '0']);
+  const worker = { process: pyProcess, pending: new Map(), refreshing: false };
+  const lines = readline.createInterface({ input: pyProcess.stdout });
+
+  lines.on('line', (line) => {
+    let message;
+    try {
+      message = JSON.parse(line);
+    } catch {
+      console.error('Respuesta inválida del worker de predicciones:', line);
+      return;
+    }
+    const pending = worker.pending.get(message.id);
+    if (!pending) return;
+    if (message.alert !== undefined) {
+      pending.onRecord?.(message.alert);
+      return;
+    }
+    worker.pending.delete(message.id);
+    clearTimeout(pending.timer);
+    pending.resolve(message);
+  });
+
+  pyProcess.stderr.on('data', (data) => {
+    console.error(`[predicciones ${pyProcess.pid}] ${data.toString().trimEnd()}`);
+  });
+
+  pyProcess.stdin.on('error', (err) => {
+    console.error('Error escribiendo al worker de predicciones:', err);
+  });
+
+  pyProcess.on('close', (code) => {
+    removeWorker(worker);
+    rejectPending(worker, new Error(`Prediction worker exited with code ${code}`));
+  });
+
+  workers.push(worker);
+  // Carga los datos y el modelo antes de recibir peticiones.
+  refreshWorker(worker);
+  if (!refreshTimer && REFRESH_MS > 0) {
+    refreshTimer = setInterval(refreshAll, REFRESH_MS);
+    refreshTimer.unref();
+  }
+  return worker;
+}
+
+function pickWorker() {
+  while (workers.length < POOL_SIZE) spawnWorker();
+  const ready = workers.filter((worker) => !worker.refreshing);
+  return (ready.length ? ready : workers).reduce((best, worker) =>
+    worker.pending.size < best.pending.size ? worker : best);
+}
+
+function sendToWorker(worker, payload, onRecord) {
+  return new Promise((resolve, reject) => {
+    const id = nextRequestId++;
+    const timer = setTimeout(() => {
+      killWorker(worker, new Error(`Prediction worker timed out after ${WORKER_TIMEOUT_MS} ms`));
+    }, WORKER_TIMEOUT_MS);
+
+    worker.pending.set(id, { resolve, reject, timer, onRecord });
+    worker.process.stdin.write(JSON.stringify({ id, ...payload }) + '\n');
+  });
+}
+
+async function refreshWorker(worker) {
+  worker.refreshing = true;
+  try {
+    const response = await sendToWorker(worker, { op: 'refresh' });
+    if (!response.success) throw new Error(response.error);
+  } catch (err) {
+    console.error('Error refrescando el worker de predicciones:', err.message);
+  } finally {
+    worker.refreshing = false;
+  }
+}
+
+async function refreshAll() {
+  for (const worker of [...workers]) {
+    if (workers.includes(worker)) await refreshWorker(worker);
+  }
+}
+
+function requestWorker(payload, onRecord) {
+  return sendToWorker(pickWorker(), payload, onRecord);
+}
+
 export async function controllerFunction(req, res) {
+  const filters = buildFilters(req.query);
+  const stream = createAlertStream(res);
   try {
-    const result = await runPythonScript();
-    const parsedResult = JSON.parse(result);
-    res.status(200).json(parsedResult); 
+    if (USE_WORKER) {
+      const response = await requestWorker(
+        { op: 'alerts', stream: true, metrics: LOG_METRICS, ...filters },
+        (alert) => stream.write(JSON.stringify(alert))
+      );
+      logMetrics(response.metrics);
+      if (!response.success) throw new Error(response.error);
+    } else {
+      const args = ['--format', 'ndjson', ...filtersToArgs(filters)];
+      if (LOG_METRICS) args.push('--metrics');
+      await streamPythonScript(args, (line) => stream.write(line));
+    }
+    stream.end();
   } catch (err) {
     console.error("Error ejecutando script:", err);
-    res.status(500).json({ success: false, error: err.message });
+    stream.fail(err);
   }
 }
-
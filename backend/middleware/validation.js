@@ -1,6 +1,6 @@
 // middleware/validation.js
 
-import { body } from "express-validator";
+import { body, query } from "express-validator";
 
 export const validateRegister = [
     body("name").notEmpty().withMessage("El nombre es obligatorio"),
@@ -16,3 +16,12 @@ export const validateLogin = [
     body("email").isEmail().withMessage("Debe ser un correo válido"),
     body("password").notEmpty().withMessage("La contraseña es obligatoria"),
 ];
+
+export const validatePrediccionesQuery = [
+    query("store").optional().isInt({ min: 1 }).withMessage("store debe ser un ID de tienda válido"),
+    query("product").optional().isInt({ min: 1 }).withMessage("product debe ser un ID de producto válido"),
+    query("priority").optional().isIn(["Alta", "Media", "Baja"]).withMessage("priority debe ser Alta, Media o Baja"),
+    query("limit").optional().isInt({ min: 1 }).withMessage("limit debe ser un entero positivo"),
+    query("top_n").optional().isInt({ min: 1 }).withMessage("top_n debe ser un entero positivo"),
+    query("horizon").optional().isInt({ min: 1, max: 365 }).withMessage("horizon debe estar entre 1 y 365 días"),
+];
@@ -3,9 +3,11 @@ import express from 'express';
 
 import { verifyToken, verifyRoles } from '../middleware/authMiddleware.js';
 import { controllerFunction } from '../controllers/prediccionController.js';
+import { validatePrediccionesQuery } from '../middleware/validation.js';
+import { handleValidation } from '../middleware/handleValidation.js';
 
 const router = express.Router();
 
-router.get('/predicciones',verifyToken, verifyRoles("admin","owner","manager","warehouse_manager"),  controllerFunction);
+router.get('/predicciones',verifyToken, verifyRoles("admin","owner","manager","warehouse_manager"), validatePrediccionesQuery, handleValidation, controllerFunction);
 
 export default router;
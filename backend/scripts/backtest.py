@@ -0,0 +1,249 @@
+"""Rolling-origin backtest of the demand models.
+
+Each fold trains on the history before its origin and forecasts the next
+``--horizon`` days for every product x store pair, like predicciones.py
+does, zeros included, scored against the quantity sold per product, store
+and day. Origins step back ``--step`` days from the end of the history, so
+no fold sees the days it is scored on.
+
+Candidates:
+    linear          the current model: predicciones.train_model() on the sale
+                    item rows (daily rows with --daily), as predicciones.py trains it
+    linear_demand   LinearRegression on the daily totals' calendar features plus
+                    the feature store's lag/rolling features
+    forest          RandomForestRegressor on the daily totals' calendar features
+    seasonal_naive  quantity on the same weekday of the last week before the origin
+    moving_average  mean daily quantity over the 28 days before the origin
+
+Every (fold, candidate) pair runs on a process pool. Per-fold accuracy and
+fit/predict timings are written as JSON, plus a summary per candidate.
+
+    python3 backtest.py --synthetic 100x5x365 --folds 6 --output backtest.json
+    python3 backtest.py --sqlite local.db --candidates linear seasonal_naive
+    python3 backtest.py --cache-dir cache/ --daily
+"""
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import contextlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+import predicciones
+from bench_predicciones import environment, parse_scale
+from feature_store import DEMAND_FEATURES, attach, build_features, daily_totals, demand_matrix, origin_features
+from sales_cache import SalesCache
+from segmented_model import make_estimator
+from synthetic_data import generate_tables, write_sqlite
+
+CANDIDATES = ['linear', 'linear_demand', 'forest', 'seasonal_naive', 'moving_average']
+KEYS = ['PRODUCTID', 'STOREID', 'SALEDAY']
+
+_daily = None
+_sales = None
+
+
+def load_sales(args: argparse.Namespace) -> pd.DataFrame:
+    """The rows predicciones.py trains on from the chosen source: one per sale item,
+    or per product, store and day with ``--daily``."""
+    if args.cache_dir:
+        sales, _ = SalesCache(args.cache_dir, 'sales_daily' if args.daily else 'sales').load()
+        if sales is None:
+            raise SystemExit(f"No usable sales cache in {args.cache_dir}")
+        return sales
+    if args.synthetic:
+        products, stores, days = args.synthetic
+        with tempfile.TemporaryDirectory(prefix='wusap-backtest-') as workdir:
+            path = os.path.join(workdir, 'synthetic.db')
+            write_sqlite(path, generate_tables(products, stores, days, seed=args.seed))
+            return _query_sales({'sqlite': path, 'schema': 'WUSAP'}, args.daily)
+    db_config = predicciones.load_env()
+    if args.sqlite:
+        db_config['sqlite'] = args.sqlite
+    return _query_sales(db_config, args.daily)
+
+
+def _query_sales(db_config: dict, daily: bool) -> pd.DataFrame:
+    conn = predicciones.open_connection(db_config)
+    try:
+        schema = db_config['schema'] or 'WUSAP'
+        return predicciones.get_daily_sales(conn, schema) if daily else predicciones.get_sales_data(conn, schema)
+    finally:
+        conn.close()
+
+
+def make_origins(daily: pd.DataFrame, folds: int, horizon: int, step: int) -> list:
+    """Fold origins, oldest first; the last fold's horizon ends on the last sale day."""
+    last = daily['SALEDAY'].max()
+    first = daily['SALEDAY'].min()
+    origins = [last - pd.Timedelta(days=horizon - 1 + step * i) for i in range(folds)]
+    return sorted(o for o in origins if o > first)
+
+
+def _init(daily: pd.DataFrame, sales: Optional[pd.DataFrame] = None) -> None:
+    global _daily, _sales
+    _daily = daily
+    _sales = sales
+
+
+def _calendar(df: pd.DataFrame) -> pd.DataFrame:
+    return predicciones.preprocess_sales_data(df.rename(columns={'QUANTITY': 'QUANTITY_SOLD'}))
+
+
+def _fit_predict(candidate: str, train: pd.DataFrame, grid: pd.DataFrame, origin: pd.Timestamp,
+                 train_sales: Optional[pd.DataFrame] = None):
+    """Return ``(prediction, fit_seconds, predict_seconds)`` for the grid rows."""
+    started = time.perf_counter()
+    if candidate == 'seasonal_naive':
+        # Mismo día de la semana en la última semana antes del origen.
+        weeks_back = (grid['SALEDAY'] - origin).dt.days // 7 + 1
+        reference = grid[KEYS[:2]].assign(SALEDAY=grid['SALEDAY'] - pd.to_timedelta(7 * weeks_back, unit='D'))
+        prediction = reference.merge(train[KEYS + ['QUANTITY']], on=KEYS, how='left')['QUANTITY'].fillna(0)
+        return prediction.to_numpy(), 0.0, time.perf_counter() - started
+    if candidate == 'moving_average':
+        recent = train[train['SALEDAY'] >= origin - pd.Timedelta(days=28)]
+        means = recent.groupby(KEYS[:2])['QUANTITY'].sum() / 28
+        prediction = grid[KEYS[:2]].merge(means.rename('MEAN').reset_index(), on=KEYS[:2], how='left')['MEAN']
+        return prediction.fillna(0).to_numpy(), 0.0, time.perf_counter() - started
+
+    features = predicciones.FEATURE_COLUMNS
+    if candidate == 'linear':
+        # El modelo actual tal cual; sus métricas de retención no ensucian el log de folds.
+        with contextlib.redirect_stderr(io.StringIO()):
+            model = predicciones.train_model(predicciones.preprocess_sales_data(train_sales.copy()))
+    else:
+        rows = _calendar(train)
+        if candidate == 'linear_demand':
+            features = features + DEMAND_FEATURES
+            rows = attach(rows, build_features(train))
+        model = make_estimator('forest' if candidate == 'forest' else 'linear')
+        model.fit(rows[features], np.log1p(rows['QUANTITY_SOLD']))
+    fit_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    prediction = np.expm1(model.predict(grid[features]))
+    return prediction, fit_seconds, time.perf_counter() - started
+
+
+def run_fold(fold: int, origin: pd.Timestamp, candidate: str, horizon: int,
+             train_days: Optional[int] = None) -> dict:
+    """Train ``candidate`` on the days before ``origin`` and score the next ``horizon`` days."""
+    daily = _daily
+    start = origin - pd.Timedelta(days=train_days) if train_days else daily['SALEDAY'].min()
+    train = daily[(daily['SALEDAY'] >= start) & (daily['SALEDAY'] < origin)]
+    train_sales = None
+    if candidate == 'linear':
+        train_sales = _sales[(_sales['SALEDAY'] >= start) & (_sales['SALEDAY'] < origin)]
+    product_ids, store_ids = predicciones.forecast_ids(train)
+    demand = None
+    if candidate == 'linear_demand':
+        demand = demand_matrix(origin_features(build_features(train)), product_ids, store_ids)
+    grid = predicciones.build_forecast_grid(product_ids, store_ids, origin, horizon, demand=demand)
+    grid['SALEDAY'] = np.repeat(pd.date_range(origin, periods=horizon, freq='D'),
+                                len(product_ids) * len(store_ids))
+    actual = (grid[KEYS].merge(daily[KEYS + ['QUANTITY']], on=KEYS, how='left')['QUANTITY']
+              .fillna(0).to_numpy())
+
+    prediction, fit_seconds, predict_seconds = _fit_predict(candidate, train, grid, origin, train_sales)
+    error = prediction - actual
+    return {
+        'fold': fold,
+        'origin': str(origin.date()),
+        'candidate': candidate,
+        'train_rows': len(train),
+        'test_rows': len(grid),
+        'mae': round(float(np.abs(error).mean()), 4),
+        'rmse': round(float(np.sqrt((error ** 2).mean())), 4),
+        'wape': round(float(np.abs(error).sum() / max(actual.sum(), 1e-9)), 4),
+        'bias': round(float(error.mean()), 4),
+        'fit_seconds': round(fit_seconds, 4),
+        'predict_seconds': round(predict_seconds, 4)
+    }
+
+
+def summarize(results: list) -> dict:
+    frame = pd.DataFrame(results)
+    summary = frame.groupby('candidate').agg(
+        folds=('fold', 'count'),
+        mae=('mae', 'mean'),
+        rmse=('rmse', 'mean'),
+        wape=('wape', 'mean'),
+        bias=('bias', 'mean'),
+        fit_seconds=('fit_seconds', 'sum'),
+        predict_seconds=('predict_seconds', 'sum')
+    ).round(4).sort_values('wape')
+    return summary.to_dict(orient='index')
+
+
+def backtest(sales: pd.DataFrame, candidates: list, folds: int = 4, horizon: int = 7, step: int = 7,
+             train_days: Optional[int] = None, n_jobs: Optional[int] = None) -> list:
+    """Results of every (fold, candidate), ordered by fold; ``sales`` as from load_sales()."""
+    daily = daily_totals(sales)
+    origins = make_origins(daily, folds, horizon, step)
+    tasks = [(fold, origin, candidate) for fold, origin in enumerate(origins) for candidate in candidates]
+    # Los bosques primero: son las tareas largas y así no quedan solas al final.
+    tasks.sort(key=lambda task: task[2] != 'forest')
+    workers = max(1, min(n_jobs or os.cpu_count() or 1, len(tasks)))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init, initargs=(daily, sales if 'linear' in candidates else None)) as pool:
+        futures = [pool.submit(run_fold, fold, origin, candidate, horizon, train_days)
+                   for fold, origin, candidate in tasks]
+        results = []
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            print(f"  fold {result['fold']} {result['origin']} {result['candidate']:<15} "
+                  f"MAE={result['mae']:.3f} WAPE={result['wape']:.3f} "
+                  f"fit={result['fit_seconds']:.3f}s predict={result['predict_seconds']:.3f}s", file=sys.stderr)
+    return sorted(results, key=lambda r: (r['fold'], candidates.index(r['candidate'])))
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Backtesting con origen móvil de los modelos de demanda.")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--sqlite', default=os.getenv("PREDICCIONES_SQLITE"),
+                        help="SQLite stand-in database (default: HANA from .env).")
+    source.add_argument('--cache-dir', help="Read the sales from a predicciones.py Parquet cache.")
+    source.add_argument('--synthetic', type=parse_scale, help="Generate PRODUCTSxSTORESxDAYS of synthetic sales.")
+    parser.add_argument('--daily', action='store_true',
+                        help="Train the linear candidate on daily totals, like predicciones.py --daily "
+                             "(with --cache-dir: read the daily sales cache).")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--candidates', nargs='+', choices=CANDIDATES, default=CANDIDATES)
+    parser.add_argument('--folds', type=int, default=4)
+    parser.add_argument('--horizon', type=int, default=7, help="Days forecast from each origin.")
+    parser.add_argument('--step', type=int, default=7, help="Days between consecutive origins.")
+    parser.add_argument('--train-days', type=int, help="Only train on this many days before each origin.")
+    parser.add_argument('--n-jobs', type=int, help="Worker processes (default: all cores).")
+    parser.add_argument('--output', help="Write the results JSON here instead of stdout.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    started = time.perf_counter()
+    sales = load_sales(args)
+    print(f"Backtesting {len(args.candidates)} candidates on {len(sales)} sales rows.", file=sys.stderr)
+    results = backtest(sales, args.candidates, args.folds, args.horizon, args.step, args.train_days, args.n_jobs)
+    report = {
+        'environment': environment(),
+        'config': {k: getattr(args, k) for k in ('candidates', 'folds', 'horizon', 'step', 'train_days', 'n_jobs')},
+        'wall_seconds': round(time.perf_counter() - started, 4),
+        'summary': summarize(results),
+        'folds': results
+    }
+    text = json.dumps(report, indent=2, default=str) + "\n"
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    else:
+        sys.stdout.write(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""Offline benchmark of the prediction pipeline.
+
+For each scale (products x stores x days) a synthetic database is written to
+the SQLite stand-in and every stage of predicciones.py is timed (best of
+``--repeat`` runs) and then run once more under tracemalloc for its peak
+memory. Results are written as sorted, indented JSON so two runs can be
+diffed, and ``--compare`` flags stages that got slower or hungrier than a
+baseline file.
+
+    python3 bench_predicciones.py --scales 20x3x60 200x5x180 --output bench.json
+    python3 bench_predicciones.py --compare bench.json
+"""
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import tracemalloc
+from contextlib import redirect_stderr
+
+import numpy as np
+import pandas as pd
+import sklearn
+
+import predicciones
+import standin_db
+from feature_store import FeatureStore
+from synthetic_data import generate_tables, write_sqlite
+
+DEFAULT_SCALES = ['20x3x60', '100x5x180', '500x10x365']
+
+
+def parse_scale(text: str):
+    try:
+        products, stores, days = (int(n) for n in text.lower().split('x'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Scale must be PRODUCTSxSTORESxDAYS, got {text!r}")
+    return products, stores, days
+
+
+def measure(fn, repeat: int = 3, memory: bool = True):
+    """Run ``fn`` and return ``(result, stats)`` with its best wall time and peak traced memory."""
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - started)
+    stats = {
+        'seconds': round(min(times), 4),
+        'median_seconds': round(float(np.median(times)), 4)
+    }
+    if memory:
+        tracemalloc.start()
+        try:
+            fn()
+            stats['peak_mb'] = round(tracemalloc.get_traced_memory()[1] / 2 ** 20, 2)
+        finally:
+            tracemalloc.stop()
+    if hasattr(result, '__len__'):
+        stats['rows'] = len(result)
+    return result, stats
+
+
+def bench_scale(products: int, stores: int, days: int, workdir: str, repeat: int = 3,
+                memory: bool = True, seed: int = 0) -> dict:
+    tables = generate_tables(products, stores, days, seed=seed)
+    path = os.path.join(workdir, f'bench-{products}x{stores}x{days}.db')
+    write_sqlite(path, tables)
+    conn = standin_db.connect(path)
+    pool = predicciones.get_connection_pool({'sqlite': path})
+    stages = {}
+
+    def run(name, fn):
+        # Silence the pipeline's own stderr diagnostics (NaN counts, MAE/R²).
+        with redirect_stderr(io.StringIO()):
+            result, stages[name] = measure(fn, repeat, memory)
+        print(f"  {name:<24} {stages[name]['seconds']:>9.4f}s"
+              + (f" {stages[name]['peak_mb']:>9.2f} MB" if memory else ''), file=sys.stderr)
+        return result
+
+    try:
+        raw = run('get_sales_data', lambda: predicciones.get_sales_data(conn, 'WUSAP'))
+        run('get_sales_data_compact', lambda: predicciones.get_sales_data(conn, 'WUSAP', compact=True))
+        inv_df = run('get_inventory', lambda: predicciones.get_inventory(conn))
+        products_df = run('get_product_names', lambda: predicciones.get_product_names(conn))
+        stores_df = run('get_store_names', lambda: predicciones.get_store_names(conn))
+        run('load_frames', lambda: predicciones.load_frames(pool, 'WUSAP'))
+        sales_df = run('preprocess', lambda: predicciones.preprocess_sales_data(raw.copy()))
+        model = run('train_model', lambda: predicciones.train_model(sales_df))
+        run('demand_features', lambda: FeatureStore().update(sales_df))
+        future_df = run('predict_next_7_days', lambda: predicciones.predict_next_7_days(model, sales_df))
+        alerts = run('generate_alerts',
+                     lambda: predicciones.generate_alerts(future_df, inv_df, products_df, stores_df))
+        run('serialize', lambda: json.dumps(alerts.to_dict(orient='records'), default=str))
+    finally:
+        conn.close()
+        pool.close()
+        os.remove(path)
+
+    return {
+        'tables': {name: len(df) for name, df in tables.items()},
+        'stages': stages,
+        'total_seconds': round(sum(s['seconds'] for s in stages.values()), 4)
+    }
+
+
+def environment() -> dict:
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'sklearn': sklearn.__version__,
+        'machine': platform.machine(),
+        'cpus': os.cpu_count()
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float = 0.25, min_seconds: float = 0.01) -> list:
+    """Stages slower (or with a higher peak) than ``baseline`` by more than ``tolerance``."""
+    regressions = []
+    for scale, current in results['scales'].items():
+        previous = baseline.get('scales', {}).get(scale)
+        if previous is None:
+            continue
+        for stage, stats in current['stages'].items():
+            before = previous['stages'].get(stage)
+            if before is None:
+                continue
+            for metric, floor in (('seconds', min_seconds), ('peak_mb', 1.0)):
+                if metric not in stats or metric not in before or before[metric] < floor:
+                    continue
+                ratio = stats[metric] / before[metric]
+                if ratio > 1 + tolerance:
+                    regressions.append(f"{scale} {stage} {metric}: {before[metric]} -> {stats[metric]} "
+                                       f"({ratio:.2f}x)")
+    return regressions
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark de las etapas de predicciones.py con datos sintéticos.")
+    parser.add_argument('--scales', nargs='+', type=parse_scale, default=[parse_scale(s) for s in DEFAULT_SCALES],
+                        help="PRODUCTSxSTORESxDAYS scales to run.")
+    parser.add_argument('--repeat', type=int, default=3, help="Timed runs per stage; the best one is kept.")
+    parser.add_argument('--no-memory', action='store_true', help="Skip the tracemalloc run of each stage.")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="Write the results JSON here instead of stdout.")
+    parser.add_argument('--compare', help="Baseline results JSON; exit 1 on regressions.")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="Allowed slowdown / memory growth against the baseline (0.25 = 25%%).")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = {'environment': environment(), 'repeat': args.repeat, 'scales': {}}
+    with tempfile.TemporaryDirectory(prefix='wusap-bench-') as workdir:
+        for products, stores, days in args.scales:
+            scale = f'{products}x{stores}x{days}'
+            print(f"Scale {scale}:", file=sys.stderr)
+            results['scales'][scale] = bench_scale(products, stores, days, workdir, args.repeat,
+                                                   not args.no_memory, args.seed)
+
+    text = json.dumps(results, indent=2, sort_keys=True) + "\n"
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    else:
+        sys.stdout.write(text)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+        print("No regressions against the baseline.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""Start-up budget for a spawned predicciones.py run.
+
+The Node controller can spawn one process per request, so the time from
+process start to the first byte of output is paid on every call. This
+script spawns the inference path (an existing linear model, SQLite stand-in)
+``--runs`` times. It reports that time, the wall time to exit and the import
+time of the module, and checks that no training-only module (sklearn, SciPy,
+joblib, hdbcli) gets imported. It exits 1 when the median time to first
+output exceeds ``--budget-ms`` or the import check fails.
+
+    python3 bench_startup.py
+    python3 bench_startup.py --budget-ms 400 --runs 10 --output startup.json
+"""
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+
+import numpy as np
+
+from bench_predicciones import environment
+from synthetic_data import generate_tables, write_sqlite
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SCRIPT = os.path.join(HERE, 'predicciones.py')
+STARTUP_BUDGET_MS = 600
+TRAINING_ONLY_MODULES = ('sklearn', 'scipy', 'joblib', 'hdbcli', 'segmented_model')
+
+# Corre main() y reporta en stderr qué módulos de entrenamiento quedaron cargados.
+IMPORT_CHECK = """
+import sys, json
+sys.path.insert(0, {here!r})
+import predicciones
+try:
+    predicciones.main(sys.argv[1:])
+finally:
+    loaded = sorted({{m.split('.')[0] for m in sys.modules}} & set({modules!r}))
+    sys.stderr.write('IMPORTS ' + json.dumps(loaded) + '\\n')
+"""
+
+
+def child_env() -> dict:
+    # Sin variables PREDICCIONES_* del entorno: la corrida debe ser la misma en cualquier máquina.
+    return {k: v for k, v in os.environ.items() if not k.startswith('PREDICCIONES_')}
+
+
+def spawn(args: list) -> dict:
+    """Run predicciones.py once; return ms to the first stdout byte and to exit."""
+    started = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, SCRIPT] + args, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                            env=child_env(), cwd=HERE)
+    first = proc.stdout.read(1)
+    first_ms = (time.perf_counter() - started) * 1000
+    out, err = proc.communicate()
+    total_ms = (time.perf_counter() - started) * 1000
+    if proc.returncode != 0 or not first:
+        raise RuntimeError(f"predicciones.py failed ({proc.returncode}): {err.decode(errors='replace')[-500:]}")
+    return {'first_output_ms': round(first_ms, 1), 'total_ms': round(total_ms, 1)}
+
+
+def import_ms() -> float:
+    """Cumulative import time of the predicciones module, from -X importtime."""
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import predicciones'],
+                          capture_output=True, text=True, env=child_env(), cwd=HERE, check=True)
+    match = re.search(r'\|\s*(\d+)\s*\|\s*predicciones\s*$', proc.stderr, re.MULTILINE)
+    return round(int(match.group(1)) / 1000, 1) if match else None
+
+
+def loaded_training_modules(args: list) -> list:
+    code = IMPORT_CHECK.format(here=HERE, modules=TRAINING_ONLY_MODULES)
+    proc = subprocess.run([sys.executable, '-c', code] + args, capture_output=True, text=True,
+                          env=child_env(), cwd=HERE)
+    match = re.search(r'^IMPORTS (.*)$', proc.stderr, re.MULTILINE)
+    if proc.returncode != 0 or not match:
+        raise RuntimeError(f"Import check failed ({proc.returncode}): {proc.stderr[-500:]}")
+    return json.loads(match.group(1))
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Presupuesto de arranque de predicciones.py (ruta de inferencia).")
+    parser.add_argument('--budget-ms', type=float,
+                        default=float(os.getenv("PREDICCIONES_STARTUP_BUDGET_MS", STARTUP_BUDGET_MS)),
+                        help="Maximum median time from process start to first output.")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--sqlite', help="Existing stand-in database (default: a small synthetic one).")
+    parser.add_argument('--model-path', help="Existing model (default: trained once on the database).")
+    parser.add_argument('--no-import-check', action='store_true',
+                        help="Skip the training-only import check (e.g. for non-linear models).")
+    parser.add_argument('--output', help="Write the results JSON here instead of stdout.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    with tempfile.TemporaryDirectory(prefix='wusap-startup-') as workdir:
+        db_path = args.sqlite
+        if db_path is None:
+            db_path = os.path.join(workdir, 'startup.db')
+            write_sqlite(db_path, generate_tables(20, 3, 60))
+        model_path = args.model_path or os.path.join(workdir, 'model.joblib')
+        run_args = ['--sqlite', db_path, '--model-path', model_path, '--no-result-cache', '--format', 'ndjson']
+        if not os.path.exists(model_path):
+            spawn(run_args)  # entrena y guarda el modelo; no cuenta para el presupuesto
+
+        runs = [spawn(run_args) for _ in range(args.runs)]
+        loaded = [] if args.no_import_check else loaded_training_modules(run_args)
+        first_ms = float(np.median([r['first_output_ms'] for r in runs]))
+        results = {
+            'environment': environment(),
+            'budget_ms': args.budget_ms,
+            'median_first_output_ms': round(first_ms, 1),
+            'median_total_ms': round(float(np.median([r['total_ms'] for r in runs])), 1),
+            'import_ms': import_ms(),
+            'training_modules_loaded': loaded,
+            'runs': runs
+        }
+
+    text = json.dumps(results, indent=2) + "\n"
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    else:
+        sys.stdout.write(text)
+
+    failures = []
+    if first_ms > args.budget_ms:
+        failures.append(f"median time to first output {first_ms:.0f} ms exceeds the {args.budget_ms:.0f} ms budget")
+    if loaded:
+        failures.append(f"inference path imported training-only modules: {', '.join(loaded)}")
+    for failure in failures:
+        print(f"FAIL {failure}", file=sys.stderr)
+    if failures:
+        sys.exit(1)
+    print(f"Start-up within budget: {first_ms:.0f} ms <= {args.budget_ms:.0f} ms.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Small pool of reusable database connections plus a concurrent extraction helper.
+
+Connections are opened lazily, up to ``size``, and handed back to the pool
+after use, so a long-running process (the ``--serve`` worker) pays the HANA
+login once per connection instead of once per request.
+"""
+import queue
+import threading
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+
+
+class ConnectionPool:
+    def __init__(self, factory: Callable[[], object], size: int = 4, timeout: float = 30.0):
+        self.factory = factory
+        self.size = max(1, size)
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._opened = 0
+        self._closed = False
+
+    def _acquire(self, timeout: float):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Connection pool is closed")
+            create = self._opened < self.size
+            if create:
+                self._opened += 1
+        if create:
+            try:
+                return self.factory()
+            except BaseException:
+                with self._lock:
+                    self._opened -= 1
+                raise
+        try:
+            return self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError(f"No database connection available after {timeout}s "
+                               f"({self.size} in use)") from None
+
+    def _discard(self, conn) -> None:
+        with self._lock:
+            self._opened -= 1
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None):
+        """Borrow a connection; it is closed instead of returned if the block raises."""
+        conn = self._acquire(self.timeout if timeout is None else timeout)
+        try:
+            yield conn
+        except BaseException:
+            self._discard(conn)
+            raise
+        if self._closed:
+            self._discard(conn)
+        else:
+            self._idle.put(conn)
+
+    def close(self) -> None:
+        self._closed = True
+        while True:
+            try:
+                self._discard(self._idle.get_nowait())
+            except queue.Empty:
+                break
+
+
+def extract_concurrently(pool: ConnectionPool, jobs: Dict[str, Callable], timeout: Optional[float] = None) -> dict:
+    """Run ``jobs[name](conn)`` in parallel, each on a pooled connection.
+
+    Returns the results keyed by name. The first failure cancels the jobs that
+    have not started and is re-raised; ``timeout`` bounds the whole extraction.
+    """
+    def run(job):
+        with pool.connection() as conn:
+            return job(conn)
+
+    executor = ThreadPoolExecutor(max_workers=min(pool.size, len(jobs)) or 1, thread_name_prefix='extract')
+    try:
+        futures = {executor.submit(run, job): name for name, job in jobs.items()}
+        done, pending = wait(futures, timeout=timeout, return_when=FIRST_EXCEPTION)
+        for future in done:
+            if future.exception() is not None:
+                raise future.exception()
+        if pending:
+            names = ', '.join(sorted(futures[f] for f in pending))
+            raise TimeoutError(f"Extraction timed out after {timeout}s waiting for: {names}")
+        return {futures[f]: f.result() for f in futures}
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,179 @@
+"""Recent-demand features per (product, store) daily series.
+
+The store keeps one dense row per pair and day, from the pair's first sale
+to the day after the last sale (the forecast origin), with the day's
+quantity and features computed only from earlier days:
+
+    lag_1, lag_7    quantity 1 and 7 days before
+    mean_7, mean_28 mean daily quantity over the previous 7 / 28 days
+    trend           mean_7 - mean_28
+
+Features are on the log1p scale the model predicts in, so a linear model
+can use them directly.
+
+Windows are computed with per-pair cumulative sums over flat NumPy arrays.
+The frame is persisted through SalesCache, and an update only aggregates
+and recomputes the days from the last stored sale day on, plus a 28-day
+tail of stored history. A change to any earlier day (deleted or
+back-filled sales) rebuilds it.
+"""
+import sys
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from sales_cache import SalesCache
+
+KEYS = ['PRODUCTID', 'STOREID']
+DEMAND_FEATURES = ['lag_1', 'lag_7', 'mean_7', 'mean_28', 'trend']
+WINDOW_DAYS = 28
+
+
+def daily_totals(sales_df: pd.DataFrame) -> pd.DataFrame:
+    """Quantity sold per product, store and day, from item-level or daily sales."""
+    daily = (sales_df.groupby(KEYS + ['SALEDAY'], observed=True)['QUANTITY_SOLD'].sum()
+             .reset_index().rename(columns={'QUANTITY_SOLD': 'QUANTITY'}))
+    daily[KEYS] = daily[KEYS].astype(np.int64)
+    daily['SALEDAY'] = pd.to_datetime(daily['SALEDAY'])
+    return daily
+
+
+def densify(daily: pd.DataFrame, first_days: pd.DataFrame, end: pd.Timestamp) -> pd.DataFrame:
+    """One row per pair and day from the pair's FIRST day to ``end``, sorted by pair and
+    day, with the quantities of ``daily`` (0 on days without sales)."""
+    lengths = np.maximum((end - first_days['FIRST']).dt.days.to_numpy() + 1, 0)
+    total = int(lengths.sum())
+    starts = np.repeat(np.cumsum(lengths) - lengths, lengths)
+    offsets = np.arange(total) - starts
+    dense = pd.DataFrame({
+        'PRODUCTID': np.repeat(first_days['PRODUCTID'].to_numpy(np.int64), lengths),
+        'STOREID': np.repeat(first_days['STOREID'].to_numpy(np.int64), lengths),
+        'SALEDAY': np.repeat(first_days['FIRST'].to_numpy('datetime64[ns]'), lengths)
+        + offsets.astype('timedelta64[D]')
+    })
+    dense = dense.merge(daily, on=KEYS + ['SALEDAY'], how='left', sort=False)
+    dense['QUANTITY'] = dense['QUANTITY'].fillna(0).astype(np.float64)
+    return dense
+
+
+def compute_features(dense: pd.DataFrame) -> pd.DataFrame:
+    """Add DEMAND_FEATURES to a dense frame sorted by pair and day."""
+    q = dense['QUANTITY'].to_numpy(np.float64)
+    n = len(q)
+    idx = np.arange(n)
+    products = dense['PRODUCTID'].to_numpy()
+    stores = dense['STOREID'].to_numpy()
+    new_pair = np.r_[True, (products[1:] != products[:-1]) | (stores[1:] != stores[:-1])] if n else np.zeros(0, bool)
+    start = np.maximum.accumulate(np.where(new_pair, idx, 0)) if n else idx
+    cumulative = np.r_[0.0, np.cumsum(q)]
+
+    def lag(k):
+        before = idx - k
+        return np.where(before >= start, q[np.maximum(before, 0)], 0.0)
+
+    def mean(k):
+        low = np.maximum(start, idx - k)
+        count = idx - low
+        return np.divide(cumulative[idx] - cumulative[low], count, out=np.zeros(n), where=count > 0)
+
+    def scaled(values):
+        return np.log1p(np.maximum(values, 0)).astype(np.float32)
+
+    dense['lag_1'] = scaled(lag(1))
+    dense['lag_7'] = scaled(lag(7))
+    dense['mean_7'] = scaled(mean(7))
+    dense['mean_28'] = scaled(mean(WINDOW_DAYS))
+    dense['trend'] = dense['mean_7'] - dense['mean_28']
+    return dense
+
+
+def build_features(daily: pd.DataFrame) -> pd.DataFrame:
+    """Full feature frame for ``daily`` (see daily_totals)."""
+    first_days = daily.groupby(KEYS)['SALEDAY'].min().rename('FIRST').reset_index()
+    end = daily['SALEDAY'].max() + pd.Timedelta(days=1)
+    return compute_features(densify(daily, first_days, end))
+
+
+def attach(sales_df: pd.DataFrame, features: pd.DataFrame) -> pd.DataFrame:
+    """``sales_df`` with the demand features of each row's product, store and day."""
+    columns = [c for c in sales_df.columns if c not in DEMAND_FEATURES]
+    keys = features[KEYS + ['SALEDAY'] + DEMAND_FEATURES].astype({k: sales_df[k].dtype for k in KEYS})
+    df = sales_df[columns].merge(keys, on=KEYS + ['SALEDAY'], how='left', sort=False)
+    df[DEMAND_FEATURES] = df[DEMAND_FEATURES].fillna(0)
+    return df
+
+
+def origin_features(features: pd.DataFrame) -> pd.DataFrame:
+    """Features of each pair as of the day after the last sale, indexed by pair;
+    the forecast uses them for every day of the horizon."""
+    if features.empty:
+        return pd.DataFrame(columns=DEMAND_FEATURES, index=pd.MultiIndex.from_arrays([[], []], names=KEYS))
+    origin = features[features['SALEDAY'] == features['SALEDAY'].max()]
+    return origin.set_index(KEYS)[DEMAND_FEATURES]
+
+
+def demand_matrix(origin: pd.DataFrame, product_ids, store_ids) -> np.ndarray:
+    """Origin features for every (product, store) pair, product-major like the forecast grid."""
+    pairs = pd.MultiIndex.from_product([np.asarray(product_ids, np.int64), np.asarray(store_ids, np.int64)],
+                                       names=KEYS)
+    return origin.reindex(pairs).fillna(0).to_numpy(np.float64)
+
+
+class FeatureStore:
+    def __init__(self, directory: Optional[str] = None, name: str = 'demand'):
+        self.cache = SalesCache(directory, name) if directory else None
+
+    def update(self, sales_df: pd.DataFrame, rebuild: bool = False) -> pd.DataFrame:
+        """Feature frame for ``sales_df``, aggregating and recomputing only the days from
+        the last stored one on; earlier days come from the store."""
+        stored, meta = (None, None) if rebuild or self.cache is None else self.cache.load()
+        if stored is not None:
+            since = pd.Timestamp(meta['max_day'])
+            fresh = sales_df[sales_df['SALEDAY'] >= since]
+            rows, quantity = self._history(sales_df, since)
+            if (len(fresh) and rows == meta.get('history_sales_rows')
+                    and np.isclose(quantity, meta.get('history_sales_quantity', np.nan), rtol=1e-9)):
+                features = self._extend(stored, daily_totals(fresh), since)
+                print(f"Feature store: recomputed {int((features['SALEDAY'] >= since).sum())} rows "
+                      f"from {since.date()}.", file=sys.stderr)
+                return self._save(features, sales_df)
+            print("Feature store no longer matches the sales history; rebuilding.", file=sys.stderr)
+        daily = daily_totals(sales_df)
+        if daily.empty:
+            return compute_features(daily)
+        return self._save(build_features(daily), sales_df)
+
+    @staticmethod
+    def _history(sales_df: pd.DataFrame, day: pd.Timestamp):
+        """Row count and total quantity of the sales before ``day``: a cheap check that
+        the history behind the stored features has not changed."""
+        older = (sales_df['SALEDAY'] < day).to_numpy()
+        return int(older.sum()), float(sales_df['QUANTITY_SOLD'].to_numpy()[older].sum(dtype=np.float64))
+
+    @staticmethod
+    def _extend(stored: pd.DataFrame, fresh: pd.DataFrame, since: pd.Timestamp) -> pd.DataFrame:
+        """``stored`` with the days from ``since`` on recomputed from ``fresh`` (the daily
+        totals of those days) and the last WINDOW_DAYS stored days before them."""
+        known = stored.loc[stored['SALEDAY'] == stored['SALEDAY'].max(), KEYS].assign(FIRST=since)
+        first_days = (pd.concat([known, fresh.groupby(KEYS)['SALEDAY'].min().rename('FIRST').reset_index()])
+                      .groupby(KEYS)['FIRST'].min().reset_index())
+        end = fresh['SALEDAY'].max() + pd.Timedelta(days=1)
+        tail = stored.loc[(stored['SALEDAY'] >= since - pd.Timedelta(days=WINDOW_DAYS))
+                          & (stored['SALEDAY'] < since), KEYS + ['SALEDAY', 'QUANTITY']]
+        window = (pd.concat([tail, densify(fresh, first_days, end)], ignore_index=True)
+                  .sort_values(KEYS + ['SALEDAY'], kind='stable', ignore_index=True))
+        window = compute_features(window)
+        return pd.concat([stored[stored['SALEDAY'] < since], window[window['SALEDAY'] >= since]],
+                         ignore_index=True)
+
+    def _save(self, features: pd.DataFrame, sales_df: pd.DataFrame) -> pd.DataFrame:
+        if self.cache is not None:
+            max_day = pd.Timestamp(sales_df['SALEDAY'].max())
+            rows, quantity = self._history(sales_df, max_day)
+            self.cache.save(features, {
+                'max_day': max_day,
+                'history_sales_rows': rows,
+                'history_sales_quantity': quantity
+            })
+        return features
@@ -1,106 +1,473 @@
-from hdbcli import dbapi
+"""Seed WUSAP with sales data.
+
+Sample mode (the default) cleans SaleItems, Sale and Inventory and inserts a
+small sample: 4 inventory rows and 500 sales. Bulk mode (--bulk) tops the
+catalog up to the requested products/stores/employees and appends any number
+of sales, generated in chunks with their totals already computed, written
+with sized executemany batches and periodic commits, optionally over several
+writer connections:
+
+    python3 inserts.py --bulk --products 500 --stores 20 --employees 60 --sales 1000000 --writers 4
+
+Export mode (--export DIR) writes the same kind of data, catalog included,
+as partitioned CSV or Parquet files without touching a database, one chunk
+of sales in memory at a time. CSV parts can be bulk-loaded into HANA with
+
+    IMPORT FROM CSV FILE '<DIR>/Sale/part-00000.csv' INTO WUSAP.Sale
+        WITH COLUMN LIST IN FIRST ROW FIELD DELIMITED BY ','
+
+and any export can be loaded into the SQLite stand-in with --load-files.
+"""
 import os
-from dotenv import load_dotenv
+import sys
+import json
+import time
 import random
+import argparse
 import datetime
-from decimal import Decimal
-
-# Load variables from .env file
-load_dotenv()
-
-server_node = os.getenv("HANA_SERVER_NODE", "localhost:30015")
-host, port = server_node.split(":")
-
-conn = dbapi.connect(
-    address=host,
-    port=int(port),
-    user=os.getenv("HANA_USER"),
-    password=os.getenv("HANA_PASSWORD")
-)
-
-cursor = conn.cursor()
-
-# --- Limpiar las tablas antes de insertar ---
-print("Cleaning tables: SaleItems, Sale, Inventory...")
-cursor.execute("DELETE FROM WUSAP.SaleItems")
-cursor.execute("DELETE FROM WUSAP.Sale")
-cursor.execute("DELETE FROM WUSAP.Inventory")
-conn.commit()
-print("Tables cleaned.")
-
-# --- Insertar datos iniciales en Inventory ---
-inventory_to_insert = [
-    (1, 1, 100),  # productID=1, storeID=1, quantity=100
-    (2, 1, 50),
-    (1, 2, 80),
-    (3, 2, 60),
-]
-
-cursor.executemany(
-    "INSERT INTO WUSAP.Inventory (productID, storeID, quantity) VALUES (?, ?, ?)",
-    inventory_to_insert
-)
-conn.commit()
-print("Sample inventory data inserted.")
-
-employee_ids = [1, 5]
-product_inventory_ids = []
-
-# Obtener inventario existente con los nuevos datos
-cursor.execute("SELECT inventoryID, productID, storeID FROM WUSAP.Inventory")
-for row in cursor.fetchall():
-    product_inventory_ids.append(row)
-
-# --- Cargar precios de productos una sola vez ---
-cursor.execute("SELECT productID, suggestedPrice FROM WUSAP.Products")
-product_prices = {row[0]: row[1] for row in cursor.fetchall()}
-
-sales_to_insert = []
-sale_items_to_insert = []
-
-start_date = datetime.date.today() - datetime.timedelta(days=100)
-
-# Crear 500 ventas
-for i in range(500):
-    sale_date = start_date + datetime.timedelta(days=random.randint(0, 100))
-    employee_id = random.choice(employee_ids)
-    sales_to_insert.append((sale_date, employee_id, 0))
-
-# Insertar ventas
-cursor.executemany(
-    "INSERT INTO WUSAP.Sale (saleDate, employeeID, saleTotal) VALUES (?, ?, ?)",
-    sales_to_insert
-)
-conn.commit()
-
-cursor.execute("SELECT saleID FROM WUSAP.Sale ORDER BY saleID DESC LIMIT 500")
-sale_ids = [row[0] for row in cursor.fetchall()]
-sale_ids.reverse()
-
-for sale_id in sale_ids:
-    max_items = min(3, len(product_inventory_ids))
-    num_items = random.randint(1, max_items)
-    items = random.sample(product_inventory_ids, num_items)
-    total_sale = Decimal("0.00")
-    for inventoryID, productID, storeID in items:
-        qty = random.uniform(1, 10)
-        qty_dec = Decimal(str(qty))
-        price = product_prices.get(productID)
-        if price is None:
-            raise Exception(f"ProductID {productID} no encontrado en productos")
-        item_total = round(qty_dec * price, 2)
-        total_sale += item_total
-        sale_items_to_insert.append((sale_id, inventoryID, round(qty, 2), item_total))
-
-    cursor.execute("UPDATE WUSAP.Sale SET saleTotal = ? WHERE saleID = ?", (total_sale, sale_id))
-
-# Insertar items de venta
-cursor.executemany(
-    "INSERT INTO WUSAP.SaleItems (saleID, inventoryID, quantity, itemTotal) VALUES (?, ?, ?, ?)",
-    sale_items_to_insert
-)
-
-conn.commit()
-cursor.close()
-conn.close()
-print("Inserted 500 sales with sale items")
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+from dotenv import load_dotenv
+
+import standin_db
+from synthetic_data import WEEKLY_PATTERN, generate_catalog
+
+SCHEMA = 'WUSAP'
+
+
+def connect(sqlite_path=None):
+    if sqlite_path:
+        return standin_db.connect(sqlite_path, SCHEMA)
+    from hdbcli import dbapi  # sólo para HANA; --sqlite y --export no lo necesitan
+    # Load variables from .env file
+    load_dotenv()
+    server_node = os.getenv("HANA_SERVER_NODE", "localhost:30015")
+    host, port = server_node.split(":")
+    conn = dbapi.connect(
+        address=host,
+        port=int(port),
+        user=os.getenv("HANA_USER"),
+        password=os.getenv("HANA_PASSWORD")
+    )
+    # Transacciones explícitas: commits periódicos y el lock de Sale hasta el commit.
+    conn.setautocommit(False)
+    return conn
+
+
+def fetch_all(conn, query, params=()):
+    cursor = conn.cursor()
+    try:
+        cursor.execute(query, params)
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+
+
+def delete_in_batches(conn, table, id_column, batch_size=50_000):
+    """DELETE every row of ``table`` in batches of ``batch_size`` IDs, committing after each one.
+
+    Each batch ends at the ``batch_size``-th smallest remaining ID, so gaps in
+    the ID range cost nothing.
+    """
+    deleted = 0
+    cursor = conn.cursor()
+    try:
+        while True:
+            cutoff = fetch_all(conn, f"SELECT {id_column} FROM {SCHEMA}.{table} ORDER BY {id_column} "
+                                     f"LIMIT 1 OFFSET {int(batch_size) - 1}")
+            if cutoff:
+                cursor.execute(f"DELETE FROM {SCHEMA}.{table} WHERE {id_column} <= ?", (cutoff[0][0],))
+            else:
+                cursor.execute(f"DELETE FROM {SCHEMA}.{table}")
+            deleted += max(cursor.rowcount, 0)
+            conn.commit()
+            if not cutoff:
+                return deleted
+    finally:
+        cursor.close()
+
+
+def executemany_chunks(conn, query, rows, chunk_size=10_000, commit_every=100_000):
+    """executemany in chunks of ``chunk_size`` rows, committing every ``commit_every`` rows."""
+    cursor = conn.cursor()
+    uncommitted = 0
+    try:
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start:start + chunk_size]
+            cursor.executemany(query, chunk)
+            uncommitted += len(chunk)
+            if uncommitted >= commit_every:
+                conn.commit()
+                uncommitted = 0
+        conn.commit()
+    finally:
+        cursor.close()
+
+
+def lock_sales(conn):
+    """Keep other writers out of WUSAP.Sale until the next commit."""
+    if standin_db.is_sqlite(conn):
+        conn.execute("BEGIN IMMEDIATE")
+    else:
+        conn.cursor().execute(f"LOCK TABLE {SCHEMA}.Sale IN EXCLUSIVE MODE")
+
+
+def insert_sales(conn, sales, chunk_size=10_000):
+    """Insert ``sales`` (saleDate, employeeID, saleTotal) and return their new saleIDs in order.
+
+    The table stays locked from reading MAX(saleID) until the commit, so every
+    ID above it belongs to this batch.
+    """
+    lock_sales(conn)
+    try:
+        max_before = fetch_all(conn, f"SELECT COALESCE(MAX(saleID), 0) FROM {SCHEMA}.Sale")[0][0]
+        cursor = conn.cursor()
+        try:
+            for start in range(0, len(sales), chunk_size):
+                cursor.executemany(
+                    f"INSERT INTO {SCHEMA}.Sale (saleDate, employeeID, saleTotal) VALUES (?, ?, ?)",
+                    sales[start:start + chunk_size]
+                )
+        finally:
+            cursor.close()
+        sale_ids = [row[0] for row in fetch_all(
+            conn, f"SELECT saleID FROM {SCHEMA}.Sale WHERE saleID > ? ORDER BY saleID", (max_before,))]
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    if len(sale_ids) != len(sales):
+        raise RuntimeError(f"Expected {len(sales)} new sale IDs, found {len(sale_ids)}")
+    return sale_ids
+
+
+def rows(df):
+    """DataFrame rows as tuples of plain Python values, ready for executemany."""
+    columns = [df[c].to_numpy().astype('datetime64[s]').tolist() if pd.api.types.is_datetime64_any_dtype(df[c])
+               else df[c].tolist() for c in df.columns]
+    return list(zip(*columns))
+
+
+def seasonal_weights(start_date, days):
+    """Share of sales for each of the ``days + 1`` days from ``start_date``:
+    weekly pattern times a yearly wave that peaks in mid-December."""
+    dates = start_date + np.arange(days + 1).astype('timedelta64[D]')
+    weekday = (dates.astype('datetime64[D]').view('int64') + 3) % 7  # 1970-01-01 fue jueves
+    day_of_year = (dates - dates.astype('datetime64[Y]')).astype(np.int64)
+    weights = WEEKLY_PATTERN[weekday] * (1 + 0.25 * np.cos(2 * np.pi * (day_of_year - 350) / 365.25))
+    return weights / weights.sum()
+
+
+def generate_sales(rng, n_sales, employees, inventory, prices, start_date, days, max_items=3):
+    """Sales and their items with totals computed up front.
+
+    ``employees`` is (employeeID, storeID) rows and ``inventory`` is
+    (inventoryID, productID, storeID) rows. When every employee's store has
+    inventory, items come from that store; otherwise from any inventory row.
+    Sale days follow seasonal_weights. Returns ``(sales, items)`` frames;
+    each item references its sale by position (``sale``) in ``sales``.
+    """
+    employees = np.asarray(employees, dtype=np.int64).reshape(-1, 2)
+    inventory = np.asarray(inventory, dtype=np.int64).reshape(-1, 3)
+    seller = rng.integers(0, len(employees), n_sales)
+    sale_store = employees[seller, 1]
+
+    n_items = rng.integers(1, min(max_items, len(inventory)) + 1, n_sales)
+    item_sale = np.repeat(np.arange(n_sales), n_items)
+    order = np.lexsort((inventory[:, 0], inventory[:, 2]))
+    by_store = inventory[order]
+    stores, first = np.unique(by_store[:, 2], return_index=True)
+    counts = np.diff(np.append(first, len(by_store)))
+    position = np.searchsorted(stores, sale_store[item_sale])
+    if np.isin(sale_store, stores).all():
+        row = first[position] + (rng.random(len(item_sale)) * counts[position]).astype(np.int64)
+        items = by_store[row]
+    else:
+        items = inventory[rng.integers(0, len(inventory), len(item_sale))]
+
+    quantity = np.round(rng.uniform(1, 10, len(item_sale)), 2)
+    item_total = np.round(quantity * prices[items[:, 1]], 2)
+    sale_total = np.round(np.bincount(item_sale, weights=item_total, minlength=n_sales), 2)
+    sale_day = start_date + rng.choice(days + 1, n_sales, p=seasonal_weights(start_date, days)).astype('timedelta64[D]')
+    sale_time = sale_day.astype('datetime64[s]') + rng.integers(8 * 3600, 21 * 3600, n_sales).astype('timedelta64[s]')
+
+    sales = pd.DataFrame({'saleDate': sale_time, 'employeeID': employees[seller, 0], 'saleTotal': sale_total})
+    items = pd.DataFrame({'sale': item_sale, 'inventoryID': items[:, 0], 'quantity': quantity, 'itemTotal': item_total})
+    return sales, items
+
+
+def load_catalog(conn, products=None, stores=None, employees=None):
+    """Employees, inventory and a price lookup, limited to the first N stores/products/employees."""
+    store_ids = [r[0] for r in fetch_all(conn, f"SELECT storeID FROM {SCHEMA}.Locations ORDER BY storeID")][:stores]
+    product_rows = fetch_all(conn, f"SELECT productID, suggestedPrice FROM {SCHEMA}.Products ORDER BY productID")
+    product_rows = product_rows[:products]
+    employee_rows = fetch_all(conn, f"SELECT employeeID, storeID FROM {SCHEMA}.Employees ORDER BY employeeID")
+    employee_rows = [r for r in employee_rows if stores is None or r[1] in store_ids][:employees]
+    product_ids = {r[0] for r in product_rows}
+    inventory_rows = [r for r in fetch_all(conn, f"SELECT inventoryID, productID, storeID FROM {SCHEMA}.Inventory")
+                      if r[1] in product_ids and (stores is None or r[2] in store_ids)]
+
+    prices = np.zeros(max(product_ids, default=0) + 1)
+    for product_id, price in product_rows:
+        prices[product_id] = float(price)
+    return employee_rows, inventory_rows, prices
+
+
+def ensure_catalog(conn, products, stores, employees, chunk_size=10_000):
+    """Top Locations, Products, Employees and Inventory up to the requested counts."""
+    rng = np.random.default_rng()
+    tag = int(time.time())
+    have = len(fetch_all(conn, f"SELECT storeID FROM {SCHEMA}.Locations"))
+    executemany_chunks(conn, f"INSERT INTO {SCHEMA}.Locations (name, location) VALUES (?, ?)",
+                       [(f'Tienda carga {i}', 'Generada por inserts.py') for i in range(have + 1, stores + 1)],
+                       chunk_size)
+    have = len(fetch_all(conn, f"SELECT productID FROM {SCHEMA}.Products"))
+    executemany_chunks(conn, f"INSERT INTO {SCHEMA}.Products (name, suggestedPrice, unit) VALUES (?, ?, ?)",
+                       [(f'Producto carga {i}', round(float(rng.lognormal(3.5, 0.6)), 2), 'pieza')
+                        for i in range(have + 1, products + 1)], chunk_size)
+
+    store_ids = [r[0] for r in fetch_all(conn, f"SELECT storeID FROM {SCHEMA}.Locations ORDER BY storeID")][:stores]
+    have = len(fetch_all(conn, f"SELECT employeeID FROM {SCHEMA}.Employees WHERE storeID IN "
+                               f"({', '.join('?' * len(store_ids))})", store_ids))
+    executemany_chunks(conn, f"INSERT INTO {SCHEMA}.Employees (name, lastName, email, password, role, storeID) "
+                             "VALUES (?, ?, ?, ?, ?, ?)",
+                       [(f'Vendedor {i}', 'Carga', f'carga{tag}.{i}@wusap.test', 'x', 'sales',
+                         store_ids[i % len(store_ids)]) for i in range(have, employees)], chunk_size)
+
+    product_ids = [r[0] for r in fetch_all(conn, f"SELECT productID FROM {SCHEMA}.Products ORDER BY productID")][:products]
+    existing = {(r[0], r[1]) for r in fetch_all(conn, f"SELECT productID, storeID FROM {SCHEMA}.Inventory")}
+    executemany_chunks(conn, f"INSERT INTO {SCHEMA}.Inventory (productID, storeID, quantity) VALUES (?, ?, ?)",
+                       [(p, s, int(rng.integers(0, 200))) for p in product_ids for s in store_ids
+                        if (p, s) not in existing], chunk_size)
+
+
+def write_chunk(conn, rng, n_sales, catalog, start_date, days, max_items, chunk_size, commit_every):
+    sales, items = generate_sales(rng, n_sales, *catalog, start_date, days, max_items)
+    sale_ids = np.asarray(insert_sales(conn, rows(sales), chunk_size))
+    items.insert(0, 'saleID', sale_ids[items.pop('sale').to_numpy()])
+    executemany_chunks(
+        conn,
+        f"INSERT INTO {SCHEMA}.SaleItems (saleID, inventoryID, quantity, itemTotal) VALUES (?, ?, ?, ?)",
+        rows(items), chunk_size, commit_every
+    )
+    return len(sales), len(items)
+
+
+def seed_sales(connect_fn, n_sales, catalog, start_date, days=100, max_items=3, writers=1,
+               sales_per_chunk=50_000, chunk_size=10_000, commit_every=100_000, seed=None):
+    """Append ``n_sales`` sales over ``writers`` connections; returns (sales, items, seconds)."""
+    chunks = [min(sales_per_chunk, n_sales - start) for start in range(0, n_sales, sales_per_chunk)]
+    seeds = np.random.SeedSequence(seed).spawn(len(chunks))
+    totals = {'sales': 0, 'items': 0}
+    lock = threading.Lock()
+    started = time.perf_counter()
+
+    def writer(index):
+        conn = connect_fn()
+        try:
+            for chunk in range(index, len(chunks), writers):
+                n, m = write_chunk(conn, np.random.default_rng(seeds[chunk]), chunks[chunk], catalog,
+                                   start_date, days, max_items, chunk_size, commit_every)
+                with lock:
+                    totals['sales'] += n
+                    totals['items'] += m
+                    elapsed = time.perf_counter() - started
+                    print(f"  {totals['sales']}/{n_sales} sales, {totals['items']} items "
+                          f"({(totals['sales'] + totals['items']) / elapsed:,.0f} rows/s)", file=sys.stderr)
+        finally:
+            conn.close()
+
+    with ThreadPoolExecutor(max_workers=writers) as pool:
+        for future in [pool.submit(writer, i) for i in range(writers)]:
+            future.result()
+    return totals['sales'], totals['items'], time.perf_counter() - started
+
+
+def write_part(df, directory, table, index, fmt='parquet'):
+    path = os.path.join(directory, table, f'part-{index:05d}.{fmt}')
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if fmt == 'parquet':
+        df.to_parquet(path, index=False)
+    else:
+        df.to_csv(path, index=False, date_format='%Y-%m-%d %H:%M:%S')
+    return path
+
+
+def export_files(directory, n_sales, products, stores, employees, start_date, days=365, max_items=5,
+                 sales_per_chunk=50_000, fmt='parquet', seed=None):
+    """Write catalog, Sale and SaleItems as partitioned files; one chunk of sales in memory at a time.
+
+    The same ``seed`` and chunking always produce the same files.
+    """
+    chunks = [min(sales_per_chunk, n_sales - start) for start in range(0, n_sales, sales_per_chunk)]
+    seeds = np.random.SeedSequence(seed).spawn(len(chunks) + 1)
+    tables = generate_catalog(np.random.default_rng(seeds[-1]), products, stores, employees, max_quantity=200)
+    for table, df in tables.items():
+        write_part(df, directory, table, 0, fmt)
+    counts = {table: len(df) for table, df in tables.items()}
+
+    employee_rows = tables['Employees'][['employeeID', 'storeID']].to_numpy()
+    inventory_rows = tables['Inventory'][['inventoryID', 'productID', 'storeID']].to_numpy()
+    prices = np.concatenate([[0.0], tables['Products']['suggestedPrice'].to_numpy()])
+    counts.update(Sale=0, SaleItems=0)
+    started = time.perf_counter()
+    for index, n in enumerate(chunks):
+        sales, items = generate_sales(np.random.default_rng(seeds[index]), n, employee_rows, inventory_rows,
+                                      prices, start_date, days, max_items)
+        sales.insert(0, 'saleID', np.arange(counts['Sale'] + 1, counts['Sale'] + n + 1))
+        items.insert(0, 'saleItemID', np.arange(counts['SaleItems'] + 1, counts['SaleItems'] + len(items) + 1))
+        items.insert(1, 'saleID', sales['saleID'].to_numpy()[items.pop('sale').to_numpy()])
+        write_part(sales, directory, 'Sale', index, fmt)
+        write_part(items, directory, 'SaleItems', index, fmt)
+        counts['Sale'] += n
+        counts['SaleItems'] += len(items)
+        elapsed = time.perf_counter() - started
+        print(f"  {counts['Sale']}/{n_sales} sales, {counts['SaleItems']} items "
+              f"({(counts['Sale'] + counts['SaleItems']) / elapsed:,.0f} rows/s)", file=sys.stderr)
+
+    manifest = {
+        'format': fmt,
+        'seed': seed,
+        'start_date': str(start_date),
+        'days': days,
+        'max_items': max_items,
+        'sales_per_chunk': sales_per_chunk,
+        'rows': counts
+    }
+    with open(os.path.join(directory, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    return counts, time.perf_counter() - started
+
+
+def sample_sales(inventory, prices, n_sales=500, employee_ids=(1, 5), days=100, max_items=3, rng=random):
+    """The original sample: ``n_sales`` sales by ``employee_ids`` on random days of the
+    last ``days``, each with 1..``max_items`` distinct rows of ``inventory`` (any store).
+
+    ``inventory`` is (inventoryID, productID, storeID) rows and ``prices`` maps
+    productID to its price. Returns ``(sales, items)``; each item references its
+    sale by position in ``sales``.
+    """
+    start_date = datetime.date.today() - datetime.timedelta(days=days)
+    sales, items = [], []
+    for position in range(n_sales):
+        sale_date = start_date + datetime.timedelta(days=rng.randint(0, days))
+        employee_id = rng.choice(employee_ids)
+        total = 0.0
+        for inventory_id, product_id, _ in rng.sample(inventory, rng.randint(1, min(max_items, len(inventory)))):
+            price = prices.get(product_id)
+            if price is None:
+                raise Exception(f"ProductID {product_id} no encontrado en productos")
+            qty = rng.uniform(1, 10)
+            item_total = round(qty * float(price), 2)
+            total += item_total
+            items.append((position, inventory_id, round(qty, 2), item_total))
+        sales.append((sale_date, employee_id, round(total, 2)))
+    return sales, items
+
+
+def seed_sample(conn):
+    # --- Limpiar las tablas antes de insertar ---
+    print("Cleaning tables: SaleItems, Sale, Inventory...")
+    delete_in_batches(conn, 'SaleItems', 'saleItemID')
+    delete_in_batches(conn, 'Sale', 'saleID')
+    delete_in_batches(conn, 'Inventory', 'inventoryID')
+    print("Tables cleaned.")
+
+    # --- Insertar datos iniciales en Inventory ---
+    inventory_to_insert = [
+        (1, 1, 100),  # productID=1, storeID=1, quantity=100
+        (2, 1, 50),
+        (1, 2, 80),
+        (3, 2, 60),
+    ]
+    executemany_chunks(conn, f"INSERT INTO {SCHEMA}.Inventory (productID, storeID, quantity) VALUES (?, ?, ?)",
+                       inventory_to_insert)
+    print("Sample inventory data inserted.")
+
+    inventory = fetch_all(conn, f"SELECT inventoryID, productID, storeID FROM {SCHEMA}.Inventory")
+    prices = dict(fetch_all(conn, f"SELECT productID, suggestedPrice FROM {SCHEMA}.Products"))
+    sales, items = sample_sales(inventory, prices)
+    sale_ids = insert_sales(conn, sales)
+    executemany_chunks(conn, f"INSERT INTO {SCHEMA}.SaleItems (saleID, inventoryID, quantity, itemTotal) "
+                             "VALUES (?, ?, ?, ?)",
+                       [(sale_ids[position], *item) for position, *item in items])
+    print(f"Inserted {len(sales)} sales with sale items")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Carga datos de ventas en WUSAP.")
+    parser.add_argument('--sqlite', help="Seed a local SQLite stand-in database instead of HANA.")
+    parser.add_argument('--bulk', action='store_true',
+                        help="Append generated sales at scale instead of reloading the small sample.")
+    parser.add_argument('--products', type=int, default=100, help="Bulk: products to sell (created if missing).")
+    parser.add_argument('--stores', type=int, default=5, help="Bulk: stores to sell in (created if missing).")
+    parser.add_argument('--employees', type=int, default=10, help="Bulk: sellers (created if missing).")
+    parser.add_argument('--sales', type=int, default=100_000, help="Bulk: sales to insert.")
+    parser.add_argument('--days', type=int, default=365, help="Bulk: spread sales over this many past days.")
+    parser.add_argument('--max-items', type=int, default=5, help="Bulk: maximum items per sale.")
+    parser.add_argument('--clean', action='store_true', help="Bulk: delete existing sales first.")
+    parser.add_argument('--writers', type=int, default=1, help="Bulk: parallel writer connections.")
+    parser.add_argument('--sales-per-chunk', type=int, default=50_000,
+                        help="Sales generated and ID-allocated per unit of work.")
+    parser.add_argument('--chunk-size', type=int, default=10_000, help="Rows per executemany call.")
+    parser.add_argument('--commit-every', type=int, default=100_000, help="Rows between commits.")
+    parser.add_argument('--seed', type=int, help="Random seed for reproducible data.")
+    parser.add_argument('--export', metavar='DIR',
+                        help="Write the bulk data set as partitioned files in DIR instead of inserting it.")
+    parser.add_argument('--export-format', choices=['csv', 'parquet'], default='parquet')
+    parser.add_argument('--load-files', metavar='DIR',
+                        help="Load an --export directory into the database given by --sqlite.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    start_date = np.datetime64(datetime.date.today() - datetime.timedelta(days=args.days))
+
+    if args.export:
+        counts, seconds = export_files(args.export, args.sales, args.products, args.stores, args.employees,
+                                       start_date, args.days, args.max_items, args.sales_per_chunk,
+                                       args.export_format, args.seed)
+        total = sum(counts.values())
+        print(f"Exported {total} rows to {args.export} in {seconds:.1f}s ({total / max(seconds, 1e-9):,.0f} rows/s)")
+        return
+
+    def connect_fn():
+        return connect(args.sqlite)
+
+    conn = connect_fn()
+    try:
+        if args.sqlite:
+            standin_db.create_schema(conn)  # un archivo nuevo o vacío queda listo para cargar
+        if args.load_files:
+            if not args.sqlite:
+                raise SystemExit("--load-files requires --sqlite; use HANA's IMPORT for HANA.")
+            counts = standin_db.load_files(conn, args.load_files)
+            print(', '.join(f"{table}={n}" for table, n in counts.items()))
+            return
+
+        if not args.bulk:
+            seed_sample(conn)
+            return
+
+        if args.clean:
+            print("Cleaning tables: SaleItems, Sale...", file=sys.stderr)
+            delete_in_batches(conn, 'SaleItems', 'saleItemID')
+            delete_in_batches(conn, 'Sale', 'saleID')
+        ensure_catalog(conn, args.products, args.stores, args.employees, args.chunk_size)
+        catalog = load_catalog(conn, args.products, args.stores, args.employees)
+        n_sales, n_items, seconds = seed_sales(
+            connect_fn, args.sales, catalog, start_date, args.days, args.max_items, max(1, args.writers),
+            args.sales_per_chunk, args.chunk_size, args.commit_every, args.seed
+        )
+        print(f"Inserted {n_sales} sales and {n_items} sale items in {seconds:.1f}s "
+              f"({(n_sales + n_items) / max(seconds, 1e-9):,.0f} rows/s, {max(1, args.writers)} writers)")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
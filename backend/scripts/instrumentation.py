@@ -0,0 +1,155 @@
+"""Per-stage timing and memory metrics for predicciones.py.
+
+Pipeline functions wrap their work in ``stage(name)``; the block is a no-op
+unless a RunMetrics is active, so library callers pay nothing. Stages can
+nest (the write loop drives forecasting lazily): each stage reports its own
+time excluding nested stages, its call count, the rows it handled, the
+process peak RSS when it ended and, with tracemalloc on, its traced peak.
+"""
+import os
+import sys
+import json
+import time
+import datetime
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from typing import Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+_active = None
+
+
+def max_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss viene en KB en Linux y en bytes en macOS.
+    return round(rss / (2 ** 20 if sys.platform == 'darwin' else 2 ** 10), 2)
+
+
+class RunMetrics:
+    def __init__(self, trace_memory: bool = False):
+        self.trace_memory = trace_memory
+        self.stages = {}
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _stack(self) -> list:
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+        return self._local.stack
+
+    @contextmanager
+    def stage(self, name: str):
+        info = {'rows': 0}
+        stack = self._stack()
+        traced = self.trace_memory and tracemalloc.is_tracing() and threading.current_thread() is threading.main_thread()
+        if traced:
+            if stack:
+                stack[-1]['peak'] = max(stack[-1]['peak'], tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+        frame = {'children': 0.0, 'peak': 0}
+        stack.append(frame)
+        started = time.perf_counter()
+        try:
+            yield info
+        finally:
+            elapsed = time.perf_counter() - started
+            stack.pop()
+            if stack:
+                stack[-1]['children'] += elapsed
+            peak = None
+            if traced:
+                peak = max(frame['peak'], tracemalloc.get_traced_memory()[1])
+                if stack:
+                    stack[-1]['peak'] = max(stack[-1]['peak'], peak)
+                tracemalloc.reset_peak()
+            self._add(name, elapsed - frame['children'], info, peak)
+
+    def _add(self, name: str, seconds: float, info: dict, peak: Optional[int]) -> None:
+        with self._lock:
+            entry = self.stages.setdefault(name, {'seconds': 0.0, 'calls': 0, 'rows': 0})
+            entry['seconds'] += seconds
+            entry['calls'] += 1
+            entry['rows'] += info.pop('rows')
+            entry.update(info)
+            entry['max_rss_mb'] = max_rss_mb()
+            if peak is not None:
+                entry['traced_peak_mb'] = max(entry.get('traced_peak_mb', 0.0), round(peak / 2 ** 20, 2))
+
+    def record(self, **extra) -> dict:
+        """One JSON-ready record for the run so far."""
+        with self._lock:
+            stages = {name: {**entry, 'seconds': round(entry['seconds'], 4)} for name, entry in self.stages.items()}
+        return {
+            'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+            'pid': os.getpid(),
+            **extra,
+            'total_seconds': round(time.perf_counter() - self.started, 4),
+            'max_rss_mb': max_rss_mb(),
+            'stages': stages
+        }
+
+
+@contextmanager
+def activate(metrics: Optional[RunMetrics]):
+    """Make ``metrics`` the target of stage() for the duration of the block."""
+    global _active
+    previous, _active = _active, metrics
+    try:
+        yield metrics
+    finally:
+        _active = previous
+
+
+@contextmanager
+def stage(name: str):
+    """Time the block as stage ``name``; set ``info['rows']`` to report rows handled
+    and any other ``info`` key to record it as is (e.g. a frame size)."""
+    if _active is None:
+        yield {'rows': 0}
+        return
+    with _active.stage(name) as info:
+        yield info
+
+
+def emit(record: dict, path: Optional[str] = None, stream=None) -> None:
+    """Append the record as one JSON line to ``path``, or write ``{"metrics": record}`` to stderr."""
+    if path:
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, default=str) + "\n")
+    else:
+        stream = stream or sys.stderr
+        stream.write(json.dumps({'metrics': record}, default=str) + "\n")
+        stream.flush()
+
+
+@contextmanager
+def profiled(directory: Optional[str]):
+    """Dump a cProfile and a tracemalloc snapshot of the block into ``directory``."""
+    if not directory:
+        yield
+        return
+    import cProfile
+    os.makedirs(directory, exist_ok=True)
+    prefix = os.path.join(directory, f"predicciones-{datetime.datetime.now():%Y%m%d-%H%M%S}-{os.getpid()}")
+    profiler = cProfile.Profile()
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start(25)
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(prefix + '.prof')
+        tracemalloc.take_snapshot().dump(prefix + '.tracemalloc')
+        if started_tracing:
+            tracemalloc.stop()
+        print(f"Profile written to {prefix}.prof and {prefix}.tracemalloc", file=sys.stderr)
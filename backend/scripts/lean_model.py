@@ -0,0 +1,78 @@
+"""NumPy-only copy of a fitted LinearRegression for the inference path.
+
+Unpickling a scikit-learn estimator imports sklearn (and SciPy with it),
+which is most of the start-up time of a predicciones.py run spawned per
+request. A linear model is just coefficients, so next to ``model.joblib``
+we keep ``model.joblib.linear.json`` with its feature names, coefficients
+and intercept, stamped with the artifact's mtime/size. load_model() uses
+the sidecar while the stamp matches and falls back to joblib otherwise
+(segmented models, forests, or an artifact replaced by hand).
+"""
+import os
+import json
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+
+class LinearPredictor:
+    def __init__(self, feature_names, coef, intercept: float):
+        self.feature_names_in_ = np.asarray(feature_names, dtype=object)
+        self.coef_ = np.asarray(coef, dtype=np.float64)
+        self.intercept_ = float(intercept)
+
+    def predict(self, X: pd.DataFrame) -> np.ndarray:
+        return X[list(self.feature_names_in_)].to_numpy(dtype=np.float64) @ self.coef_ + self.intercept_
+
+
+def sidecar_path(model_path: str) -> str:
+    return model_path + '.linear.json'
+
+
+def _stamp(model_path: str) -> list:
+    stat = os.stat(model_path)
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def export_linear(model, model_path: str) -> bool:
+    """Write the sidecar for a plain LinearRegression; other models are skipped."""
+    if type(model).__name__ != 'LinearRegression' or np.ndim(model.coef_) != 1:
+        return False
+    tmp_path = sidecar_path(model_path) + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'stamp': _stamp(model_path),
+            'features': list(model.feature_names_in_),
+            'coef': model.coef_.tolist(),
+            'intercept': float(model.intercept_)
+        }, f)
+    os.replace(tmp_path, sidecar_path(model_path))
+    return True
+
+
+def load_linear(model_path: str) -> Optional[LinearPredictor]:
+    """The sidecar's predictor, or None when it is missing or stale."""
+    try:
+        with open(sidecar_path(model_path), encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta['stamp'] != _stamp(model_path):
+            return None
+    except (OSError, ValueError, KeyError):
+        return None
+    return LinearPredictor(meta['features'], meta['coef'], meta['intercept'])
+
+
+def load_model(model_path: str):
+    """Load ``model_path`` through its sidecar when possible, else with joblib
+    (writing the sidecar for next time)."""
+    model = load_linear(model_path)
+    if model is not None:
+        return model
+    import joblib
+    model = joblib.load(model_path)
+    try:
+        export_linear(model, model_path)
+    except OSError:
+        pass
+    return model
@@ -0,0 +1,475 @@
+"""Asyncio load generator for the Express API.
+
+Requests arrive open-loop at each ``--rate`` (requests per second, Poisson
+arrivals by default), for ``--duration`` seconds per rate. Endpoints are
+drawn from a weighted ``--mix``. In-flight requests share up to
+``--connections`` keep-alive HTTP connections. Latency is measured from each
+request's scheduled arrival, so time spent waiting for a free connection
+counts too and a slow server is not hidden by a client that backs off. The
+time from sending to the full response is reported separately as
+``service_ms``.
+
+For every rate it reports throughput, error rate, p50/p95/p99 latency and a
+log-bucketed latency histogram, overall and per endpoint.
+
+``--mock`` starts a stand-in API in the same process instead of hitting a
+real backend. The stand-in has a 50-connection "HANA pool" and, like the
+controller, a pool of ``predicciones.py --serve`` workers that answer one
+request at a time and are taken out of rotation one by one to refresh
+their data, so the tool can be checked without HANA.
+
+    python3 load_test.py --mock --rate 20 50 100 --duration 20
+    python3 load_test.py --url http://localhost:3000 --email manager@wusap.com --password ... \\
+        --mix predicciones=1 inventory=4 orders=2 sales=2 dashboard=3 --rate 5 10 --output carga.json
+"""
+import os
+import ssl
+import sys
+import json
+import math
+import random
+import asyncio
+import argparse
+import platform
+from urllib.parse import urlsplit
+
+import numpy as np
+
+ENDPOINTS = {
+    'predicciones': '/api/predicciones',
+    'inventory': '/api/inventory/store/products',
+    'orders': '/api/orders/active',
+    'sales': '/api/sales/',
+    'dashboard': '/api/dashboard/kpis',
+}
+DEFAULT_MIX = {'predicciones': 1, 'inventory': 4, 'orders': 2, 'sales': 2, 'dashboard': 3}
+# Límites de los buckets del histograma: 0.5 ms a ~2 min, cuatro por potencia de dos.
+HISTOGRAM_BOUNDS_MS = 0.5 * 2 ** (np.arange(73) / 4)
+
+
+class RequestError(Exception):
+    pass
+
+
+class Connection:
+    """One keep-alive HTTP/1.1 connection."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, host: str):
+        self.reader = reader
+        self.writer = writer
+        self.host = host
+        self.reusable = True
+
+    @classmethod
+    async def open(cls, url):
+        port = url.port or (443 if url.scheme == 'https' else 80)
+        context = ssl.create_default_context() if url.scheme == 'https' else None
+        reader, writer = await asyncio.open_connection(url.hostname, port, ssl=context, limit=2 ** 20)
+        return cls(reader, writer, url.netloc)
+
+    async def request(self, method: str, path: str, headers: dict, body: bytes = b''):
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {self.host}", f"Content-Length: {len(body)}"]
+        lines += [f"{k}: {v}" for k, v in headers.items()]
+        self.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode('latin-1') + body)
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError("connection closed by the server")
+        status = int(status_line.split()[1])
+        response_headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            response_headers[name.strip().lower()] = value.strip()
+
+        if 'content-length' in response_headers:
+            data = await self.reader.readexactly(int(response_headers['content-length']))
+        elif response_headers.get('transfer-encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int((await self.reader.readline()).split(b';')[0], 16)
+                if size == 0:
+                    while (await self.reader.readline()) not in (b'\r\n', b'\n', b''):
+                        pass
+                    break
+                chunks.append((await self.reader.readexactly(size + 2))[:-2])
+            data = b''.join(chunks)
+        else:
+            data = await self.reader.read()
+            self.reusable = False
+        if response_headers.get('connection', '').lower() == 'close':
+            self.reusable = False
+        return status, data
+
+    def close(self):
+        self.writer.close()
+
+
+class Client:
+    """Keep-alive connections to ``base_url``, at most ``size`` of them at once."""
+
+    def __init__(self, base_url: str, size: int, timeout: float):
+        self.url = urlsplit(base_url)
+        self.prefix = self.url.path.rstrip('/')
+        self.timeout = timeout
+        self.headers = {'Accept': 'application/json', 'Connection': 'keep-alive'}
+        self.slots = asyncio.Semaphore(size)
+        self.idle = []
+
+    async def request(self, method: str, path: str, body=None, on_send=None):
+        """``(status, body)`` of one request; ``on_send`` is called once a connection is ready."""
+        async with self.slots:
+            conn = self.idle.pop() if self.idle else await Connection.open(self.url)
+            if on_send is not None:
+                on_send()
+            headers = dict(self.headers)
+            payload = b''
+            if body is not None:
+                payload = json.dumps(body).encode()
+                headers['Content-Type'] = 'application/json'
+            try:
+                status, data = await asyncio.wait_for(
+                    conn.request(method, self.prefix + path, headers, payload), self.timeout)
+            except BaseException:
+                conn.close()
+                raise
+            if conn.reusable:
+                self.idle.append(conn)
+            else:
+                conn.close()
+            return status, data
+
+    async def login(self, email: str, password: str) -> None:
+        status, data = await self.request('POST', '/api/auth/login', {'email': email, 'password': password})
+        result = json.loads(data or b'{}')
+        if status != 200 or not result.get('token'):
+            raise RequestError(f"Login failed ({status}): {result.get('message', data[:200])}")
+        self.headers['Authorization'] = f"Bearer {result['token']}"
+
+    def close(self):
+        for conn in self.idle:
+            conn.close()
+        self.idle = []
+
+
+def arrivals(rate: float, duration: float, rng: random.Random, poisson: bool = True):
+    """Offsets in seconds of the requests sent at ``rate`` per second."""
+    t = 0.0
+    while True:
+        t += rng.expovariate(rate) if poisson else 1 / rate
+        if t >= duration:
+            return
+        yield t
+
+
+async def run_rate(client: Client, rate: float, duration: float, mix: dict, paths: dict,
+                   rng: random.Random, poisson: bool = True) -> tuple:
+    """Fire requests at ``rate`` for ``duration`` seconds.
+
+    Returns one sample dict per request and the seconds until the last response.
+    """
+    loop = asyncio.get_running_loop()
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    samples = []
+
+    async def fire(name, scheduled):
+        sample = {'endpoint': name, 'scheduled': scheduled, 'sent': None, 'status': None, 'error': None}
+        samples.append(sample)
+        try:
+            sample['status'], _ = await client.request(
+                'GET', paths[name], on_send=lambda: sample.__setitem__('sent', loop.time()))
+            if sample['status'] >= 400:
+                sample['error'] = str(sample['status'])
+        except asyncio.TimeoutError:
+            sample['error'] = 'timeout'
+        except (OSError, ValueError, IndexError, asyncio.IncompleteReadError) as e:
+            sample['error'] = type(e).__name__
+        sample['done'] = loop.time()
+
+    start = loop.time()
+    tasks = []
+    for offset in arrivals(rate, duration, rng, poisson):
+        delay = start + offset - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        name = rng.choices(names, weights)[0]
+        tasks.append(asyncio.ensure_future(fire(name, start + offset)))
+    await asyncio.gather(*tasks)
+    return samples, loop.time() - start
+
+
+def latency_stats(values_ms: np.ndarray) -> dict:
+    if len(values_ms) == 0:
+        return {}
+    p50, p95, p99 = np.percentile(values_ms, [50, 95, 99])
+    return {'p50': round(float(p50), 2), 'p95': round(float(p95), 2), 'p99': round(float(p99), 2),
+            'mean': round(float(values_ms.mean()), 2), 'max': round(float(values_ms.max()), 2)}
+
+
+def histogram(values_ms: np.ndarray) -> list:
+    """``[upper_bound_ms, count]`` for every non-empty bucket (the last one is open-ended)."""
+    counts = np.bincount(np.searchsorted(HISTOGRAM_BOUNDS_MS, values_ms), minlength=len(HISTOGRAM_BOUNDS_MS) + 1)
+    bounds = list(np.round(HISTOGRAM_BOUNDS_MS, 2)) + [math.inf]
+    return [[float(bounds[i]), int(c)] for i, c in enumerate(counts) if c]
+
+
+def summarize(samples: list, seconds: float) -> dict:
+    latency = np.array([(s['done'] - s['scheduled']) * 1000 for s in samples])
+    service = np.array([(s['done'] - s['sent']) * 1000 for s in samples if s['sent'] is not None])
+    errors = {}
+    for s in samples:
+        if s['error']:
+            errors[s['error']] = errors.get(s['error'], 0) + 1
+    failed = sum(errors.values())
+    return {
+        'requests': len(samples),
+        'errors': failed,
+        'error_rate': round(failed / len(samples), 4) if samples else 0.0,
+        'errors_by_kind': errors,
+        'throughput_rps': round((len(samples) - failed) / seconds, 2) if seconds > 0 else None,
+        'latency_ms': latency_stats(latency),
+        'service_ms': latency_stats(service),
+        'histogram_ms': histogram(latency)
+    }
+
+
+def report_rate(rate: float, samples: list, seconds: float) -> dict:
+    result = {'target_rps': rate, 'seconds': round(seconds, 3), **summarize(samples, seconds)}
+    result['endpoints'] = {name: summarize([s for s in samples if s['endpoint'] == name], seconds)
+                           for name in sorted({s['endpoint'] for s in samples})}
+    return result
+
+
+def print_rate(result: dict, out=sys.stderr) -> None:
+    print(f"\nrate {result['target_rps']:g}/s: {result['requests']} requests, "
+          f"{result['throughput_rps']} ok/s, {result['error_rate']:.1%} errors", file=out)
+    print(f"  {'endpoint':<14} {'n':>6} {'err%':>6} {'p50':>9} {'p95':>9} {'p99':>9}", file=out)
+    for name, stats in [('all', result)] + list(result['endpoints'].items()):
+        lat = stats['latency_ms']
+        print(f"  {name:<14} {stats['requests']:>6} {stats['error_rate'] * 100:>6.1f} "
+              f"{lat.get('p50', 0):>9.1f} {lat.get('p95', 0):>9.1f} {lat.get('p99', 0):>9.1f}", file=out)
+
+
+# --- Servidor simulado -------------------------------------------------------------------------
+
+MOCK_MEDIAN_MS = {'login': 60, 'inventory': 40, 'orders': 60, 'sales': 80, 'dashboard': 120}
+MOCK_PREDICCIONES_MS = 250
+MOCK_REFRESH_MS = 3000
+
+
+class MockApi:
+    """Stand-in for the Express API: JWT-less auth, a bounded DB pool and a pool
+    of predicciones workers, with log-normal response times.
+
+    Like prediccionController.js, each of the ``workers`` serves one request
+    at a time and every ``refresh_seconds`` they are refreshed one after
+    another, each unavailable while it reloads (0 disables the refreshes).
+    """
+
+    def __init__(self, db_pool: int = 50, workers: int = 2, scale: float = 1.0,
+                 error_rate: float = 0.0, seed: int = 0, refresh_seconds: float = 300.0):
+        self.db = asyncio.Semaphore(db_pool)
+        self.workers = asyncio.Semaphore(workers)
+        self.n_workers = workers
+        self.refresh_seconds = refresh_seconds
+        self.scale = scale
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.routes = {path: name for name, path in ENDPOINTS.items()}
+        self.server = None
+        self.refresher = None
+        self.handlers = set()
+
+    def _delay(self, median_ms: float) -> float:
+        return self.rng.lognormvariate(math.log(median_ms * self.scale / 1000), 0.35)
+
+    async def _handle(self, method: str, path: str, headers: dict) -> tuple:
+        if method == 'POST' and path == '/api/auth/login':
+            async with self.db:
+                await asyncio.sleep(self._delay(MOCK_MEDIAN_MS['login']))
+            return 200, {'success': True, 'token': 'mock-token', 'user': {'role': 'manager', 'storeID': 2}}
+        name = self.routes.get(path.split('?')[0])
+        if name is None:
+            return 404, {'success': False, 'message': 'Not found'}
+        if headers.get('authorization') != 'Bearer mock-token':
+            return 401, {'success': False, 'message': 'Token requerido'}
+        if self.rng.random() < self.error_rate:
+            return 500, {'success': False, 'message': 'Mock error'}
+        if name == 'predicciones':
+            # Un worker --serve ya cargado atiende una petición a la vez.
+            async with self.workers:
+                await asyncio.sleep(self._delay(MOCK_PREDICCIONES_MS))
+            return 200, {'success': True, 'alerts': []}
+        async with self.db:
+            await asyncio.sleep(self._delay(MOCK_MEDIAN_MS[name]))
+        return 200, {'success': True, 'data': []}
+
+    async def _refresh(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_seconds)
+            for _ in range(self.n_workers):
+                async with self.workers:
+                    await asyncio.sleep(self._delay(MOCK_REFRESH_MS))
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.handlers.add(asyncio.current_task())
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode('latin-1').split(' ', 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                await reader.readexactly(int(headers.get('content-length', 0)))
+                status, payload = await self._handle(method, path, headers)
+                body = json.dumps(payload).encode()
+                writer.write(f"HTTP/1.1 {status} {'OK' if status < 400 else 'Error'}\r\n"
+                             f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+                             f"Connection: keep-alive\r\n\r\n".encode('latin-1') + body)
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            self.handlers.discard(asyncio.current_task())
+            writer.close()
+
+    async def start(self, host: str = '127.0.0.1', port: int = 0) -> str:
+        self.server = await asyncio.start_server(self._serve, host, port)
+        if self.refresh_seconds > 0:
+            self.refresher = asyncio.ensure_future(self._refresh())
+        host, port = self.server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}"
+
+    async def stop(self) -> None:
+        # Las conexiones del cliente ya se cerraron; esperar a que cada handler vea el EOF.
+        self.server.close()
+        if self.refresher is not None:
+            self.refresher.cancel()
+            await asyncio.gather(self.refresher, return_exceptions=True)
+        await asyncio.gather(*self.handlers, return_exceptions=True)
+        await self.server.wait_closed()
+
+
+# --- CLI ---------------------------------------------------------------------------------------
+
+def parse_weights(items: list) -> dict:
+    mix = {}
+    for item in items:
+        name, _, weight = item.partition('=')
+        if name not in ENDPOINTS:
+            raise argparse.ArgumentTypeError(f"Unknown endpoint {name!r}; choose from {', '.join(ENDPOINTS)}")
+        mix[name] = float(weight or 1)
+    return {name: weight for name, weight in mix.items() if weight > 0}
+
+
+def parse_paths(items: list) -> dict:
+    paths = dict(ENDPOINTS)
+    for item in items or []:
+        name, _, path = item.partition('=')
+        if name not in ENDPOINTS or not path.startswith('/'):
+            raise argparse.ArgumentTypeError(f"Expected NAME=/api/path, got {item!r}")
+        paths[name] = path
+    return paths
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Generador de carga asíncrono para la API de WuSAP.")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument('--url', default=os.getenv("WUSAP_API_URL", "http://localhost:3000"),
+                        help="Base URL of the backend.")
+    target.add_argument('--mock', action='store_true', help="Run against an in-process mock API.")
+    parser.add_argument('--email', default=os.getenv("WUSAP_LOAD_EMAIL", "store_manager@wusap.com"))
+    parser.add_argument('--password', default=os.getenv("WUSAP_LOAD_PASSWORD"))
+    parser.add_argument('--token', default=os.getenv("WUSAP_LOAD_TOKEN"), help="Use this JWT instead of logging in.")
+    parser.add_argument('--mix', nargs='+', default=[f"{k}={v}" for k, v in DEFAULT_MIX.items()],
+                        help="Endpoint weights as NAME=WEIGHT.")
+    parser.add_argument('--path', nargs='+', metavar='NAME=PATH',
+                        help="Override an endpoint's path (e.g. predicciones=/api/predicciones?top_n=5).")
+    parser.add_argument('--rate', type=float, nargs='+', default=[10.0],
+                        help="Target requests per second; several values run one after another.")
+    parser.add_argument('--duration', type=float, default=30, help="Seconds of arrivals per rate.")
+    parser.add_argument('--connections', type=int, default=100, help="Maximum concurrent connections.")
+    parser.add_argument('--timeout', type=float, default=120, help="Seconds before a request counts as failed.")
+    parser.add_argument('--uniform', action='store_true', help="Evenly spaced arrivals instead of Poisson.")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--mock-db-pool', type=int, default=50, help="With --mock: simulated HANA pool size.")
+    parser.add_argument('--mock-workers', type=int, default=2,
+                        help="With --mock: predicciones workers, like PREDICCIONES_WORKERS.")
+    parser.add_argument('--mock-refresh-seconds', type=float, default=300,
+                        help="With --mock: seconds between worker refreshes, like PREDICCIONES_REFRESH_MS "
+                             "(0: never).")
+    parser.add_argument('--mock-scale', type=float, default=1.0, help="With --mock: multiply the response times.")
+    parser.add_argument('--mock-error-rate', type=float, default=0.0, help="With --mock: fraction of 500 responses.")
+    parser.add_argument('--output', help="Write the results JSON here instead of stdout.")
+    args = parser.parse_args(argv)
+    try:
+        args.mix = parse_weights(args.mix)
+        args.paths = parse_paths(args.path)
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+    if not args.mix:
+        parser.error("--mix needs at least one endpoint with a positive weight")
+    return args
+
+
+async def run(args: argparse.Namespace) -> dict:
+    mock = None
+    url = args.url
+    if args.mock:
+        mock = MockApi(args.mock_db_pool, args.mock_workers, args.mock_scale, args.mock_error_rate, args.seed,
+                       args.mock_refresh_seconds)
+        url = await mock.start()
+    client = Client(url, args.connections, args.timeout)
+    try:
+        if args.token:
+            client.headers['Authorization'] = f"Bearer {args.token}"
+        else:
+            await client.login(args.email, args.password or ('mock' if args.mock else ''))
+        rng = random.Random(args.seed)
+        rates = []
+        for rate in args.rate:
+            samples, seconds = await run_rate(client, rate, args.duration, args.mix, args.paths, rng,
+                                              not args.uniform)
+            result = report_rate(rate, samples, seconds)
+            print_rate(result)
+            rates.append(result)
+    finally:
+        client.close()
+        if mock is not None:
+            await mock.stop()
+    return {
+        'environment': {'python': platform.python_version(), 'machine': platform.machine(), 'cpus': os.cpu_count()},
+        'config': {'url': 'mock' if args.mock else url, 'mix': args.mix, 'paths': args.paths,
+                   'duration': args.duration, 'connections': args.connections, 'timeout': args.timeout,
+                   'arrivals': 'uniform' if args.uniform else 'poisson'},
+        'rates': rates
+    }
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        results = asyncio.run(run(args))
+    except (RequestError, OSError) as e:
+        print(json.dumps({"success": False, "error": str(e)}), file=sys.stderr)
+        sys.exit(1)
+    text = json.dumps(results, indent=2) + "\n"
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    else:
+        sys.stdout.write(text)
+
+
+if __name__ == "__main__":
+    main()
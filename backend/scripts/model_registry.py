@@ -0,0 +1,131 @@
+"""Versioned store for the sales prediction model.
+
+Each version is an uncompressed joblib artifact (so it can be memory-mapped
+and shared between worker processes) plus an entry in ``registry.json``
+recording what the model was trained on: data watermark, row count,
+features and accuracy metrics.
+"""
+import os
+import json
+import time
+import datetime
+from contextlib import contextmanager
+from typing import Optional, Tuple
+
+from lean_model import export_linear, load_linear, sidecar_path
+
+INDEX_FILE = 'registry.json'
+
+
+class ModelRegistry:
+    def __init__(self, root: str, keep: int = 5):
+        self.root = root
+        self.keep = keep
+        self.index_path = os.path.join(root, INDEX_FILE)
+
+    def _read_index(self) -> dict:
+        if not os.path.exists(self.index_path):
+            return {'versions': []}
+        with open(self.index_path, encoding='utf-8') as f:
+            return json.load(f)
+
+    def _write_index(self, index: dict) -> None:
+        tmp_path = self.index_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f, indent=2, default=str)
+        os.replace(tmp_path, self.index_path)
+
+    @contextmanager
+    def _lock(self, timeout: float = 60):
+        """Serialise writers (several workers may retrain at once) with a lock file."""
+        os.makedirs(self.root, exist_ok=True)
+        lock_path = os.path.join(self.root, '.lock')
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                break
+            except FileExistsError:
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"Model registry is locked: {lock_path}")
+                time.sleep(0.1)
+        try:
+            yield
+        finally:
+            os.close(fd)
+            os.remove(lock_path)
+
+    def latest(self) -> Optional[dict]:
+        versions = self._read_index()['versions']
+        return versions[-1] if versions else None
+
+    def load(self, version: Optional[int] = None, mmap: bool = True) -> Tuple[object, dict]:
+        """Load a version (the latest by default), memory-mapping its arrays; linear
+        models come from their NumPy-only sidecar without importing sklearn."""
+        versions = self._read_index()['versions']
+        matches = [v for v in versions if version is None or v['version'] == version]
+        if not matches:
+            raise FileNotFoundError(f"Model version {version} not found in {self.root}" if version
+                                    else f"No models in {self.root}")
+        meta = matches[-1]
+        path = os.path.join(self.root, meta['artifact'])
+        model = load_linear(path)
+        if model is None:
+            import joblib
+            model = joblib.load(path, mmap_mode='r' if mmap else None)
+        return model, meta
+
+    def save(self, model, meta: dict) -> dict:
+        """Store ``model`` as a new version and return its metadata entry."""
+        import joblib
+        with self._lock():
+            index = self._read_index()
+            version = index['versions'][-1]['version'] + 1 if index['versions'] else 1
+            artifact = f'sales_predictor-v{version}.joblib'
+            joblib.dump(model, os.path.join(self.root, artifact))
+            export_linear(model, os.path.join(self.root, artifact))
+            entry = {
+                **meta,
+                'version': version,
+                'artifact': artifact,
+                'created_at': datetime.datetime.now().isoformat(timespec='seconds')
+            }
+            index['versions'].append(entry)
+            for old in index['versions'][:-self.keep]:
+                path = os.path.join(self.root, old['artifact'])
+                for stale in (path, sidecar_path(path)):
+                    if os.path.exists(stale):
+                        os.remove(stale)
+            index['versions'] = index['versions'][-self.keep:]
+            self._write_index(index)
+        return entry
+
+
+def staleness(meta: Optional[dict], watermark: dict, features: list,
+              drift_threshold: float = 0.1, max_age_days: Optional[float] = None,
+              estimator: Optional[str] = None) -> Optional[str]:
+    """Why the model described by ``meta`` should be retrained, or None if it is fresh.
+
+    ``watermark`` describes the data available now (rows, max_sale_day,
+    granularity); the model is stale once the rows added since it was trained
+    exceed ``drift_threshold`` of its training rows.
+    """
+    if meta is None:
+        return "no model in registry"
+    if meta.get('features') != features:
+        return "feature list changed"
+    if estimator is not None and meta.get('estimator') != estimator:
+        return "estimator changed"
+    if meta.get('granularity') != watermark.get('granularity'):
+        return "training data granularity changed"
+    trained_rows = meta.get('rows') or 0
+    new_rows = watermark['rows'] - trained_rows
+    if new_rows < 0:
+        return "sales history shrank"
+    if trained_rows == 0 or new_rows / trained_rows > drift_threshold:
+        return f"{new_rows} new rows since training (> {drift_threshold:.0%})"
+    if max_age_days is not None:
+        created = datetime.datetime.fromisoformat(meta['created_at'])
+        if (datetime.datetime.now() - created).total_seconds() > max_age_days * 86400:
+            return f"model older than {max_age_days} days"
+    return None
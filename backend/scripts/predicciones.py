@@ -1,54 +1,160 @@
 import os
+import re
 import json
+import time
+import argparse
 import datetime
 import sys
-import joblib
 import numpy as np
 import pandas as pd
 from dotenv import load_dotenv
-from typing import Dict
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.linear_model import LinearRegression
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import mean_absolute_error, r2_score
-from hdbcli import dbapi
+from typing import Dict, Optional
+
+# sklearn, joblib, hdbcli y segmented_model se importan donde se usan: una
+# corrida que sólo carga el modelo y predice no paga su tiempo de importación.
+import standin_db
+from connection_pool import ConnectionPool, extract_concurrently
+from sales_cache import SalesCache
+from feature_store import DEMAND_FEATURES, FeatureStore, attach, demand_matrix, origin_features
+from model_registry import ModelRegistry, staleness
+from result_cache import ResultCache
+from columnar_fetch import fetch_columns
+from instrumentation import RunMetrics, activate, emit, profiled, stage
+from lean_model import export_linear, load_model
+from replenishment import WAREHOUSE_STORE_ID, suggest_orders, write_draft_orders
+
+MODEL_PATH = os.getenv("PREDICCIONES_MODEL_PATH", "sales_predictor.joblib")
+FEATURE_COLUMNS = ['PRODUCTID', 'STOREID', 'day_of_week', 'day', 'month', 'year', 'weekofyear', 'is_weekend']
+FORECAST_CHUNK_ROWS = 250_000
+SALES_CHUNK_ROWS = 200_000
+SALES_DTYPES = {'SALEITEMID': 'int64', 'SALEID': 'int64', 'PRODUCTID': 'int64', 'PRODUCTNAME': 'str',
+                'STOREID': 'int64', 'SALEDAY': 'datetime64[us]', 'QUANTITY_SOLD': 'float64'}
+# IDs en el entero sin signo más chico que los contenga, cantidades en float32.
+COMPACT_SALES_DTYPES = {'SALEITEMID': 'uint', 'SALEID': 'uint', 'PRODUCTID': 'uint', 'STOREID': 'uint',
+                        'SALEDAY': 'datetime64[us]', 'QUANTITY_SOLD': 'float32'}
+THRESHOLD_COLUMNS = ['LOW', 'MED', 'HIGH']
+PRIORITY_LABELS = np.array(['Default', 'Baja', 'Media', 'Alta'])
+ALERT_COLUMNS = ['PRODUCTID', 'PRODUCTNAME', 'STOREID', 'STORENAME', 'predicted_quantity', 'QUANTITY', 'diff', 'priority']
 
-from hdbcli import dbapi
 
 def load_env() -> Dict[str, str]:
     """Load environment variables for SAP HANA DB connection."""
     load_dotenv()
     server_node = os.getenv("HANA_SERVER_NODE", "localhost:30015")
     host, port = server_node.split(":")
+    sqlite_path = os.getenv("PREDICCIONES_SQLITE", "")
     return {
         'host': host,
         'port': int(port),
         'user': os.getenv("HANA_USER", "SYSTEM"),
         'password': os.getenv("HANA_PASSWORD", ""),
-        'schema': os.getenv("HANA_SCHEMA", "")
+        'schema': os.getenv("HANA_SCHEMA", "WUSAP" if sqlite_path else ""),
+        'sqlite': sqlite_path
     }
 
-def get_connection(db_config: Dict[str, str]):
-    """Establish connection to SAP HANA database."""
-    try:
-        return dbapi.connect(
-            address=db_config['host'],
-            port=db_config['port'],
-            user=db_config['user'],
-            password=db_config['password']
-        )
-    except dbapi.Error as err:
-        print(f"Connection Error: {err}", file=sys.stderr)
-        exit(1)
-
-
-def get_sales_data(conn, schema: str) -> pd.DataFrame:
+def open_connection(db_config: Dict[str, str]):
+    """Connect to SAP HANA (or the local SQLite stand-in), raising on failure."""
+    if db_config.get('sqlite'):
+        return standin_db.connect(db_config['sqlite'])
+    from hdbcli import dbapi
+    return dbapi.connect(
+        address=db_config['host'],
+        port=db_config['port'],
+        user=db_config['user'],
+        password=db_config['password']
+    )
+
+
+def get_connection_pool(db_config: Dict[str, str], size: int = 4, timeout: float = 30.0) -> ConnectionPool:
+    """Pool of reusable connections; connection errors are raised on first use."""
+    return ConnectionPool(lambda: open_connection(db_config), size, timeout)
+
+
+def read_sql(query: str, conn, params=None, dtypes: Optional[Dict[str, str]] = None,
+             label: str = 'query', batch_rows: int = SALES_CHUNK_ROWS) -> pd.DataFrame:
+    """pd.read_sql with HANA's upper-case folding of unquoted column aliases.
+
+    With ``dtypes`` (column -> dtype) the rows are fetched straight into typed
+    columns instead (see columnar_fetch), in batches of ``batch_rows``.
+    """
+    if dtypes is not None:
+        return fetch_columns(conn, query, dtypes, params, batch_rows, label)
+    df = pd.read_sql(query, conn, params=params)
+    df.columns = [c.upper() for c in df.columns]
+    return df
+
+
+def frame_mb(df: pd.DataFrame) -> float:
+    return round(df.memory_usage(deep=True).sum() / 2 ** 20, 2)
+
+
+def _sale_id_filter(min_sale_id: Optional[int], max_sale_id: Optional[int]) -> list:
+    conditions = []
+    if min_sale_id is not None:
+        conditions.append(f'S."SALEID" > {int(min_sale_id)}')
+    if max_sale_id is not None:
+        conditions.append(f'S."SALEID" <= {int(max_sale_id)}')
+    return conditions
+
+
+def get_sales_data(conn, schema: str, min_sale_id: Optional[int] = None,
+                   max_sale_id: Optional[int] = None, compact: bool = False,
+                   chunksize: int = SALES_CHUNK_ROWS) -> pd.DataFrame:
+    """One row per sale item, optionally limited to ``min_sale_id < SALEID <= max_sale_id``.
+
+    ``compact`` leaves the product name out of the query (alerts take names
+    from get_product_names) and downcasts each fetched batch into
+    COMPACT_SALES_DTYPES.
+    """
     schema = schema.upper()  
+    conditions = _sale_id_filter(min_sale_id, max_sale_id)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+    name = '' if compact else 'P."NAME" AS PRODUCTNAME,'
+    products_join = '' if compact else f'JOIN "{schema}"."PRODUCTS" P ON I."PRODUCTID" = P."PRODUCTID"'
+    name_group = '' if compact else ' P."NAME",'
     query = f"""
         SELECT
             SI."SALEITEMID",
+            S."SALEID",
+            I."PRODUCTID",
+            {name}
+            E."STOREID",
+            TO_DATE(S."SALEDATE") AS SALEDAY,
+            SUM(SI."QUANTITY") AS QUANTITY_SOLD
+        FROM "{schema}"."SALEITEMS" SI
+        JOIN "{schema}"."SALE" S ON SI."SALEID" = S."SALEID"
+        JOIN "{schema}"."EMPLOYEES" E ON S."EMPLOYEEID" = E."EMPLOYEEID"
+        JOIN "{schema}"."INVENTORY" I ON SI."INVENTORYID" = I."INVENTORYID"
+        {products_join}
+        {where}
+        GROUP BY SI."SALEITEMID", S."SALEID", I."PRODUCTID",{name_group} E."STOREID", TO_DATE(S."SALEDATE")
+        ORDER BY SALEDAY
+    """
+    return read_sql(query, conn, dtypes=COMPACT_SALES_DTYPES if compact else SALES_DTYPES, label='sales',
+                    batch_rows=chunksize)
+
+
+def get_daily_sales(conn, schema: str, start: Optional[datetime.date] = None,
+                    end: Optional[datetime.date] = None, max_sale_id: Optional[int] = None,
+                    compact: bool = False, chunksize: int = SALES_CHUNK_ROWS) -> pd.DataFrame:
+    """Units sold per (PRODUCTID, STOREID, SALEDAY), aggregated in the database.
+
+    ``start``/``end`` bound SALEDAY inclusively. Product names are not carried
+    here; they come from get_product_names().
+    """
+    schema = schema.upper()
+    conditions = _sale_id_filter(None, max_sale_id)
+    params = []
+    if start is not None:
+        conditions.append('S."SALEDATE" >= ?')
+        params.append(str(start))
+    if end is not None:
+        conditions.append('S."SALEDATE" < ?')
+        params.append(str(end + datetime.timedelta(days=1)))
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+    query = f"""
+        SELECT
             I."PRODUCTID",
-            P."NAME" AS PRODUCTNAME,
             E."STOREID",
             TO_DATE(S."SALEDATE") AS SALEDAY,
             SUM(SI."QUANTITY") AS QUANTITY_SOLD
@@ -56,33 +162,156 @@ def get_sales_data(conn, schema: str) -> pd.DataFrame:
         JOIN "{schema}"."SALE" S ON SI."SALEID" = S."SALEID"
         JOIN "{schema}"."EMPLOYEES" E ON S."EMPLOYEEID" = E."EMPLOYEEID"
         JOIN "{schema}"."INVENTORY" I ON SI."INVENTORYID" = I."INVENTORYID"
-        JOIN "{schema}"."PRODUCTS" P ON I."PRODUCTID" = P."PRODUCTID"
-        GROUP BY SI."SALEITEMID", I."PRODUCTID", P."NAME", E."STOREID", TO_DATE(S."SALEDATE")
+        {where}
+        GROUP BY I."PRODUCTID", E."STOREID", TO_DATE(S."SALEDATE")
         ORDER BY SALEDAY
     """
-    return pd.read_sql(query, conn)
+    return read_sql(query, conn, params=params or None, dtypes=COMPACT_SALES_DTYPES if compact else SALES_DTYPES,
+                    label='daily_sales', batch_rows=chunksize)
+
+
+def get_sales_watermark(conn, schema: str, upto_sale_id: int = 0) -> Dict[str, object]:
+    """Current max SALEID, the number of sale items at or below ``upto_sale_id``
+    and the earliest sale day among the sales after it.
+
+    The item count lets a cache detect deleted or back-filled sales below its
+    high-water mark, which a max-ID comparison alone would miss.
+    """
+    schema = schema.upper()
+    upto = int(upto_sale_id)
+    df = read_sql(f"""
+        SELECT
+            (SELECT MAX("SALEID") FROM "{schema}"."SALE") AS MAX_SALE_ID,
+            (SELECT COUNT(*) FROM "{schema}"."SALEITEMS" WHERE "SALEID" <= {upto}) AS ITEMS,
+            (SELECT MIN(TO_DATE("SALEDATE")) FROM "{schema}"."SALE" WHERE "SALEID" > {upto}) AS MIN_NEW_DAY
+        FROM "{schema}"."SALE" LIMIT 1
+    """, conn)
+    if df.empty:
+        return {'max_sale_id': 0, 'items': 0, 'min_new_day': None}
+    row = df.iloc[0]
+    min_new_day = pd.to_datetime(row['MIN_NEW_DAY']) if pd.notna(row['MIN_NEW_DAY']) else None
+    return {
+        'max_sale_id': int(row['MAX_SALE_ID'] or 0),
+        'items': int(row['ITEMS'] or 0),
+        'min_new_day': min_new_day
+    }
+
+
+def get_sales_data_incremental(conn, schema: str, cache: SalesCache, rebuild: bool = False,
+                               daily: bool = False, compact: bool = False) -> pd.DataFrame:
+    """Preprocessed sales frame served from ``cache``, fetching only rows past its watermark.
+
+    Item-level frames append the sales after the cached SALEID. Daily frames
+    re-aggregate every day from the earliest new sale on, so late sales for an
+    already cached day are folded in. The cache is rebuilt from scratch when
+    asked to, when it is missing, or when the rows below the watermark no
+    longer match (sales deleted or tables reset).
+    """
+    if rebuild:
+        cache.invalidate()
+    cached, meta = cache.load()
+    if cached is not None and meta.get('schema') == schema.upper():
+        wm = meta['max_sale_id']
+        current = get_sales_watermark(conn, schema, wm)
+        if current['max_sale_id'] >= wm and current['items'] == meta['items']:
+            if current['max_sale_id'] == wm:
+                return cached
+            if daily:
+                since = current['min_new_day']
+                delta = get_daily_sales(conn, schema, start=since.date(), max_sale_id=current['max_sale_id'],
+                                        compact=compact)
+                cached = cached[cached['SALEDAY'] < since]
+            else:
+                delta = get_sales_data(conn, schema, min_sale_id=wm, max_sale_id=current['max_sale_id'],
+                                       compact=compact)
+            delta = preprocess_sales_data(delta, compact)
+            print(f"Sales cache: {len(delta)} new rows after SALEID {wm}.", file=sys.stderr)
+            df = pd.concat([cached, delta], ignore_index=True).sort_values('SALEDAY', kind='stable', ignore_index=True)
+            _save_sales_cache(cache, df, schema, conn, current['max_sale_id'])
+            return df
+        print("Sales cache no longer matches the database; rebuilding.", file=sys.stderr)
+        cache.invalidate()
+
+    wm = get_sales_watermark(conn, schema)['max_sale_id']
+    if daily:
+        df = get_daily_sales(conn, schema, max_sale_id=wm, compact=compact)
+    else:
+        df = get_sales_data(conn, schema, max_sale_id=wm, compact=compact)
+    df = preprocess_sales_data(df, compact)
+    _save_sales_cache(cache, df, schema, conn, wm)
+    print(f"Sales cache rebuilt with {len(df)} rows.", file=sys.stderr)
+    return df
+
+
+def _save_sales_cache(cache: SalesCache, df: pd.DataFrame, schema: str, conn, max_sale_id: int) -> None:
+    cache.save(df, {
+        'schema': schema.upper(),
+        'max_sale_id': max_sale_id,
+        'max_sale_day': df['SALEDAY'].max() if len(df) else None,
+        'items': get_sales_watermark(conn, schema, max_sale_id)['items']
+    })
 
 
+def get_data_watermark(conn, schema: str) -> Dict[str, Optional[int]]:
+    """Cheap fingerprint of the sales and inventory tables.
+
+    Any new sale, deleted sale item or inventory change moves at least one of
+    these numbers, so cached results keyed on it go stale automatically.
+    """
+    schema = schema.upper()
+    df = read_sql(f"""
+        SELECT
+            (SELECT MAX("SALEID") FROM "{schema}"."SALE") AS MAX_SALE_ID,
+            (SELECT COUNT(*) FROM "{schema}"."SALEITEMS") AS SALE_ITEMS,
+            (SELECT COUNT(*) FROM "{schema}"."INVENTORY") AS INVENTORY_ROWS,
+            (SELECT SUM("QUANTITY") FROM "{schema}"."INVENTORY") AS INVENTORY_QUANTITY,
+            (SELECT SUM(CAST("QUANTITY" AS BIGINT) * "INVENTORYID") FROM "{schema}"."INVENTORY") AS INVENTORY_CHECKSUM
+        FROM DUMMY
+    """, conn)
+    return {name.lower(): None if pd.isna(value) else int(value) for name, value in df.iloc[0].items()}
 
 
 def get_inventory(conn) -> pd.DataFrame:
-    return pd.read_sql("SELECT PRODUCTID, STOREID, QUANTITY FROM WUSAP.INVENTORY", conn)
+    return read_sql("SELECT PRODUCTID, STOREID, QUANTITY FROM WUSAP.INVENTORY", conn,
+                    dtypes={'PRODUCTID': 'int64', 'STOREID': 'int64', 'QUANTITY': 'int64'}, label='inventory')
 
 
-def preprocess_sales_data(df: pd.DataFrame) -> pd.DataFrame:
-    df['SALEDAY'] = pd.to_datetime(df['SALEDAY'])
-    df['day_of_week'] = df['SALEDAY'].dt.dayofweek
-    df['day'] = df['SALEDAY'].dt.day
-    df['month'] = df['SALEDAY'].dt.month
-    df['year'] = df['SALEDAY'].dt.year
-    df['weekofyear'] = df['SALEDAY'].dt.isocalendar().week
-    df['is_weekend'] = df['day_of_week'].isin([5, 6]).astype(int)
+def preprocess_sales_data(df: pd.DataFrame, compact: bool = False) -> pd.DataFrame:
+    """Add the calendar features; ``compact`` stores them as 8/16-bit integers."""
+    with stage('preprocess') as info:
+        df['SALEDAY'] = pd.to_datetime(df['SALEDAY'])
+        df['day_of_week'] = df['SALEDAY'].dt.dayofweek
+        df['day'] = df['SALEDAY'].dt.day
+        df['month'] = df['SALEDAY'].dt.month
+        df['year'] = df['SALEDAY'].dt.year
+        df['weekofyear'] = df['SALEDAY'].dt.isocalendar().week
+        df['is_weekend'] = df['day_of_week'].isin([5, 6]).astype(int)
+        if compact:
+            df = df.astype({'day_of_week': np.uint8, 'day': np.uint8, 'month': np.uint8, 'year': np.uint16,
+                            'weekofyear': np.uint8, 'is_weekend': np.uint8})
+        info['rows'] = len(df)
     return df
 
 
 
-def train_model(df: pd.DataFrame) -> LinearRegression:
-    X = df[['PRODUCTID', 'STOREID', 'day_of_week', 'day', 'month', 'year', 'weekofyear', 'is_weekend']]
+def feature_columns(df: pd.DataFrame) -> list:
+    """FEATURE_COLUMNS, plus the demand features when the frame carries them."""
+    if set(DEMAND_FEATURES) <= set(df.columns):
+        return FEATURE_COLUMNS + DEMAND_FEATURES
+    return FEATURE_COLUMNS
+
+
+def uses_demand_features(model) -> bool:
+    return DEMAND_FEATURES[0] in getattr(model, 'feature_names_in_', ())
+
+
+def fit_model(df: pd.DataFrame):
+    """Fit the model and return it with its hold-out accuracy metrics."""
+    from sklearn.linear_model import LinearRegression
+    from sklearn.model_selection import train_test_split
+    from sklearn.metrics import mean_absolute_error, r2_score
+
+    X = df[feature_columns(df)]
     y = np.log1p(df['QUANTITY_SOLD']) 
     
     # Revisa si hay NaNs
@@ -99,65 +328,197 @@ def train_model(df: pd.DataFrame) -> LinearRegression:
 
     X_train, X_test, y_train, y_test = train_test_split(X, y, random_state=42)
 
+    started = time.perf_counter()
     model = LinearRegression()
     model.fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - started
 
     y_pred_log = model.predict(X_test)
     y_test_orig = np.expm1(y_test)
     y_pred_orig = np.expm1(y_pred_log)
+    metrics = {
+        'mae': float(mean_absolute_error(y_test_orig, y_pred_orig)),
+        'r2': float(r2_score(y_test_orig, y_pred_orig)),
+        'train_rows': len(X_train),
+        'test_rows': len(X_test),
+        'fit_seconds': round(fit_seconds, 4)
+    }
 
     print("=== Model Accuracy ===", file=sys.stderr)
-    print(f"MAE: {mean_absolute_error(y_test_orig, y_pred_orig):.2f}", file=sys.stderr)
-    print(f"R² Score: {r2_score(y_test_orig, y_pred_orig):.2f}", file=sys.stderr)
+    print(f"MAE: {metrics['mae']:.2f}", file=sys.stderr)
+    print(f"R² Score: {metrics['r2']:.2f}", file=sys.stderr)
 
-    return model
+    return model, metrics
 
 
-def predict_next_7_days(model, df):
-    today = datetime.date.today()
-    future_data = []
+def train_model(df: pd.DataFrame):
+    return fit_model(df)[0]
+
+
+def estimator_name(args: argparse.Namespace) -> str:
+    if args.segment_by:
+        return f"SegmentedModel[{args.segment_by}:{args.segment_estimator}]"
+    return 'LinearRegression'
+
+
+def fit_args_model(df: pd.DataFrame, args: argparse.Namespace):
+    """fit_model(), or a segmented model on a process pool when --segment-by is set."""
+    if not args.segment_by:
+        return fit_model(df)
+    from segmented_model import fit_segmented
+    return fit_segmented(df, feature_columns(df), args.segment_by, args.segment_estimator,
+                         args.min_segment_rows, args.n_jobs, args.n_clusters, global_fit=fit_model)
+
+
+def forecast_ids(df: pd.DataFrame, products=None, stores=None):
+    """Product and store IDs to forecast, in order of first appearance in ``df``."""
+    product_ids = df['PRODUCTID'].dropna().unique().astype(np.int64)
+    store_ids = df['STOREID'].dropna().unique().astype(np.int64)
+    if products is not None:
+        product_ids = product_ids[np.isin(product_ids, list(products))]
+    if stores is not None:
+        store_ids = store_ids[np.isin(store_ids, list(stores))]
+    return product_ids, store_ids
+
+
+def build_forecast_grid(product_ids, store_ids, start: datetime.date, horizon: int = 7,
+                        rows: Optional[slice] = None, demand: Optional[np.ndarray] = None) -> pd.DataFrame:
+    """Feature rows for every (day, product, store), day-major, without Python loops.
+
+    The grid is never materialised as a whole: ``rows`` selects a slice of it
+    and each row's day/product/store is derived from its index. ``demand``
+    holds the demand features of each pair (see feature_store.demand_matrix).
+    """
+    product_ids = np.asarray(product_ids, dtype=np.int64)
+    store_ids = np.asarray(store_ids, dtype=np.int64)
+    n_pairs = len(product_ids) * len(store_ids)
+    total = horizon * n_pairs
+    rows = rows or slice(0, total)
+    index = np.arange(rows.start, min(rows.stop, total), dtype=np.int64)
+    day_idx, pair_idx = np.divmod(index, max(n_pairs, 1))
+    product_idx, store_idx = np.divmod(pair_idx, max(len(store_ids), 1))
+
+    days = pd.date_range(start, periods=horizon, freq='D')
+    day_of_week = days.dayofweek.to_numpy(dtype=np.int64)
+    calendar = {
+        'day_of_week': day_of_week,
+        'day': days.day.to_numpy(dtype=np.int64),
+        'month': days.month.to_numpy(dtype=np.int64),
+        'year': days.year.to_numpy(dtype=np.int64),
+        'weekofyear': days.isocalendar().week.to_numpy(dtype=np.int64),
+        'is_weekend': (day_of_week >= 5).astype(np.int64)
+    }
+    grid = {'PRODUCTID': product_ids[product_idx], 'STOREID': store_ids[store_idx]}
+    grid.update({name: values[day_idx] for name, values in calendar.items()})
+    if demand is None:
+        return pd.DataFrame(grid, columns=FEATURE_COLUMNS)
+    grid.update({name: demand[pair_idx, i] for i, name in enumerate(DEMAND_FEATURES)})
+    return pd.DataFrame(grid, columns=FEATURE_COLUMNS + DEMAND_FEATURES)
 
-    product_ids = df['PRODUCTID'].dropna().unique()
-    store_ids = df['STOREID'].dropna().unique()
 
-    for i in range(1, 8):
-        day = today + datetime.timedelta(days=i)
-        for product_id in product_ids:
-            for store_id in store_ids:
-                future_data.append({
-                    'PRODUCTID': int(product_id),
-                    'STOREID': int(store_id),
-                    'day_of_week': day.weekday(),
-                    'day': day.day,
-                    'month': day.month,
-                    'year': day.year,
-                    'weekofyear': day.isocalendar()[1],
-                    'is_weekend': int(day.weekday() in [5, 6])
-                })
+def iter_forecast(model, product_ids, store_ids, start: datetime.date, horizon: int = 7,
+                  chunk_rows: int = FORECAST_CHUNK_ROWS, demand: Optional[pd.DataFrame] = None):
+    """Yield predicted grid chunks of at most ``chunk_rows`` rows, in grid order.
+
+    ``demand`` is the feature store's origin frame; every day of the horizon
+    uses each pair's features as of the day after its last known sale.
+    """
+    total = horizon * len(product_ids) * len(store_ids)
+    values = demand_matrix(demand, product_ids, store_ids) if demand is not None else None
+    for first in range(0, total, chunk_rows):
+        with stage('grid_build') as info:
+            chunk = build_forecast_grid(product_ids, store_ids, start, horizon, slice(first, first + chunk_rows),
+                                        values)
+            info['rows'] = len(chunk)
+        with stage('predict') as info:
+            chunk['predicted_quantity'] = np.expm1(model.predict(chunk)).round(2)
+            info['rows'] = len(chunk)
+        yield chunk
+
 
-    future_df = pd.DataFrame(future_data)
+def forecast_start() -> datetime.date:
+    return datetime.date.today() + datetime.timedelta(days=1)
 
-    # Check for NaNs
-    if future_df.isna().any().any():
-        print("Warning: NaNs found in future_df before prediction", file=sys.stderr)
-        print(future_df.isna().sum(), file=sys.stderr)
-        future_df = future_df.fillna(0)  # o decide qué hacer
 
-    # Convert types
-    cols = ['PRODUCTID', 'STOREID', 'day_of_week', 'day', 'month', 'year', 'weekofyear', 'is_weekend']
-    future_df[cols] = future_df[cols].astype(int)
+def predict_demand(model, df: pd.DataFrame, horizon: int = 7, start: Optional[datetime.date] = None,
+                   products=None, stores=None, chunk_rows: int = FORECAST_CHUNK_ROWS,
+                   demand: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """Predicted quantity for each (day, product, store) over ``horizon`` days from ``start``
+    (tomorrow by default), optionally restricted to some products/stores."""
+    start = start or forecast_start()
+    product_ids, store_ids = forecast_ids(df, products, stores)
+    chunks = list(iter_forecast(model, product_ids, store_ids, start, horizon, chunk_rows, demand))
+    if not chunks:
+        columns = FEATURE_COLUMNS + (DEMAND_FEATURES if demand is not None else [])
+        return pd.DataFrame(columns=columns + ['predicted_quantity'])
+    return pd.concat(chunks, ignore_index=True)
 
-    future_df['predicted_quantity'] = np.expm1(model.predict(future_df)).round(2)
-    return future_df
 
+def predict_next_7_days(model, df):
+    return predict_demand(model, df, horizon=7)
 
 
 def get_product_names(conn) -> pd.DataFrame:
-    return pd.read_sql("SELECT PRODUCTID, name AS PRODUCTNAME FROM WUSAP.Products", conn)
+    return read_sql("SELECT PRODUCTID, name AS PRODUCTNAME FROM WUSAP.Products", conn,
+                    dtypes={'PRODUCTID': 'int64', 'PRODUCTNAME': 'str'}, label='products')
+
+
+def get_product_prices(conn) -> pd.DataFrame:
+    return read_sql("SELECT PRODUCTID, suggestedPrice FROM WUSAP.Products", conn,
+                    dtypes={'PRODUCTID': 'int64', 'SUGGESTEDPRICE': 'float64'}, label='prices')
 
 
 def get_store_names(conn) -> pd.DataFrame:
-    return pd.read_sql("SELECT STOREID, name AS storeName FROM WUSAP.Locations", conn)
+    return read_sql("SELECT STOREID, name AS storeName FROM WUSAP.Locations", conn,
+                    dtypes={'STOREID': 'int64', 'STORENAME': 'str'}, label='stores')
+
+
+def normalize_thresholds(df: pd.DataFrame) -> pd.DataFrame:
+    """Threshold table with PRODUCTID/STOREID keys (NaN = any) and LOW/MED/HIGH limits.
+
+    A row with both keys applies to that pair, one with only PRODUCTID to the
+    product in every store, one with only STOREID to every product in that
+    store. Missing limits fall back to the next, less specific level.
+    """
+    df = df.copy()
+    df.columns = [str(c).upper() for c in df.columns]
+    for col in ['PRODUCTID', 'STOREID'] + THRESHOLD_COLUMNS:
+        if col not in df.columns:
+            df[col] = np.nan
+    return df[['PRODUCTID', 'STOREID'] + THRESHOLD_COLUMNS].astype(float)
+
+
+def load_thresholds(path: str) -> pd.DataFrame:
+    """Read a threshold table from a CSV or JSON (records) file."""
+    df = pd.read_json(path) if path.lower().endswith('.json') else pd.read_csv(path)
+    return normalize_thresholds(df)
+
+
+def get_thresholds(conn, table: str) -> pd.DataFrame:
+    """Read a threshold table stored in the database (e.g. ``WUSAP.ALERTTHRESHOLDS``)."""
+    if not re.fullmatch(r'[A-Za-z_][\w.]*', table):
+        raise ValueError(f"Invalid thresholds table name: {table}")
+    return normalize_thresholds(read_sql(f"SELECT * FROM {table}", conn))
+
+
+def resolve_thresholds(pairs: pd.DataFrame, thresholds: pd.DataFrame, defaults: Dict[str, float]) -> pd.DataFrame:
+    """LOW/MED/HIGH limits for each (PRODUCTID, STOREID) row of ``pairs``, most specific first."""
+    limits = pd.DataFrame(np.nan, index=pairs.index, columns=THRESHOLD_COLUMNS)
+    has_product = thresholds['PRODUCTID'].notna()
+    has_store = thresholds['STOREID'].notna()
+    levels = [
+        (has_product & has_store, ['PRODUCTID', 'STOREID']),
+        (has_product & ~has_store, ['PRODUCTID']),
+        (~has_product & has_store, ['STOREID'])
+    ]
+    for mask, keys in levels:
+        if not mask.any():
+            continue
+        table = thresholds.loc[mask, keys + THRESHOLD_COLUMNS].drop_duplicates(keys, keep='last')
+        table[keys] = table[keys].astype(np.int64)
+        matched = pairs[keys].astype(np.int64).merge(table, on=keys, how='left')
+        limits = limits.fillna(matched[THRESHOLD_COLUMNS].set_axis(pairs.index))
+    return limits.fillna(defaults)
 
 
 def generate_alerts(
@@ -167,70 +528,703 @@ def generate_alerts(
     stores_df: pd.DataFrame,
     low_threshold: int = 0,
     med_threshold: int = 5,
-    high_threshold: int = 10
+    high_threshold: int = 10,
+    thresholds: Optional[pd.DataFrame] = None,
+    stores=None,
+    top_n: Optional[int] = None,
+    priorities=None
 ) -> pd.DataFrame:
+    """Classify every (product, store) pair in one vectorized pass.
 
+    ``thresholds`` overrides the global limits per product/store (see
+    normalize_thresholds), ``stores`` keeps only those stores, ``priorities``
+    only those labels and ``top_n`` the most urgent pairs of each store (by
+    priority, then diff).
+    """
     alert_df = future_df.groupby(['PRODUCTID', 'STOREID'])['predicted_quantity'].sum().reset_index()
+    if stores is not None:
+        alert_df = alert_df[alert_df['STOREID'].isin(list(stores))].reset_index(drop=True)
     alert_df = alert_df.merge(inv_df, on=['PRODUCTID', 'STOREID'], how='left').fillna({'QUANTITY': 0})
     alert_df['diff'] = alert_df['predicted_quantity'] - alert_df['QUANTITY']
 
-    def priority(diff):
-        if diff > high_threshold:
-            return 'Alta'
-        elif diff > med_threshold:
-            return 'Media'
-        elif diff > low_threshold:
-            return 'Baja'
-        else:
-            return 'Default'
-
-    alert_df['priority'] = alert_df['diff'].apply(priority)
-    
-    alerts = alert_df[alert_df['priority'] != 'Default']
+    if thresholds is not None and len(thresholds):
+        limits = resolve_thresholds(alert_df, thresholds,
+                                    {'LOW': low_threshold, 'MED': med_threshold, 'HIGH': high_threshold})
+        low, med, high = (limits[col].to_numpy() for col in THRESHOLD_COLUMNS)
+    else:
+        low, med, high = low_threshold, med_threshold, high_threshold
 
-    alerts = alerts.merge(products_df, on='PRODUCTID', how='left')
-    alerts = alerts.merge(stores_df, on='STOREID', how='left')
-    return alerts[['PRODUCTID', 'PRODUCTNAME', 'STOREID', 'STORENAME', 'predicted_quantity', 'QUANTITY', 'diff', 'priority']]
+    diff = alert_df['diff'].to_numpy()
+    level = np.select([diff > high, diff > med, diff > low], [3, 2, 1], 0)
+    flagged = level > 0
+    if priorities is not None:
+        flagged &= np.isin(PRIORITY_LABELS[level], list(priorities))
+    alerts = alert_df[flagged].copy()
+    alerts['priority'] = PRIORITY_LABELS[level[flagged]]
 
+    if top_n is not None:
+        alerts['_level'] = level[flagged]
+        alerts = (alerts.sort_values(['STOREID', '_level', 'diff'], ascending=[True, False, False], kind='stable')
+                  .groupby('STOREID', sort=False).head(top_n)
+                  .drop(columns='_level'))
+
+    alerts['PRODUCTNAME'] = alerts['PRODUCTID'].map(products_df.set_index('PRODUCTID')['PRODUCTNAME'])
+    alerts['STORENAME'] = alerts['STOREID'].map(stores_df.set_index('STOREID')['STORENAME'])
+    return alerts[ALERT_COLUMNS].reset_index(drop=True)
 
-def main():
-    db_config = load_env()
-    conn = get_connection(db_config)
 
+def load_frames(pool: ConnectionPool, schema: str, cache: Optional[SalesCache] = None, rebuild_cache: bool = False,
+                daily: bool = False, since: Optional[datetime.date] = None,
+                until: Optional[datetime.date] = None, thresholds_table: Optional[str] = None,
+                timeout: Optional[float] = None, compact: bool = False,
+                chunksize: int = SALES_CHUNK_ROWS, features: Optional[FeatureStore] = None) -> Dict[str, pd.DataFrame]:
+    """Extract and preprocess every frame the forecast needs.
+
+    The queries run concurrently, each on its own pooled connection, so the
+    extraction takes about as long as the slowest one. With a ``cache`` the
+    sales frame is extracted incrementally; with ``daily`` it holds one row
+    per product, store and day. ``since``/``until`` limit the sales history
+    (pushed into the query unless it is served from the cache). ``compact``
+    fetches the sales ``chunksize`` rows at a time and downcasts each batch
+    into small dtypes, without names.
+    With a ``features`` store the sales rows get their demand features and
+    ``frames['demand']`` holds each pair's features for the forecast.
+    """
+    def sales(conn):
+        if cache is not None:
+            sales_df = get_sales_data_incremental(conn, schema, cache, rebuild=rebuild_cache, daily=daily,
+                                                  compact=compact)
+            if since is not None:
+                sales_df = sales_df[sales_df['SALEDAY'] >= pd.Timestamp(since)]
+            if until is not None:
+                sales_df = sales_df[sales_df['SALEDAY'] <= pd.Timestamp(until)]
+            return sales_df
+        if daily:
+            return preprocess_sales_data(get_daily_sales(conn, schema, since, until, compact=compact,
+                                                         chunksize=chunksize), compact)
+        return preprocess_sales_data(get_sales_data(conn, schema, compact=compact, chunksize=chunksize), compact)
+
+    jobs = {
+        'sales': sales,
+        'inventory': get_inventory,
+        'products': get_product_names,
+        'stores': get_store_names
+    }
+    if thresholds_table:
+        jobs['thresholds'] = lambda conn: get_thresholds(conn, thresholds_table)
+
+    def timed(name, job):
+        def run(conn):
+            with stage(f'extract.{name}') as info:
+                df = job(conn)
+                info['rows'] = len(df)
+            return df
+        return run
+
+    with stage('extract') as info:
+        frames = extract_concurrently(pool, {name: timed(name, job) for name, job in jobs.items()}, timeout)
+        info['rows'] = sum(len(df) for df in frames.values())
+        info['sales_frame_mb'] = frame_mb(frames['sales'])
+    if compact:
+        print(f"Sales frame: {len(frames['sales'])} rows, {info['sales_frame_mb']} MB.", file=sys.stderr)
+    if features is not None:
+        with stage('features') as info:
+            table = features.update(frames['sales'], rebuild=rebuild_cache)
+            frames['sales'] = attach(frames['sales'], table)
+            frames['demand'] = origin_features(table)
+            info['rows'] = len(table)
+    return frames
+
+
+def load_or_train_model(sales_df: pd.DataFrame, model_path: str = MODEL_PATH,
+                        args: Optional[argparse.Namespace] = None):
+    if os.path.exists(model_path):
+        model = load_model(model_path)
+        print("Loaded existing model.",  file=sys.stderr)
+    else:
+        import joblib
+        model = fit_args_model(sales_df, args)[0] if args is not None else train_model(sales_df)
+        joblib.dump(model, model_path)
+        export_linear(model, model_path)
+        print("Trained and saved new model.",  file=sys.stderr)
+    return model
+
+
+def sales_watermark(sales_df: pd.DataFrame, daily: bool = False) -> dict:
+    """Describe the training data a model is (or would be) fitted on."""
+    return {
+        'granularity': 'daily' if daily else 'item',
+        'rows': len(sales_df),
+        'max_sale_day': str(sales_df['SALEDAY'].max()) if len(sales_df) else None,
+        'max_sale_id': int(sales_df['SALEID'].max()) if 'SALEID' in sales_df and len(sales_df) else None
+    }
+
+
+def load_registry_model(sales_df: pd.DataFrame, registry: ModelRegistry, args: argparse.Namespace,
+                        current: Optional[dict] = None):
+    """Latest registry model, retrained first when the data has drifted past
+    ``--retrain-threshold``. Returns ``(model, metadata)``; ``current`` is the
+    already loaded metadata, kept as is when it is still the latest version."""
+    watermark = sales_watermark(sales_df, args.daily)
+    latest = registry.latest()
+    estimator = estimator_name(args)
+    features = feature_columns(sales_df)
+    reason = staleness(latest, watermark, features, args.retrain_threshold, args.max_model_age_days, estimator)
+    if reason is None:
+        if current is not None and current['version'] == latest['version']:
+            return None, current
+        model, meta = registry.load()
+        print(f"Loaded model version {meta['version']}.", file=sys.stderr)
+        return model, meta
+
+    print(f"Retraining model: {reason}.", file=sys.stderr)
+    model, metrics = fit_args_model(sales_df, args)
+    meta = registry.save(model, {
+        **watermark,
+        'features': features,
+        'estimator': estimator,
+        'metrics': metrics
+    })
+    print(f"Saved model version {meta['version']}.", file=sys.stderr)
+    # Reload through mmap so every worker shares the same pages of the artifact.
+    return registry.load(meta['version'])
+
+
+def iter_alerts(model, frames: Dict[str, pd.DataFrame], horizon: int = 7,
+                chunk_rows: int = FORECAST_CHUNK_ROWS, stores=None, top_n: Optional[int] = None,
+                products=None, priorities=None, limit: Optional[int] = None):
+    """Yield alert frames as soon as each one is final.
+
+    Products are forecast in ascending blocks sized so a block's grid fits in
+    ``chunk_rows``; every pair in a block is complete once the block is
+    predicted, so its alerts can be written out before the next block is
+    forecast. ``top_n`` ranks across all products of a store, so it yields a
+    single frame at the end. Stops after ``limit`` alerts.
+    """
+    product_ids, store_ids = forecast_ids(frames['sales'], products, stores)
+    demand = None
+    if uses_demand_features(model):
+        if 'demand' not in frames:
+            raise ValueError("The model was trained with demand features; run with --demand-features")
+        demand = frames['demand']
+    if top_n is not None:
+        blocks = [product_ids]
+    else:
+        block_size = max(1, chunk_rows // max(1, horizon * len(store_ids)))
+        product_ids = np.sort(product_ids)
+        blocks = [product_ids[i:i + block_size] for i in range(0, len(product_ids), block_size)]
+
+    remaining = limit
+    for block in blocks:
+        if len(block) == 0:
+            continue
+        future_df = predict_demand(model, frames['sales'], horizon=horizon, products=block, stores=stores,
+                                   chunk_rows=chunk_rows, demand=demand)
+        with stage('alerting') as info:
+            alerts = generate_alerts(future_df, frames['inventory'], frames['products'], frames['stores'],
+                                     thresholds=frames.get('thresholds'), stores=stores, top_n=top_n,
+                                     priorities=priorities)
+            info['rows'] = len(alerts)
+        if remaining is not None:
+            alerts = alerts.head(remaining)
+            remaining -= len(alerts)
+        if len(alerts):
+            yield alerts
+        if remaining == 0:
+            return
+
+
+def build_alerts(model, frames: Dict[str, pd.DataFrame], horizon: int = 7,
+                 chunk_rows: int = FORECAST_CHUNK_ROWS, stores=None, top_n: Optional[int] = None,
+                 products=None, priorities=None, limit: Optional[int] = None) -> pd.DataFrame:
+    chunks = list(iter_alerts(model, frames, horizon, chunk_rows, stores, top_n, products, priorities, limit))
+    if not chunks:
+        return pd.DataFrame(columns=ALERT_COLUMNS)
+    return pd.concat(chunks, ignore_index=True)
+
+
+def alert_records(alert_frames):
+    """Flatten alert frames into JSON-ready records, one frame at a time."""
+    for alerts in alert_frames:
+        yield from alerts.to_dict(orient='records')
+
+
+def alert_options(args: argparse.Namespace, request: Optional[dict] = None) -> dict:
+    """Keyword arguments for iter_alerts from the CLI, overridden by a worker request."""
+    request = request or {}
+
+    def as_list(key, default, cast):
+        value = request.get(key, default)
+        if value is None or value == []:
+            return None
+        return [cast(v) for v in (value if isinstance(value, list) else [value])]
+
+    def as_int(key, default):
+        value = request.get(key, default)
+        return int(value) if value is not None else None
+
+    return {
+        'horizon': as_int('horizon', args.horizon),
+        'chunk_rows': args.chunk_rows,
+        'stores': as_list('stores', args.stores, int),
+        'products': as_list('products', args.products, int),
+        'priorities': as_list('priorities', args.priorities, str),
+        'top_n': as_int('top_n', args.top_n),
+        'limit': as_int('limit', args.limit)
+    }
+
+
+def record_line(record: dict) -> str:
+    return json.dumps(record, default=str, separators=(',', ':'))
+
+
+def model_version(args: argparse.Namespace, meta: Optional[dict] = None) -> str:
+    """Identify the model that answers a request: registry version or model file stamp."""
+    if meta is None and args.model_dir:
+        meta = ModelRegistry(args.model_dir).latest()
+        if meta is None:
+            return 'registry:none'
+    if meta is not None:
+        return f"registry:v{meta['version']}"
     try:
-        sales_df = preprocess_sales_data(get_sales_data(conn, db_config['schema']))
-        inv_df = get_inventory(conn)
-        products_df = get_product_names(conn)
-        stores_df = get_store_names(conn)
+        stat = os.stat(args.model_path)
+        return f"file:{stat.st_mtime_ns}:{stat.st_size}"
+    except FileNotFoundError:
+        return 'file:none'
 
-        if os.path.exists('sales_predictor.joblib'):
-            model = joblib.load('sales_predictor.joblib')
-            print("Loaded existing model.",  file=sys.stderr)
-        else:
-            model = train_model(sales_df)
-            joblib.dump(model, 'sales_predictor.joblib')
-            print("Trained and saved new model.",  file=sys.stderr)
 
-        future_df = predict_next_7_days(model, sales_df)
+def result_key(args: argparse.Namespace, options: dict, watermark: dict, version: str) -> str:
+    """Result cache key: model version, data watermark, forecast start and every parameter
+    that shapes the alerts."""
+    thresholds = None
+    if args.thresholds:
+        thresholds = [args.thresholds, os.path.getmtime(args.thresholds)]
+    elif args.thresholds_table:
+        thresholds = args.thresholds_table
+    return ResultCache.make_key({
+        'model': version,
+        'data': watermark,
+        'start': forecast_start(),
+        'options': {k: v for k, v in options.items() if k != 'chunk_rows'},
+        'frames': {'daily': args.daily, 'since': args.since, 'until': args.until, 'thresholds': thresholds,
+                   'demand_features': args.demand_features}
+    })
 
-        alerts_df = generate_alerts(future_df, inv_df, products_df, stores_df)
 
-        output = {
-            "success": True,
-            "alerts": alerts_df.to_dict(orient='records')
-        }
-        print(json.dumps(output, indent=2, default=str))
+def cached_records(lines):
+    return (json.loads(line) for line in lines)
+
+
+def get_result_cache(args: argparse.Namespace) -> Optional[ResultCache]:
+    if not args.result_cache_dir or args.no_result_cache:
+        return None
+    return ResultCache(args.result_cache_dir, args.result_cache_ttl, args.result_cache_max_entries)
+
+
+class ForecastWorker:
+    """Long-lived forecaster that keeps its connection pool, model and frames warm.
+
+    Frames are re-extracted on a ``refresh`` or ``reload`` request, and in the
+    request path when they are older than ``--refresh-seconds`` (0 leaves
+    refreshing to the caller); everything else is served from memory.
+    """
+
+    def __init__(self, db_config: Dict[str, str], args: argparse.Namespace):
+        self.db_config = db_config
+        self.args = args
+        self.pool = get_connection_pool(db_config, args.pool_size)
+        self.registry = ModelRegistry(args.model_dir) if args.model_dir else None
+        self.result_cache = get_result_cache(args)
+        self.model = None
+        self.model_meta = None
+        self.model_version = None
+        self.frames = None
+        self.data_watermark = None
+        self.loaded_at = 0.0
+
+    def data_fingerprint(self) -> dict:
+        with self.pool.connection() as conn:
+            return get_data_watermark(conn, self.db_config['schema'])
+
+    def refresh(self, reload_model: bool = False, rebuild_cache: bool = False) -> None:
+        watermark = self.data_fingerprint() if self.result_cache is not None else None
+        self.frames = load_args_frames(self.pool, self.db_config['schema'], self.args, rebuild_cache)
+        # Si los datos cambiaron durante la extracción, estos frames no se asocian a ninguna marca.
+        if watermark is not None and self.data_fingerprint() != watermark:
+            watermark = None
+        self.data_watermark = watermark
+        with stage('model_load'):
+            if self.registry is not None:
+                model, self.model_meta = load_registry_model(self.frames['sales'], self.registry, self.args,
+                                                             None if reload_model else self.model_meta)
+                self.model = model if model is not None else self.model
+                self.model_version = model_version(self.args, self.model_meta)
+            elif self.model is None or reload_model:
+                self.model = load_or_train_model(self.frames['sales'], self.args.model_path, self.args)
+                self.model_version = model_version(self.args)
+        self.loaded_at = time.monotonic()
+
+    def ensure_fresh(self) -> None:
+        if self.frames is None:
+            self.refresh(rebuild_cache=self.args.rebuild_cache)
+        elif 0 < self.args.refresh_seconds < time.monotonic() - self.loaded_at:
+            self.refresh()
+
+    def handle(self, request: dict) -> dict:
+        op = request.get('op', 'alerts')
+        if op == 'ping':
+            return {"success": True}
+        if op == 'refresh':
+            self.refresh(rebuild_cache=bool(request.get('rebuild_cache')))
+            return {"success": True}
+        if op == 'reload':
+            self.refresh(reload_model=True, rebuild_cache=bool(request.get('rebuild_cache')))
+            return {"success": True}
+        if op == 'purge_cache':
+            removed = self.result_cache.purge() if self.result_cache is not None else 0
+            return {"success": True, "removed": removed}
+        if op == 'alerts':
+            return {"success": True, "alerts": list(self.iter_alert_records(request))}
+        raise ValueError(f"Unknown op: {op}")
+
+    def iter_alert_records(self, request: dict):
+        """Alert records for ``request``, from the result cache when the model and the
+        data have not changed since the same request was last answered.
+
+        A stale worker does not refresh here: it still answers from the result
+        cache (another worker may have filled it for the current data) or from
+        its frames, which are then not cached under the current watermark.
+        """
+        self.ensure_fresh()
+        options = alert_options(self.args, request)
+        if self.result_cache is None or request.get('no_cache'):
+            return alert_records(iter_alerts(self.model, self.frames, **options))
+
+        current = self.data_fingerprint()
+        key = result_key(self.args, options, current, self.model_version)
+        with stage('cache_lookup') as info:
+            cached = self.result_cache.get(key)
+            info['rows'] = len(cached or [])
+        if cached is not None:
+            return cached_records(cached)
+        records = alert_records(iter_alerts(self.model, self.frames, **options))
+        if current != self.data_watermark:
+            return records
+        return cached_records(self.result_cache.tee(key, (record_line(r) for r in records)))
+
+    def close(self) -> None:
+        self.pool.close()
+
+
+def serve(worker: ForecastWorker, stdin=sys.stdin, stdout=sys.stdout) -> None:
+    """Answer JSON-lines requests from ``stdin`` until EOF or a ``shutdown`` op.
+
+    Each request is one JSON object (``{"id": 1, "op": "alerts"}``); each
+    response is one JSON line echoing the request ``id``. An alerts request
+    with ``"stream": true`` is answered with one ``{"id", "alert"}`` line per
+    alert, written as soon as it is produced, and a closing ``{"id", "success",
+    "done", "count"}`` line. With ``"metrics": true`` (or ``--metrics``) the
+    final line also carries the request's per-stage metrics record.
+    """
+    for line in iter(stdin.readline, ''):
+        line = line.strip()
+        if not line:
+            continue
+        request_id = None
+        request = {}
+        metrics = None
+        try:
+            request = json.loads(line)
+            request_id = request.get('id')
+            if request.get('op') == 'shutdown':
+                break
+            if request.get('metrics') or worker.args.metrics or worker.args.metrics_file:
+                metrics = RunMetrics()
+            with activate(metrics):
+                if request.get('stream') and request.get('op', 'alerts') == 'alerts':
+                    count = 0
+                    with stage('serialize') as info:
+                        for record in worker.iter_alert_records(request):
+                            alert_line = json.dumps({"id": request_id, "alert": record}, default=str,
+                                                    separators=(',', ':'))
+                            stdout.write(alert_line + "\n")
+                            count += 1
+                            if count % 1000 == 0:
+                                stdout.flush()
+                        info['rows'] = count
+                    response = {"success": True, "done": True, "count": count}
+                else:
+                    response = worker.handle(request)
+        except Exception as e:
+            response = {"success": False, "error": str(e)}
+        with activate(metrics), stage('serialize'):
+            text = json.dumps({"id": request_id, **response}, default=str)
+        if metrics is not None:
+            record = metrics.record(op=request.get('op', 'alerts'), success=response.get('success'))
+            if worker.args.metrics_file:
+                emit(record, worker.args.metrics_file)
+            if request.get('metrics') or worker.args.metrics:
+                # Se agrega al final sin volver a serializar las alertas.
+                text = text[:-1] + ', "metrics": ' + json.dumps(record, default=str) + '}'
+        stdout.write(text + "\n")
+        stdout.flush()
+
+
+def get_sales_cache(args: argparse.Namespace) -> Optional[SalesCache]:
+    if not args.cache_dir:
+        return None
+    name = 'sales_daily' if args.daily else 'sales'
+    return SalesCache(args.cache_dir, f'{name}_compact' if args.compact else name)
+
+
+def get_feature_store(args: argparse.Namespace) -> Optional[FeatureStore]:
+    if not args.demand_features:
+        return None
+    return FeatureStore(args.feature_dir, 'demand_daily' if args.daily else 'demand')
+
+
+def load_args_frames(pool: ConnectionPool, schema: str, args: argparse.Namespace,
+                     rebuild_cache: bool = False) -> Dict[str, pd.DataFrame]:
+    frames = load_frames(pool, schema, get_sales_cache(args), rebuild_cache, args.daily, args.since, args.until,
+                         None if args.thresholds else args.thresholds_table, args.extract_timeout,
+                         args.compact, args.sales_chunk_rows, get_feature_store(args))
+    if args.thresholds:
+        frames['thresholds'] = load_thresholds(args.thresholds)
+    return frames
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Predicción de demanda y alertas de inventario.")
+    parser.add_argument('--serve', action='store_true',
+                        help="Run as a long-lived JSON-lines worker over stdin/stdout.")
+    parser.add_argument('--sqlite', help="Use a local SQLite stand-in database instead of HANA.")
+    parser.add_argument('--model-path', default=MODEL_PATH)
+    parser.add_argument('--model-dir', default=os.getenv("PREDICCIONES_MODEL_DIR"),
+                        help="Use a versioned model registry in this directory instead of --model-path.")
+    parser.add_argument('--retrain-threshold', type=float, default=0.1,
+                        help="Registry: retrain once new sales rows exceed this fraction of the training rows.")
+    parser.add_argument('--max-model-age-days', type=float,
+                        help="Registry: also retrain models older than this many days.")
+    parser.add_argument('--segment-by', choices=['store', 'product', 'cluster'],
+                        help="Train one model per store, product or product cluster (in parallel).")
+    parser.add_argument('--segment-estimator', choices=['linear', 'forest'], default='linear',
+                        help="Estimator fitted for each segment.")
+    parser.add_argument('--min-segment-rows', type=int, default=30,
+                        help="Segments with fewer rows use the global model.")
+    parser.add_argument('--n-clusters', type=int, default=8,
+                        help="Number of product clusters for --segment-by cluster.")
+    parser.add_argument('--n-jobs', type=int,
+                        help="Worker processes for segmented training (default: all cores).")
+    parser.add_argument('--refresh-seconds', type=float, default=300,
+                        help="Worker mode: re-extract frames older than this (0: only on refresh/reload ops).")
+    parser.add_argument('--pool-size', type=int, default=int(os.getenv("PREDICCIONES_POOL_SIZE", "4")),
+                        help="Database connections used to extract the frames concurrently.")
+    parser.add_argument('--extract-timeout', type=float, default=300,
+                        help="Seconds to wait for the concurrent extraction before failing.")
+    parser.add_argument('--compact', action='store_true',
+                        default=os.getenv("PREDICCIONES_COMPACT", "").lower() == 'true',
+                        help="Load sales in chunks into small integer/float32 dtypes, without product names.")
+    parser.add_argument('--sales-chunk-rows', type=int, default=SALES_CHUNK_ROWS,
+                        help="Rows per fetchmany batch when reading sales.")
+    parser.add_argument('--cache-dir', default=os.getenv("PREDICCIONES_CACHE_DIR"),
+                        help="Keep the sales frame in a local Parquet cache and fetch only new sales.")
+    parser.add_argument('--rebuild-cache', action='store_true',
+                        help="Discard the sales cache and feature store and extract the full history again.")
+    parser.add_argument('--demand-features', action='store_true',
+                        default=os.getenv("PREDICCIONES_DEMAND_FEATURES", "").lower() == 'true',
+                        help="Train and forecast with lag/rolling demand features per product and store.")
+    parser.add_argument('--feature-dir', default=os.getenv("PREDICCIONES_FEATURE_DIR"),
+                        help="Persist the demand features here and only recompute new days.")
+    parser.add_argument('--daily', action='store_true',
+                        help="Aggregate sales per product, store and day inside the database.")
+    parser.add_argument('--since', type=datetime.date.fromisoformat,
+                        help="Only use sales from this day on (YYYY-MM-DD).")
+    parser.add_argument('--until', type=datetime.date.fromisoformat,
+                        help="Only use sales up to this day (YYYY-MM-DD).")
+    parser.add_argument('--horizon', type=int, default=7,
+                        help="Days to forecast from tomorrow (e.g. 7, 14, 30, 90).")
+    parser.add_argument('--chunk-rows', type=int, default=FORECAST_CHUNK_ROWS,
+                        help="Predict the forecast grid in chunks of at most this many rows.")
+    parser.add_argument('--thresholds',
+                        help="CSV/JSON file with per-product/per-store LOW, MED, HIGH alert limits.")
+    parser.add_argument('--thresholds-table',
+                        help="Database table with per-product/per-store LOW, MED, HIGH alert limits.")
+    parser.add_argument('--store', dest='stores', type=int, action='append',
+                        help="Only alert for this STOREID (repeatable).")
+    parser.add_argument('--product', dest='products', type=int, action='append',
+                        help="Only alert for this PRODUCTID (repeatable).")
+    parser.add_argument('--priority', dest='priorities', choices=list(PRIORITY_LABELS[1:]), action='append',
+                        help="Only alerts with this priority (repeatable).")
+    parser.add_argument('--top-n', type=int,
+                        help="Keep only the N most urgent alerts of each store.")
+    parser.add_argument('--limit', type=int,
+                        help="Stop after this many alerts.")
+    parser.add_argument('--format', choices=['json', 'ndjson'], default='json',
+                        help="json: one document; ndjson: one compact alert per line, streamed.")
+    parser.add_argument('--replenish', action='store_true',
+                        help="Output suggested warehouse orders for the flagged pairs instead of the alerts.")
+    parser.add_argument('--safety-factor', type=float, default=float(os.getenv("PREDICCIONES_SAFETY_FACTOR", "0.2")),
+                        help="With --replenish: extra stock over the predicted demand, as a fraction.")
+    parser.add_argument('--warehouse-store', type=int, default=WAREHOUSE_STORE_ID,
+                        help="With --replenish: storeID of the warehouse the orders are sourced from.")
+    parser.add_argument('--write-orders', action='store_true',
+                        help="With --replenish: insert the suggestions as draft Orders/OrderItems.")
+    parser.add_argument('--order-employee', type=int,
+                        help="With --write-orders: employeeID recorded in the CREATED OrderHistory entries.")
+    parser.add_argument('--metrics', action='store_true',
+                        help="Emit per-stage timings, rows and memory as one JSON record on stderr.")
+    parser.add_argument('--metrics-file', default=os.getenv("PREDICCIONES_METRICS_FILE"),
+                        help="Append the per-stage metrics record to this JSON-lines file instead.")
+    parser.add_argument('--profile-dir',
+                        help="Dump a cProfile and a tracemalloc snapshot of this run into this directory.")
+    parser.add_argument('--result-cache-dir', default=os.getenv("PREDICCIONES_RESULT_CACHE_DIR"),
+                        help="Cache alert results keyed by model version, data watermark, date and parameters.")
+    parser.add_argument('--result-cache-ttl', type=float, default=3600,
+                        help="Seconds a cached result stays valid.")
+    parser.add_argument('--result-cache-max-entries', type=int, default=256,
+                        help="Evict the oldest cached results beyond this many.")
+    parser.add_argument('--no-result-cache', action='store_true',
+                        help="Bypass the result cache for this run.")
+    parser.add_argument('--purge-result-cache', action='store_true',
+                        help="Delete every cached result before running.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    db_config = load_env()
+    if args.sqlite:
+        db_config['sqlite'] = args.sqlite
+        db_config['schema'] = db_config['schema'] or 'WUSAP'
+
+    if args.serve:
+        worker = ForecastWorker(db_config, args)
+        try:
+            serve(worker)
+        finally:
+            worker.close()
+        return
+
+    if args.purge_result_cache and args.result_cache_dir:
+        removed = ResultCache(args.result_cache_dir).purge()
+        print(f"Result cache: purged {removed} entries.", file=sys.stderr)
+
+    pool = get_connection_pool(db_config, args.pool_size)
+    metrics = None
+    if args.metrics or args.metrics_file or args.profile_dir:
+        metrics = RunMetrics(trace_memory=bool(args.profile_dir))
+    success = False
+
+    try:
+        with profiled(args.profile_dir), activate(metrics):
+            if args.replenish:
+                print(json.dumps(run_replenishment(pool, db_config['schema'], args), indent=2, default=str))
+            else:
+                write_alerts(run_alerts(pool, db_config['schema'], args), args.format)
+        success = True
 
     except Exception as e:
         error_output = {
             "success": False,
             "error": str(e)
         }
-        print(json.dumps(error_output))
+        # En ndjson stdout sólo lleva alertas; el error va a stderr.
+        print(json.dumps(error_output), file=sys.stderr if args.format == 'ndjson' else sys.stdout)
         sys.exit(1)
 
     finally:
-        conn.close()
+        pool.close()
+        if metrics is not None:
+            emit(metrics.record(success=success, format=args.format), args.metrics_file)
+
+
+def run_alerts(pool: ConnectionPool, schema: str, args: argparse.Namespace):
+    """Alert records for a single CLI run, served from the result cache when possible."""
+    result_cache = get_result_cache(args)
+    options = alert_options(args)
+    cached = None
+    if result_cache is not None:
+        with stage('cache_lookup') as info:
+            with pool.connection() as conn:
+                watermark = get_data_watermark(conn, schema)
+            cached = result_cache.get(result_key(args, options, watermark, model_version(args)))
+            info['rows'] = len(cached or [])
+    if cached is not None:
+        print("Result cache hit.", file=sys.stderr)
+        return cached_records(cached)
+
+    frames = load_args_frames(pool, schema, args, args.rebuild_cache)
+    if result_cache is not None:
+        with pool.connection() as conn:
+            if get_data_watermark(conn, schema) != watermark:
+                # Los datos cambiaron durante la extracción; el resultado no se guarda bajo ninguna marca.
+                print("Data changed during extraction; not caching this result.", file=sys.stderr)
+                result_cache = None
+    model, meta = load_args_model(frames, args)
+    records = alert_records(iter_alerts(model, frames, **options))
+    if result_cache is not None:
+        # Keyed on the model actually used, which may have just been retrained.
+        key = result_key(args, options, watermark, model_version(args, meta))
+        records = cached_records(result_cache.tee(key, (record_line(r) for r in records)))
+    return records
+
+
+def load_args_model(frames: Dict[str, pd.DataFrame], args: argparse.Namespace):
+    """The model for a CLI run and its registry metadata (None without --model-dir)."""
+    with stage('model_load'):
+        if args.model_dir:
+            return load_registry_model(frames['sales'], ModelRegistry(args.model_dir), args)
+        return load_or_train_model(frames['sales'], args.model_path, args), None
+
+
+def run_replenishment(pool: ConnectionPool, schema: str, args: argparse.Namespace) -> dict:
+    """Suggested warehouse orders for the flagged pairs, optionally written as draft Orders."""
+    frames = load_args_frames(pool, schema, args, args.rebuild_cache)
+    model, _ = load_args_model(frames, args)
+    alerts = build_alerts(model, frames, **alert_options(args))
+    with stage('replenishment') as info:
+        with pool.connection() as conn:
+            prices = get_product_prices(conn)
+        suggestions = suggest_orders(alerts, frames['inventory'], prices, args.safety_factor, args.warehouse_store)
+        info['rows'] = len(suggestions)
+    order_ids = []
+    if args.write_orders:
+        with stage('write_orders') as info:
+            with pool.connection() as conn:
+                order_ids = write_draft_orders(conn, suggestions, schema, args.order_employee)
+            info['rows'] = len(suggestions)
+        print(f"Replenishment: {len(order_ids)} draft orders, {len(suggestions)} items.", file=sys.stderr)
+    return {
+        "success": True,
+        "orders": order_ids,
+        "suggestions": suggestions.to_dict(orient='records')
+    }
+
+
+def write_alerts(records, fmt: str = 'json', stdout=sys.stdout) -> None:
+    """Write the records as one pretty JSON document or as NDJSON lines.
+
+    Records are produced lazily, so the serialize stage's own time excludes
+    the forecasting it drives.
+    """
+    with stage('serialize') as info:
+        if fmt == 'ndjson':
+            count = 0
+            for count, record in enumerate(records, 1):
+                stdout.write(record_line(record) + "\n")
+                if count % 1000 == 0:
+                    stdout.flush()
+            stdout.flush()
+            info['rows'] = count
+            return
+
+        output = {
+            "success": True,
+            "alerts": list(records)
+        }
+        info['rows'] = len(output['alerts'])
+        print(json.dumps(output, indent=2, default=str), file=stdout)
+
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,110 @@
+"""Replenishment orders suggested from the inventory alerts.
+
+Every flagged (product, store) pair gets an order quantity in one vectorized
+pass. The target stock is the predicted demand plus a safety factor, and
+the quantity is the missing part of it, rounded up. The source is the
+warehouse's stock (the same rule orderService.createOrder applies to
+managers). When several stores need more of a product than the warehouse
+holds, the stock goes to the most urgent pairs first: priority, then diff.
+Optionally the suggestions are written as draft Orders (one per store, status
+"Pendiente") with their OrderItems and a CREATED OrderHistory entry. That is
+a few batched executemany calls in a single transaction.
+"""
+import datetime
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from standin_db import is_sqlite
+
+WAREHOUSE_STORE_ID = 1
+PRIORITY_RANK = {'Baja': 1, 'Media': 2, 'Alta': 3}
+ORDER_STATUS = 'Pendiente'
+ORDER_COMMENT = 'Sugerencia automática de reabastecimiento'
+SUGGESTION_COLUMNS = ['PRODUCTID', 'PRODUCTNAME', 'STOREID', 'STORENAME', 'priority', 'predicted_quantity',
+                      'QUANTITY', 'suggested_quantity', 'shortfall', 'unit_price', 'item_total']
+
+
+def suggest_orders(alerts: pd.DataFrame, inventory: pd.DataFrame, prices: pd.DataFrame,
+                   safety_factor: float = 0.2, warehouse_id: int = WAREHOUSE_STORE_ID) -> pd.DataFrame:
+    """Order quantity for each alert, limited by the warehouse stock of its product.
+
+    ``alerts`` comes from generate_alerts, ``inventory`` has PRODUCTID, STOREID,
+    QUANTITY and ``prices`` PRODUCTID, SUGGESTEDPRICE. ``shortfall`` is the
+    part of the need the warehouse cannot cover. Pairs with nothing to order
+    are dropped.
+    """
+    df = alerts[alerts['STOREID'] != warehouse_id].copy()
+    need = np.ceil(df['predicted_quantity'].to_numpy() * (1 + safety_factor) - df['QUANTITY'].to_numpy())
+    df['need'] = np.clip(np.nan_to_num(need), 0, None)
+    df['_rank'] = df['priority'].map(PRIORITY_RANK).fillna(0)
+    df = df.sort_values(['PRODUCTID', '_rank', 'diff'], ascending=[True, False, False], kind='stable')
+
+    stock = inventory.loc[inventory['STOREID'] == warehouse_id].groupby('PRODUCTID')['QUANTITY'].sum()
+    available = df['PRODUCTID'].map(stock).fillna(0).clip(lower=0).to_numpy()
+    need = df['need'].to_numpy()
+    before = df.groupby('PRODUCTID')['need'].cumsum().to_numpy() - need
+    allocated = np.minimum(np.clip(available - before, 0, None), need)
+
+    df['suggested_quantity'] = allocated
+    df['shortfall'] = need - allocated
+    df['unit_price'] = df['PRODUCTID'].map(prices.set_index('PRODUCTID')['SUGGESTEDPRICE']).fillna(0).astype(float)
+    df['item_total'] = (df['suggested_quantity'] * df['unit_price']).round(2)
+    df = df[df['suggested_quantity'] > 0]
+    return df.sort_values(['STOREID', 'PRODUCTID'], kind='stable')[SUGGESTION_COLUMNS].reset_index(drop=True)
+
+
+def write_draft_orders(conn, suggestions: pd.DataFrame, schema: str = 'WUSAP',
+                       employee_id: Optional[int] = None) -> list:
+    """Insert one draft order per store plus its items and history in one transaction.
+
+    Orders stays locked from reading MAX(orderID) to the commit, so the IDs
+    above it are this batch's, in insertion order. Returns the new orderIDs.
+    """
+    if suggestions.empty:
+        return []
+    totals = suggestions.groupby('STOREID', sort=True)['item_total'].sum().round(2)
+    now = datetime.datetime.now().replace(microsecond=0)
+    cursor = conn.cursor()
+    autocommit = None
+    try:
+        if is_sqlite(conn):
+            cursor.execute("BEGIN IMMEDIATE")
+        else:
+            autocommit = conn.getautocommit()
+            conn.setautocommit(False)
+            cursor.execute(f"LOCK TABLE {schema}.Orders IN EXCLUSIVE MODE")
+        cursor.execute(f"SELECT COALESCE(MAX(orderID), 0) FROM {schema}.Orders")
+        max_before = cursor.fetchone()[0]
+        cursor.executemany(
+            f"INSERT INTO {schema}.Orders (orderDate, orderTotal, status, comments, storeID) VALUES (?, ?, ?, ?, ?)",
+            [(now, float(total), ORDER_STATUS, ORDER_COMMENT, int(store)) for store, total in totals.items()])
+        cursor.execute(f"SELECT orderID FROM {schema}.Orders WHERE orderID > ? ORDER BY orderID", (max_before,))
+        order_ids = [row[0] for row in cursor.fetchall()]
+        if len(order_ids) != len(totals):
+            raise RuntimeError(f"Expected {len(totals)} new order IDs, found {len(order_ids)}")
+
+        order_of_store = pd.Series(order_ids, index=totals.index)
+        items = pd.DataFrame({
+            'orderID': suggestions['STOREID'].map(order_of_store).astype(np.int64),
+            'productID': suggestions['PRODUCTID'].astype(np.int64),
+            'source': 'warehouse',
+            'quantity': suggestions['suggested_quantity'].astype(float),
+            'itemTotal': suggestions['item_total'].astype(float)
+        })
+        cursor.executemany(
+            f"INSERT INTO {schema}.OrderItems (orderID, productID, source, quantity, itemTotal) VALUES (?, ?, ?, ?, ?)",
+            list(items.itertuples(index=False, name=None)))
+        cursor.executemany(
+            f"INSERT INTO {schema}.OrderHistory (orderID, timestamp, action, employeeID, comment) VALUES (?, ?, ?, ?, ?)",
+            [(int(order_id), now, 'CREATED', employee_id, ORDER_COMMENT) for order_id in order_ids])
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        if autocommit is not None:
+            conn.setautocommit(autocommit)
+    return [int(order_id) for order_id in order_ids]
@@ -0,0 +1,86 @@
+"""On-disk cache of alert results.
+
+Entries are NDJSON files (one alert per line) named after a hash of
+everything the result depends on: model version, sales/inventory
+watermarks, forecast start date and request parameters. Entries expire
+after ``ttl_seconds`` and the oldest are evicted beyond ``max_entries``.
+"""
+import os
+import json
+import time
+import hashlib
+from typing import Iterable, Iterator, List, Optional
+
+
+class ResultCache:
+    def __init__(self, directory: str, ttl_seconds: float = 3600, max_entries: int = 256):
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+
+    @staticmethod
+    def make_key(parts: dict) -> str:
+        return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f'{key}.ndjson')
+
+    def _entries(self) -> List[os.DirEntry]:
+        if not os.path.isdir(self.directory):
+            return []
+        return [e for e in os.scandir(self.directory) if e.name.endswith('.ndjson')]
+
+    def get(self, key: str) -> Optional[List[str]]:
+        """Cached lines for ``key``, or None when missing or expired."""
+        path = self._path(key)
+        try:
+            age = time.time() - os.path.getmtime(path)
+            if age > self.ttl_seconds:
+                os.remove(path)
+                return None
+            with open(path, encoding='utf-8') as f:
+                return f.read().splitlines()
+        except FileNotFoundError:
+            return None
+
+    def tee(self, key: str, lines: Iterable[str]) -> Iterator[str]:
+        """Pass ``lines`` through, storing them under ``key`` once fully consumed.
+
+        Nothing is stored if the producer fails or the consumer stops early.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = f'{self._path(key)}.{os.getpid()}.tmp'
+        completed = False
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                for line in lines:
+                    f.write(line + '\n')
+                    yield line
+            completed = True
+        finally:
+            if completed:
+                os.replace(tmp_path, self._path(key))
+                self.evict()
+            elif os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def evict(self) -> int:
+        """Remove expired entries and the oldest ones beyond ``max_entries``."""
+        now = time.time()
+        entries = sorted(self._entries(), key=lambda e: e.stat().st_mtime, reverse=True)
+        removed = 0
+        for i, entry in enumerate(entries):
+            if i >= self.max_entries or now - entry.stat().st_mtime > self.ttl_seconds:
+                try:
+                    os.remove(entry.path)
+                    removed += 1
+                except FileNotFoundError:
+                    pass
+        return removed
+
+    def purge(self) -> int:
+        removed = 0
+        for entry in self._entries():
+            os.remove(entry.path)
+            removed += 1
+        return removed
@@ -0,0 +1,45 @@
+"""Local Parquet cache for the preprocessed sales frame.
+
+The frame is stored next to a small JSON sidecar holding its high-water mark
+(max SALEID / SALEDAY) so later runs only need to fetch newer rows.
+"""
+import os
+import json
+from typing import Optional, Tuple
+
+import pandas as pd
+
+CACHE_FORMAT_VERSION = 1
+
+
+class SalesCache:
+    def __init__(self, cache_dir: str, name: str = 'sales'):
+        self.cache_dir = cache_dir
+        self.data_path = os.path.join(cache_dir, f'{name}.parquet')
+        self.meta_path = os.path.join(cache_dir, f'{name}.json')
+
+    def load(self) -> Tuple[Optional[pd.DataFrame], Optional[dict]]:
+        """Return ``(frame, metadata)`` or ``(None, None)`` when missing or outdated."""
+        if not (os.path.exists(self.data_path) and os.path.exists(self.meta_path)):
+            return None, None
+        with open(self.meta_path, encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta.get('version') != CACHE_FORMAT_VERSION:
+            return None, None
+        return pd.read_parquet(self.data_path), meta
+
+    def save(self, df: pd.DataFrame, meta: dict) -> None:
+        """Write the frame and its metadata; the sidecar is written last so a crash never
+        leaves metadata pointing at a partially written frame."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = self.data_path + '.tmp'
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, self.data_path)
+        with open(self.meta_path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump({**meta, 'version': CACHE_FORMAT_VERSION, 'rows': len(df)}, f, default=str)
+        os.replace(self.meta_path + '.tmp', self.meta_path)
+
+    def invalidate(self) -> None:
+        for path in (self.meta_path, self.data_path):
+            if os.path.exists(path):
+                os.remove(path)
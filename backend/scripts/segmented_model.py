@@ -0,0 +1,130 @@
+"""Per-store / per-product / per-cluster models trained in parallel.
+
+A SegmentedModel routes each row to the estimator of its segment and falls
+back to a global model for segments that were too sparse to get their own.
+"""
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+from sklearn.cluster import KMeans
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import LinearRegression
+from sklearn.metrics import mean_absolute_error, r2_score
+from sklearn.model_selection import train_test_split
+
+SEGMENT_COLUMNS = {'store': 'STOREID', 'product': 'PRODUCTID', 'cluster': 'PRODUCTID'}
+
+
+def make_estimator(name: str):
+    if name == 'forest':
+        return RandomForestRegressor(n_estimators=100, min_samples_leaf=2, n_jobs=1, random_state=42)
+    return LinearRegression()
+
+
+class SegmentedModel:
+    def __init__(self, segment_by: str, global_model, models: Dict[int, object],
+                 clusters: Optional[Dict[int, int]] = None):
+        self.segment_by = segment_by
+        self.global_model = global_model
+        self.models = models
+        self.clusters = clusters
+        self.feature_names_in_ = global_model.feature_names_in_
+
+    def segment_keys(self, X: pd.DataFrame) -> np.ndarray:
+        keys = X[SEGMENT_COLUMNS[self.segment_by]].to_numpy()
+        if self.segment_by == 'cluster':
+            keys = pd.Series(keys).map(self.clusters).fillna(-1).to_numpy(dtype=np.int64)
+        return keys
+
+    def predict(self, X: pd.DataFrame) -> np.ndarray:
+        prediction = np.asarray(self.global_model.predict(X), dtype=float)
+        keys = self.segment_keys(X)
+        for key in np.unique(keys):
+            model = self.models.get(int(key))
+            if model is not None:
+                mask = keys == key
+                prediction[mask] = model.predict(X[mask])
+        return prediction
+
+
+def cluster_products(df: pd.DataFrame, n_clusters: int = 8) -> Dict[int, int]:
+    """Group products with similar demand profiles (level, spread, weekend share)."""
+    qty = np.log1p(df['QUANTITY_SOLD'])
+    profile = pd.DataFrame({
+        'mean': qty.groupby(df['PRODUCTID']).mean(),
+        'std': qty.groupby(df['PRODUCTID']).std().fillna(0),
+        'weekend': df['is_weekend'].groupby(df['PRODUCTID']).mean()
+    })
+    n_clusters = max(1, min(n_clusters, len(profile)))
+    scaled = (profile - profile.mean()) / profile.std().replace(0, 1).fillna(1)
+    labels = KMeans(n_clusters=n_clusters, n_init=10, random_state=42).fit_predict(scaled.fillna(0))
+    return dict(zip(profile.index.astype(int), labels.astype(int)))
+
+
+def _fit_segment(key: int, X: pd.DataFrame, y: pd.Series, estimator: str):
+    started = time.perf_counter()
+    X_train, X_test, y_train, y_test = train_test_split(X, y, random_state=42)
+    model = make_estimator(estimator)
+    model.fit(X_train, y_train)
+    y_test_orig = np.expm1(y_test)
+    y_pred_orig = np.expm1(model.predict(X_test))
+    metrics = {
+        'rows': len(X),
+        'mae': float(mean_absolute_error(y_test_orig, y_pred_orig)),
+        'r2': float(r2_score(y_test_orig, y_pred_orig)) if len(X_test) > 1 else None,
+        'fit_seconds': round(time.perf_counter() - started, 4)
+    }
+    return key, model, metrics
+
+
+def fit_segmented(df: pd.DataFrame, features: list, segment_by: str = 'store', estimator: str = 'linear',
+                  min_rows: int = 30, n_jobs: Optional[int] = None, n_clusters: int = 8, global_fit=None):
+    """Fit one model per segment on a process pool plus the global fallback.
+
+    ``global_fit(df)`` must return ``(model, metrics)`` for the fallback; it runs
+    in this process while the pool fits the segments. Returns the
+    SegmentedModel and a metrics dict with per-segment results.
+    """
+    started = time.perf_counter()
+    df = df.dropna(subset=features)
+    clusters = cluster_products(df, n_clusters) if segment_by == 'cluster' else None
+    keys = df[SEGMENT_COLUMNS[segment_by]]
+    if clusters is not None:
+        keys = keys.map(clusters)
+    X = df[features]
+    y = np.log1p(df['QUANTITY_SOLD'])
+
+    counts = keys.value_counts()
+    dense = sorted(int(k) for k in counts[counts >= min_rows].index)
+    sparse = int((counts < min_rows).sum())
+
+    models, segment_metrics = {}, {}
+    workers = n_jobs or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=max(1, min(workers, len(dense) or 1))) as pool:
+        futures = [pool.submit(_fit_segment, key, X[keys == key], y[keys == key], estimator) for key in dense]
+        global_model, global_metrics = global_fit(df)
+        for future in futures:
+            key, model, metrics = future.result()
+            models[key] = model
+            segment_metrics[str(key)] = metrics
+            r2 = 'n/a' if metrics['r2'] is None else f"{metrics['r2']:.2f}"
+            print(f"Segment {segment_by}={key}: rows={metrics['rows']} fit={metrics['fit_seconds']:.3f}s "
+                  f"MAE={metrics['mae']:.2f} R²={r2}", file=sys.stderr)
+
+    wall_seconds = time.perf_counter() - started
+    print(f"Segmented training: {len(models)} {segment_by} models ({estimator}), {sparse} sparse segments "
+          f"on the global model, {wall_seconds:.2f}s wall on {workers} workers.", file=sys.stderr)
+    metrics = {
+        **global_metrics,
+        'segment_by': segment_by,
+        'segment_estimator': estimator,
+        'segments': segment_metrics,
+        'sparse_segments': sparse,
+        'wall_seconds': round(wall_seconds, 4)
+    }
+    return SegmentedModel(segment_by, global_model, models, clusters), metrics
@@ -0,0 +1,97 @@
+"""SQLite stand-in for the WUSAP HANA schema.
+
+Lets predicciones.py run locally (tests, benchmarks, offline work) without a
+HANA instance. The tables are created from Documentos/WUSAPschema.sql and are
+reachable under the same ``WUSAP.<table>`` names the HANA queries use.
+"""
+import os
+import re
+import sqlite3
+from typing import Dict, Iterable
+
+import pandas as pd
+
+TABLE_ORDER = ['Locations', 'Employees', 'Products', 'Inventory', 'Orders', 'OrderItems', 'Sale', 'SaleItems']
+SCHEMA_SQL = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'Documentos', 'WUSAPschema.sql')
+
+
+def _to_date(value):
+    """Mimic HANA's TO_DATE(timestamp) for ISO formatted text values."""
+    return None if value is None else str(value)[:10]
+
+
+def is_sqlite(conn) -> bool:
+    """True for a stand-in (sqlite3) connection, False for hdbcli."""
+    return conn.__class__.__module__ == 'sqlite3'
+
+
+def connect(path: str = ':memory:', schema: str = 'WUSAP') -> sqlite3.Connection:
+    """Open a stand-in connection with ``path`` attached as ``schema``."""
+    conn = sqlite3.connect(':memory:', check_same_thread=False)
+    conn.execute("ATTACH DATABASE ? AS " + schema, (path,))
+    conn.create_function("TO_DATE", 1, _to_date, deterministic=True)
+    # HANA's one-row DUMMY table, for SELECTs without a real source table.
+    conn.execute("CREATE TABLE DUMMY (DUMMY TEXT)")
+    conn.execute("INSERT INTO DUMMY VALUES ('X')")
+    conn.commit()
+    return conn
+
+
+def create_schema(conn: sqlite3.Connection, schema_path: str = SCHEMA_SQL) -> None:
+    """Create the WUSAP tables, translating the HANA DDL to SQLite."""
+    with open(schema_path, encoding='utf-8') as f:
+        ddl = f.read()
+    ddl = re.sub(r'--[^\n]*', '', ddl)
+    ddl = re.sub(r'CREATE SCHEMA[^;]*;', '', ddl)
+    ddl = ddl.replace('GENERATED BY DEFAULT AS IDENTITY', '')
+    ddl = ddl.replace('CREATE TABLE', 'CREATE TABLE IF NOT EXISTS')
+    ddl = re.sub(r'REFERENCES\s+\w+\.', 'REFERENCES ', ddl)
+    conn.executescript(ddl)
+
+
+def _column_values(series: pd.Series) -> Iterable:
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series.dt.strftime('%Y-%m-%d %H:%M:%S').tolist()
+    return series.astype(object).where(series.notna(), None).tolist()
+
+
+def insert_frame(conn: sqlite3.Connection, table: str, df: pd.DataFrame, schema: str = 'WUSAP') -> int:
+    """Bulk insert ``df`` into ``schema.table``; column names must match the table."""
+    if df.empty:
+        return 0
+    cols = list(df.columns)
+    rows = zip(*(_column_values(df[c]) for c in cols))
+    conn.executemany(
+        f"INSERT INTO {schema}.{table} ({', '.join(cols)}) VALUES ({', '.join('?' * len(cols))})",
+        rows
+    )
+    conn.commit()
+    return len(df)
+
+
+def _table_order(table: str) -> int:
+    return TABLE_ORDER.index(table) if table in TABLE_ORDER else len(TABLE_ORDER)
+
+
+def load_tables(conn: sqlite3.Connection, tables: Dict[str, pd.DataFrame], schema: str = 'WUSAP') -> None:
+    """Insert several frames, keyed by table name, in foreign-key friendly order."""
+    for table in sorted(tables, key=_table_order):
+        insert_frame(conn, table, tables[table], schema)
+
+
+def load_files(conn: sqlite3.Connection, directory: str, schema: str = 'WUSAP') -> Dict[str, int]:
+    """Insert ``<directory>/<Table>/part-*.csv|parquet`` files, one part at a time."""
+    counts = {}
+    tables = [t for t in os.listdir(directory) if os.path.isdir(os.path.join(directory, t))]
+    for table in sorted(tables, key=_table_order):
+        counts[table] = 0
+        for part in sorted(os.listdir(os.path.join(directory, table))):
+            path = os.path.join(directory, table, part)
+            if part.endswith('.parquet'):
+                df = pd.read_parquet(path)
+            elif part.endswith('.csv'):
+                df = pd.read_csv(path)
+            else:
+                continue
+            counts[table] += insert_frame(conn, table, df, schema)
+    return counts
@@ -0,0 +1,154 @@
+"""Synthetic WUSAP data for benchmarks and local runs.
+
+Generates the Locations, Employees, Products, Inventory, Sale and SaleItems
+tables of Documentos/WUSAPschema.sql for ``products`` x ``stores`` over
+``days`` of history. Demand follows a per-product popularity and a weekly
+pattern so the model has something to learn. Everything is drawn with NumPy
+from a seeded generator, so the same parameters always give the same data.
+"""
+import os
+import sys
+import argparse
+import datetime
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+import standin_db
+
+# Ventas relativas por día de la semana (lunes a domingo).
+WEEKLY_PATTERN = np.array([0.85, 0.9, 0.95, 1.0, 1.15, 1.3, 1.1])
+
+
+def generate_catalog(rng: np.random.Generator, products: int, stores: int, employees: Optional[int] = None,
+                     max_quantity: int = 40) -> Dict[str, pd.DataFrame]:
+    """Locations, Employees, Products and a full product x store Inventory with explicit IDs.
+
+    Employees (one per store by default) are spread over the stores in turn.
+    """
+    store_ids = np.arange(1, stores + 1)
+    product_ids = np.arange(1, products + 1)
+    employee_ids = np.arange(1, (employees or stores) + 1)
+    return {
+        'Locations': pd.DataFrame({
+            'storeID': store_ids,
+            'name': [f'Tienda {i}' for i in store_ids],
+            'location': [f'Calle {i}, Monterrey, NL, MX' for i in store_ids]
+        }),
+        'Employees': pd.DataFrame({
+            'employeeID': employee_ids,
+            'name': [f'Empleado {i}' for i in employee_ids],
+            'lastName': 'Sintético',
+            'email': [f'empleado{i}@wusap.test' for i in employee_ids],
+            'password': 'x',
+            'role': 'sales',
+            'storeID': (employee_ids - 1) % stores + 1
+        }),
+        'Products': pd.DataFrame({
+            'productID': product_ids,
+            'name': [f'Producto {i}' for i in product_ids],
+            'suggestedPrice': np.round(rng.lognormal(mean=3.5, sigma=0.6, size=products), 2),
+            'unit': 'pieza'
+        }),
+        # Inventory row of (product, store) is (product - 1) * stores + store.
+        'Inventory': pd.DataFrame({
+            'inventoryID': np.arange(1, products * stores + 1),
+            'productID': np.repeat(product_ids, stores),
+            'storeID': np.tile(store_ids, products),
+            'quantity': rng.integers(0, max_quantity, products * stores)
+        })
+    }
+
+
+def generate_tables(products: int = 50, stores: int = 3, days: int = 90, demand_rate: float = 0.5,
+                    items_per_sale: int = 4, end: Optional[datetime.date] = None,
+                    seed: int = 0) -> Dict[str, pd.DataFrame]:
+    """Frames keyed by table name, with the schema's column names.
+
+    ``demand_rate`` is the expected number of sale items per product, store
+    and day; history covers the ``days`` days before ``end`` (today by default).
+    """
+    rng = np.random.default_rng(seed)
+    end = end or datetime.date.today()
+    store_ids = np.arange(1, stores + 1)
+    product_ids = np.arange(1, products + 1)
+
+    catalog = generate_catalog(rng, products, stores)
+    prices = catalog['Products']['suggestedPrice'].to_numpy()
+
+    # Tickets per (day, store), then items per ticket, then a product per item.
+    first_day = np.datetime64(end - datetime.timedelta(days=days), 'D')
+    day_index = np.arange(days)
+    weekday = (first_day + day_index).astype('datetime64[D]').view('int64')
+    weekly = WEEKLY_PATTERN[(weekday + 3) % 7]  # 1970-01-01 fue jueves
+    mean_items = (1 + items_per_sale) / 2
+    tickets = rng.poisson(np.outer(weekly, np.ones(stores)) * products * demand_rate / mean_items)
+    ticket_day = np.repeat(np.repeat(day_index, stores), tickets.ravel())
+    ticket_store = np.repeat(np.tile(store_ids, days), tickets.ravel())
+    n_sales = len(ticket_day)
+    sale_ids = np.arange(1, n_sales + 1)
+    seconds = rng.integers(8 * 3600, 21 * 3600, n_sales)
+    sale_dates = (first_day + ticket_day).astype('datetime64[s]') + seconds.astype('timedelta64[s]')
+
+    items = rng.integers(1, items_per_sale + 1, n_sales)
+    item_sale = np.repeat(sale_ids, items)
+    item_store = np.repeat(ticket_store, items)
+    popularity = rng.pareto(1.5, products) + 0.1
+    item_product = rng.choice(product_ids, size=len(item_sale), p=popularity / popularity.sum())
+    quantity = np.round(rng.uniform(1, 5, len(item_sale)), 2)
+    item_total = np.round(quantity * prices[item_product - 1], 2)
+
+    sale_items = pd.DataFrame({
+        'saleItemID': np.arange(1, len(item_sale) + 1),
+        'saleID': item_sale,
+        'inventoryID': (item_product - 1) * stores + item_store,
+        'quantity': quantity,
+        'itemTotal': item_total
+    })
+    sale = pd.DataFrame({
+        'saleID': sale_ids,
+        'saleDate': pd.to_datetime(sale_dates),
+        'employeeID': ticket_store,
+        'saleTotal': np.round(np.bincount(item_sale, weights=item_total, minlength=n_sales + 1)[1:], 2)
+    })
+    return {
+        **catalog,
+        'Sale': sale,
+        'SaleItems': sale_items
+    }
+
+
+def write_sqlite(path: str, tables: Dict[str, pd.DataFrame]) -> None:
+    """(Re)create ``path`` as a stand-in database holding ``tables``."""
+    if os.path.exists(path):
+        os.remove(path)
+    conn = standin_db.connect(path)
+    try:
+        standin_db.create_schema(conn)
+        standin_db.load_tables(conn, tables)
+    finally:
+        conn.close()
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Genera datos sintéticos del esquema WUSAP.")
+    parser.add_argument('--products', type=int, default=50)
+    parser.add_argument('--stores', type=int, default=3)
+    parser.add_argument('--days', type=int, default=90, help="Days of sales history, ending today.")
+    parser.add_argument('--demand-rate', type=float, default=0.5,
+                        help="Expected sale items per product, store and day.")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--sqlite', required=True, help="SQLite stand-in database to (re)create.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    tables = generate_tables(args.products, args.stores, args.days, args.demand_rate, seed=args.seed)
+    write_sqlite(args.sqlite, tables)
+    print(', '.join(f"{name}={len(df)}" for name, df in tables.items()), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+import os
+import sys
+import datetime
+
+import pytest
+
+# Los scripts se importan entre sí como módulos sueltos.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import standin_db  # noqa: E402
+from synthetic_data import generate_tables, write_sqlite  # noqa: E402
+
+END = datetime.date(2025, 3, 31)
+
+
+@pytest.fixture(autouse=True)
+def clean_env(monkeypatch):
+    for name in list(os.environ):
+        if name.startswith(('PREDICCIONES_', 'HANA_')):
+            monkeypatch.delenv(name)
+
+
+@pytest.fixture
+def standin(tmp_path):
+    """Path of a small synthetic stand-in database: 12 products x 3 stores x 60 days."""
+    path = str(tmp_path / 'standin.db')
+    write_sqlite(path, generate_tables(12, 3, 60, end=END, seed=1))
+    return path
+
+
+@pytest.fixture
+def conn(standin):
+    conn = standin_db.connect(standin)
+    yield conn
+    conn.close()
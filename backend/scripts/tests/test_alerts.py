@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+
+import predicciones
+
+
+def legacy_alerts(future_df, inv_df, products_df, stores_df, low=0, med=5, high=10):
+    """The original row-by-row classification."""
+    alert_df = future_df.groupby(['PRODUCTID', 'STOREID'])['predicted_quantity'].sum().reset_index()
+    alert_df = alert_df.merge(inv_df, on=['PRODUCTID', 'STOREID'], how='left').fillna({'QUANTITY': 0})
+    alert_df['diff'] = alert_df['predicted_quantity'] - alert_df['QUANTITY']
+
+    def priority(diff):
+        if diff > high:
+            return 'Alta'
+        elif diff > med:
+            return 'Media'
+        elif diff > low:
+            return 'Baja'
+        return 'Default'
+
+    alert_df['priority'] = alert_df['diff'].apply(priority)
+    alerts = alert_df[alert_df['priority'] != 'Default']
+    alerts = alerts.merge(products_df, on='PRODUCTID', how='left').merge(stores_df, on='STOREID', how='left')
+    return alerts[predicciones.ALERT_COLUMNS].reset_index(drop=True)
+
+
+def frames():
+    rng = np.random.default_rng(3)
+    pairs = pd.MultiIndex.from_product([range(1, 21), range(1, 5)], names=['PRODUCTID', 'STOREID']).to_frame(index=False)
+    future = pd.concat([pairs] * 7, ignore_index=True)
+    future['predicted_quantity'] = rng.uniform(0, 4, len(future)).round(2)
+    inventory = pairs.sample(frac=0.8, random_state=1).assign(QUANTITY=lambda d: rng.integers(0, 25, len(d)))
+    products = pd.DataFrame({'PRODUCTID': range(1, 21), 'PRODUCTNAME': [f'P{i}' for i in range(1, 21)]})
+    stores = pd.DataFrame({'STOREID': range(1, 5), 'STORENAME': [f'T{i}' for i in range(1, 5)]})
+    return future, inventory, products, stores
+
+
+def test_matches_legacy_classification():
+    pd.testing.assert_frame_equal(predicciones.generate_alerts(*frames()), legacy_alerts(*frames()),
+                                  check_dtype=False)
+
+
+def test_thresholds_most_specific_level_wins():
+    pairs = pd.DataFrame({'PRODUCTID': [1, 1, 2, 3], 'STOREID': [1, 2, 1, 9]})
+    thresholds = predicciones.normalize_thresholds(pd.DataFrame([
+        {'productID': 1, 'storeID': 1, 'low': 100},
+        {'productID': 1, 'low': 50, 'med': 60},
+        {'storeID': 1, 'low': 20, 'med': 30, 'high': 40},
+    ]))
+    limits = predicciones.resolve_thresholds(pairs, thresholds, {'LOW': 0, 'MED': 5, 'HIGH': 10})
+    assert limits.values.tolist() == [
+        [100, 60, 40],  # par; MED del producto, HIGH de la tienda
+        [50, 60, 10],   # producto
+        [20, 30, 40],   # tienda
+        [0, 5, 10],     # valores globales
+    ]
+
+
+def test_filters_and_top_n():
+    future, inventory, products, stores = frames()
+    all_alerts = predicciones.generate_alerts(future, inventory, products, stores)
+    alerts = predicciones.generate_alerts(future, inventory, products, stores, stores=[2, 3],
+                                          priorities=['Alta', 'Media'], top_n=3)
+    assert set(alerts['STOREID']) <= {2, 3} and set(alerts['priority']) <= {'Alta', 'Media'}
+    for store_id, group in alerts.groupby('STOREID'):
+        candidates = all_alerts[(all_alerts['STOREID'] == store_id) & all_alerts['priority'].isin(['Alta', 'Media'])]
+        rank = candidates['priority'].map({'Alta': 2, 'Media': 1})
+        expected = candidates.assign(rank=rank).sort_values(['rank', 'diff'], ascending=False).head(3)
+        assert group['PRODUCTID'].tolist() == expected['PRODUCTID'].tolist()
@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import backtest
+import predicciones
+from feature_store import daily_totals
+
+
+@pytest.fixture
+def sales(conn):
+    return predicciones.get_sales_data(conn, 'WUSAP')
+
+
+def test_origins_are_ordered_and_end_on_the_last_day(sales):
+    daily = daily_totals(sales)
+    origins = backtest.make_origins(daily, folds=3, horizon=7, step=7)
+    last = daily['SALEDAY'].max()
+    assert origins == sorted(origins)
+    assert origins[-1] + pd.Timedelta(days=6) == last
+    assert [b - a for a, b in zip(origins, origins[1:])] == [pd.Timedelta(days=7)] * 2
+
+
+def test_linear_is_the_production_model(sales, monkeypatch):
+    daily = daily_totals(sales)
+    origin = backtest.make_origins(daily, folds=1, horizon=7, step=7)[0]
+    monkeypatch.setattr(backtest, '_daily', daily)
+    monkeypatch.setattr(backtest, '_sales', sales)
+    result = backtest.run_fold(0, origin, 'linear', 7)
+
+    model = predicciones.train_model(predicciones.preprocess_sales_data(sales[sales['SALEDAY'] < origin].copy()))
+    product_ids, store_ids = predicciones.forecast_ids(daily[daily['SALEDAY'] < origin])
+    grid = predicciones.build_forecast_grid(product_ids, store_ids, origin, 7)
+    days = np.repeat(pd.date_range(origin, periods=7, freq='D'), len(product_ids) * len(store_ids))
+    actual = (grid[['PRODUCTID', 'STOREID']].assign(SALEDAY=days)
+              .merge(daily, on=['PRODUCTID', 'STOREID', 'SALEDAY'], how='left')['QUANTITY'].fillna(0))
+    expected = np.abs(np.expm1(model.predict(grid[predicciones.FEATURE_COLUMNS])) - actual).mean()
+    assert result['mae'] == round(float(expected), 4)
+
+
+def test_every_fold_and_candidate_is_scored(sales):
+    results = backtest.backtest(sales, backtest.CANDIDATES, folds=2, horizon=7, step=7, n_jobs=1)
+    assert [(r['fold'], r['candidate']) for r in results] == [
+        (fold, candidate) for fold in range(2) for candidate in backtest.CANDIDATES]
+    assert all(r['test_rows'] == 7 * 12 * 3 and np.isfinite(r['mae']) for r in results)
+    assert set(backtest.summarize(results)) == set(backtest.CANDIDATES)
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+
+from columnar_fetch import fetch_columns
+
+
+def test_declared_dtypes_across_batches(conn):
+    df = fetch_columns(conn, "SELECT productID, name, suggestedPrice FROM WUSAP.Products ORDER BY productID",
+                       {'PRODUCTID': 'int64', 'NAME': 'str', 'SUGGESTEDPRICE': 'float64'}, batch_rows=5)
+    expected = pd.read_sql("SELECT productID, name, suggestedPrice FROM WUSAP.Products ORDER BY productID", conn)
+    assert list(df.columns) == ['PRODUCTID', 'NAME', 'SUGGESTEDPRICE']
+    assert df['PRODUCTID'].dtype == np.int64 and df['SUGGESTEDPRICE'].dtype == np.float64
+    assert df['NAME'].tolist() == expected['name'].tolist()
+    np.testing.assert_array_equal(df['PRODUCTID'], expected['productID'])
+    assert df.attrs['fetch']['rows'] == 12
+
+
+def test_int_column_with_nulls_is_widened(conn):
+    conn.execute("UPDATE WUSAP.Inventory SET quantity = NULL WHERE inventoryID = 7")
+    df = fetch_columns(conn, "SELECT inventoryID, quantity FROM WUSAP.Inventory ORDER BY inventoryID",
+                       {'INVENTORYID': 'int64', 'QUANTITY': 'int64'}, batch_rows=4)
+    assert df['INVENTORYID'].dtype == np.int64
+    assert df['QUANTITY'].dtype == np.float64
+    assert np.isnan(df['QUANTITY'].iloc[6]) and df['QUANTITY'].notna().sum() == len(df) - 1
+
+
+def test_empty_result(conn):
+    df = fetch_columns(conn, "SELECT productID FROM WUSAP.Products WHERE productID < 0", {'PRODUCTID': 'int64'})
+    assert len(df) == 0 and df['PRODUCTID'].dtype == np.int64
+
+
+def test_uint_columns_widen_batch_by_batch(conn):
+    conn.execute("CREATE TABLE WUSAP.Numbers (n INTEGER, m INTEGER, k INTEGER)")
+    conn.executemany("INSERT INTO WUSAP.Numbers VALUES (?, ?, ?)",
+                     [(i, i - 150, None if i == 250 else i) for i in range(300)])
+    df = fetch_columns(conn, "SELECT n, m, k FROM WUSAP.Numbers ORDER BY n",
+                       {'N': 'uint', 'M': 'uint', 'K': 'uint'}, batch_rows=100)
+    assert df['N'].dtype == np.uint16 and df['N'].tolist() == list(range(300))
+    assert df['M'].dtype == np.int16 and df['M'].min() == -150
+    assert df['K'].dtype == np.float64 and np.isnan(df['K'].iloc[250]) and df['K'].iloc[299] == 299
+
+
+def test_compact_sales_hold_the_same_values(conn):
+    import predicciones
+    full = predicciones.get_sales_data(conn, 'WUSAP')
+    compact = predicciones.get_sales_data(conn, 'WUSAP', compact=True, chunksize=100)
+    assert dict(compact.dtypes.astype(str)) == {
+        'SALEITEMID': 'uint16', 'SALEID': 'uint16', 'PRODUCTID': 'uint8', 'STOREID': 'uint8',
+        'SALEDAY': 'datetime64[us]', 'QUANTITY_SOLD': 'float32'}
+    pd.testing.assert_frame_equal(compact.astype({c: full[c].dtype for c in compact.columns}),
+                                  full.drop(columns='PRODUCTNAME'), rtol=1e-6)
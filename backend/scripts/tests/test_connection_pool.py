@@ -0,0 +1,108 @@
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+import predicciones
+from connection_pool import ConnectionPool, extract_concurrently
+
+
+class FakeConnection:
+    def __init__(self, opened):
+        self.closed = False
+        opened.append(self)
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def opened():
+    return []
+
+
+def test_reuses_connections_up_to_size(opened):
+    pool = ConnectionPool(lambda: FakeConnection(opened), size=2, timeout=0.2)
+    with pool.connection() as first:
+        with pool.connection() as second:
+            assert first is not second
+            with pytest.raises(TimeoutError):
+                with pool.connection():
+                    pass
+    with pool.connection() as again:
+        assert again in (first, second)
+    assert len(opened) == 2
+
+
+def test_a_failing_block_discards_its_connection(opened):
+    pool = ConnectionPool(lambda: FakeConnection(opened), size=1)
+    with pytest.raises(ValueError):
+        with pool.connection():
+            raise ValueError("query failed")
+    assert opened[0].closed
+    with pool.connection() as conn:
+        assert conn is opened[1]
+    pool.close()
+    assert opened[1].closed
+    with pytest.raises(RuntimeError):
+        with pool.connection():
+            pass
+
+
+def test_waiting_threads_never_exceed_the_pool(opened):
+    pool = ConnectionPool(lambda: FakeConnection(opened), size=3, timeout=5)
+    lock, in_use, peak = threading.Lock(), [0], [0]
+
+    def borrow():
+        with pool.connection():
+            with lock:
+                in_use[0] += 1
+                peak[0] = max(peak[0], in_use[0])
+            time.sleep(0.01)
+            with lock:
+                in_use[0] -= 1
+
+    threads = [threading.Thread(target=borrow) for _ in range(12)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert peak[0] == 3 and len(opened) == 3
+
+
+def test_jobs_run_concurrently(opened):
+    pool = ConnectionPool(lambda: FakeConnection(opened), size=4)
+    barrier = threading.Barrier(4, timeout=5)  # sólo pasa si los cuatro corren a la vez
+
+    def job(conn):
+        barrier.wait()
+        return conn
+
+    results = extract_concurrently(pool, {name: job for name in 'abcd'})
+    assert len({id(conn) for conn in results.values()}) == 4
+
+
+def test_first_failure_and_timeout_are_raised(opened):
+    pool = ConnectionPool(lambda: FakeConnection(opened), size=2)
+
+    def fail(conn):
+        raise KeyError('inventory')
+
+    with pytest.raises(KeyError):
+        extract_concurrently(pool, {'ok': lambda conn: 1, 'bad': fail})
+    with pytest.raises(TimeoutError, match='slow'):
+        extract_concurrently(pool, {'slow': lambda conn: time.sleep(0.5), 'fast': lambda conn: 1}, timeout=0.1)
+
+
+def test_concurrent_frames_match_sequential_queries(conn, standin):
+    pool = predicciones.get_connection_pool({'sqlite': standin, 'schema': 'WUSAP'}, 4)
+    try:
+        frames = predicciones.load_frames(pool, 'WUSAP')
+    finally:
+        pool.close()
+    pd.testing.assert_frame_equal(frames['sales'], predicciones.preprocess_sales_data(
+        predicciones.get_sales_data(conn, 'WUSAP')))
+    pd.testing.assert_frame_equal(frames['inventory'], predicciones.get_inventory(conn))
+    pd.testing.assert_frame_equal(frames['products'], predicciones.get_product_names(conn))
+    pd.testing.assert_frame_equal(frames['stores'], predicciones.get_store_names(conn))
@@ -0,0 +1,39 @@
+import datetime
+
+import pandas as pd
+
+import predicciones
+from sales_cache import SalesCache
+from test_sales_cache import add_sale, assert_same_sales
+
+
+def daily_from_items(conn, start=None, end=None):
+    items = predicciones.get_sales_data(conn, 'WUSAP')
+    if start is not None:
+        items = items[items['SALEDAY'] >= pd.Timestamp(start)]
+    if end is not None:
+        items = items[items['SALEDAY'] <= pd.Timestamp(end)]
+    return items.groupby(['PRODUCTID', 'STOREID', 'SALEDAY'], as_index=False)['QUANTITY_SOLD'].sum()
+
+
+def test_matches_item_level_aggregation(conn):
+    assert_same_sales(predicciones.get_daily_sales(conn, 'WUSAP'), daily_from_items(conn))
+
+
+def test_day_bounds_are_inclusive(conn):
+    start, end = datetime.date(2025, 3, 1), datetime.date(2025, 3, 10)
+    df = predicciones.get_daily_sales(conn, 'WUSAP', start=start, end=end)
+    assert df['SALEDAY'].min() == pd.Timestamp(start) and df['SALEDAY'].max() == pd.Timestamp(end)
+    assert_same_sales(df, daily_from_items(conn, start, end))
+
+
+def test_daily_cache_folds_late_sales_into_cached_days(conn, tmp_path):
+    cache = SalesCache(str(tmp_path / 'cache'), 'sales_daily')
+    before = predicciones.get_sales_data_incremental(conn, 'WUSAP', cache, daily=True)
+    last_day = before['SALEDAY'].max()
+    max_id = conn.execute("SELECT MAX(saleID) FROM WUSAP.Sale").fetchone()[0]
+    add_sale(conn, max_id + 1, f"{last_day.date()} 20:00:00", [(1, 2.0)])
+
+    df = predicciones.get_sales_data_incremental(conn, 'WUSAP', cache, daily=True)
+    assert len(df) in (len(before), len(before) + 1)
+    assert_same_sales(df, predicciones.preprocess_sales_data(predicciones.get_daily_sales(conn, 'WUSAP')))
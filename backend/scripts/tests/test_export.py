@@ -0,0 +1,57 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+import inserts
+import standin_db
+
+START = np.datetime64('2025-01-01')
+
+
+def export(directory, fmt='parquet', seed=7):
+    return inserts.export_files(str(directory), 1200, 8, 3, 5, START, days=90, max_items=4,
+                                sales_per_chunk=500, fmt=fmt, seed=seed)[0]
+
+
+def read_table(directory, table):
+    parts = sorted((directory / table).iterdir())
+    read = pd.read_parquet if parts[0].suffix == '.parquet' else pd.read_csv
+    return pd.concat([read(part) for part in parts], ignore_index=True)
+
+
+def test_same_seed_same_files(tmp_path):
+    counts = export(tmp_path / 'a')
+    export(tmp_path / 'b')
+    export(tmp_path / 'c', seed=8)
+    assert counts['Sale'] == 1200 and len(list((tmp_path / 'a' / 'Sale').iterdir())) == 3
+    for table in ('Products', 'Inventory', 'Sale', 'SaleItems'):
+        pd.testing.assert_frame_equal(read_table(tmp_path / 'a', table), read_table(tmp_path / 'b', table))
+    assert not read_table(tmp_path / 'a', 'SaleItems').equals(read_table(tmp_path / 'c', 'SaleItems'))
+    manifest = json.loads((tmp_path / 'a' / 'manifest.json').read_text())
+    assert manifest['rows'] == counts and manifest['seed'] == 7
+
+
+def test_ids_and_totals_are_consistent(tmp_path):
+    export(tmp_path)
+    sales = read_table(tmp_path, 'Sale')
+    items = read_table(tmp_path, 'SaleItems')
+    assert sales['saleID'].tolist() == list(range(1, len(sales) + 1))
+    assert items['saleItemID'].tolist() == list(range(1, len(items) + 1))
+    assert items['saleID'].isin(sales['saleID']).all()
+    totals = items.groupby('saleID')['itemTotal'].sum()
+    np.testing.assert_allclose(sales.set_index('saleID')['saleTotal'].loc[totals.index], totals, atol=0.011)
+    days = pd.to_datetime(sales['saleDate']).dt.normalize()
+    assert days.min() >= pd.Timestamp(START) and days.max() <= pd.Timestamp(START) + pd.Timedelta(days=90)
+
+
+def test_csv_and_parquet_load_the_same_rows(tmp_path):
+    loaded = {}
+    for fmt in ('csv', 'parquet'):
+        counts = export(tmp_path / fmt, fmt)
+        conn = standin_db.connect(str(tmp_path / f'{fmt}.db'))
+        standin_db.create_schema(conn)
+        assert standin_db.load_files(conn, str(tmp_path / fmt)) == counts
+        loaded[fmt] = pd.read_sql("SELECT * FROM WUSAP.SaleItems ORDER BY saleItemID", conn)
+        conn.close()
+    pd.testing.assert_frame_equal(loaded['csv'], loaded['parquet'])
@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+
+import feature_store
+import predicciones
+from feature_store import FeatureStore, build_features, daily_totals
+
+
+def sales(conn):
+    return predicciones.get_sales_data(conn, 'WUSAP')
+
+
+def assert_same_features(actual, expected):
+    key = ['PRODUCTID', 'STOREID', 'SALEDAY']
+    pd.testing.assert_frame_equal(actual.sort_values(key, ignore_index=True),
+                                  expected.sort_values(key, ignore_index=True), check_dtype=False)
+
+
+def test_features_match_a_per_pair_rolling_window(conn):
+    features = build_features(daily_totals(sales(conn)))
+    pair = features[(features['PRODUCTID'] == 1) & (features['STOREID'] == 1)]
+    q = pair['QUANTITY'].reset_index(drop=True)
+    expected_mean_7 = q.shift(1).rolling(7, min_periods=1).mean().fillna(0)
+    np.testing.assert_allclose(pair['mean_7'], np.log1p(expected_mean_7), rtol=1e-5)
+    np.testing.assert_allclose(pair['lag_7'], np.log1p(q.shift(7).fillna(0)), rtol=1e-5)
+
+
+def test_update_matches_a_full_rebuild(conn, tmp_path, monkeypatch):
+    history = sales(conn)
+    last = history['SALEDAY'].max()
+    store = FeatureStore(str(tmp_path))
+    store.update(history[history['SALEDAY'] < last - pd.Timedelta(days=5)])
+
+    aggregated = []
+    real_totals = feature_store.daily_totals
+
+    def daily_totals_spy(df):
+        aggregated.append(len(df))
+        return real_totals(df)
+
+    monkeypatch.setattr(feature_store, 'daily_totals', daily_totals_spy)
+    updated = store.update(history)
+    assert aggregated == [int((history['SALEDAY'] >= last - pd.Timedelta(days=6)).sum())]
+    assert_same_features(updated, build_features(real_totals(history)))
+
+
+def test_changed_history_rebuilds(conn, tmp_path, capsys):
+    history = sales(conn)
+    store = FeatureStore(str(tmp_path))
+    store.update(history)
+    changed = history.drop(index=history.index[0])
+    capsys.readouterr()
+
+    updated = store.update(changed)
+    assert "rebuilding" in capsys.readouterr().err
+    assert_same_features(updated, build_features(daily_totals(changed)))
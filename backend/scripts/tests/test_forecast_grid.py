@@ -0,0 +1,65 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import predicciones
+
+
+def legacy_forecast_grid(product_ids, store_ids, start, horizon=7):
+    """The original predict_next_7_days loop, without the prediction."""
+    rows = []
+    for i in range(horizon):
+        day = start + datetime.timedelta(days=i)
+        for product_id in product_ids:
+            for store_id in store_ids:
+                rows.append({
+                    'PRODUCTID': int(product_id),
+                    'STOREID': int(store_id),
+                    'day_of_week': day.weekday(),
+                    'day': day.day,
+                    'month': day.month,
+                    'year': day.year,
+                    'weekofyear': day.isocalendar()[1],
+                    'is_weekend': int(day.weekday() in [5, 6])
+                })
+    return pd.DataFrame(rows).astype(int)
+
+
+@pytest.fixture
+def sales(conn):
+    return predicciones.preprocess_sales_data(predicciones.get_sales_data(conn, 'WUSAP'))
+
+
+def test_grid_matches_legacy_loop(sales):
+    product_ids, store_ids = predicciones.forecast_ids(sales)
+    start = datetime.date(2024, 12, 28)  # cruza el cambio de año y de semana ISO
+    expected = legacy_forecast_grid(product_ids, store_ids, start, horizon=10)
+    pd.testing.assert_frame_equal(predicciones.build_forecast_grid(product_ids, store_ids, start, horizon=10),
+                                  expected, check_exact=True)
+
+
+def test_grid_slices_concatenate_to_the_full_grid(sales):
+    product_ids, store_ids = predicciones.forecast_ids(sales)
+    start = datetime.date(2025, 4, 1)
+    full = predicciones.build_forecast_grid(product_ids, store_ids, start, horizon=5)
+    parts = [predicciones.build_forecast_grid(product_ids, store_ids, start, 5, slice(i, i + 17))
+             for i in range(0, len(full), 17)]
+    pd.testing.assert_frame_equal(pd.concat(parts, ignore_index=True), full)
+
+
+def test_chunked_prediction_matches_legacy_loop(sales):
+    model = predicciones.train_model(sales)
+    start = datetime.date(2024, 12, 28)
+    chunked = predicciones.predict_demand(model, sales, start=start, chunk_rows=10)
+    expected = legacy_forecast_grid(*predicciones.forecast_ids(sales), start)
+    expected['predicted_quantity'] = np.expm1(model.predict(expected)).round(2)
+    pd.testing.assert_frame_equal(chunked, expected, check_exact=True)
+
+
+def test_restricting_products_and_stores(sales):
+    model = predicciones.train_model(sales)
+    df = predicciones.predict_demand(model, sales, horizon=3, products=[2, 5], stores=[3])
+    assert sorted(df['PRODUCTID'].unique()) == [2, 5] and df['STOREID'].unique().tolist() == [3]
+    assert len(df) == 3 * 2
@@ -0,0 +1,86 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import inserts
+import standin_db
+from synthetic_data import generate_catalog
+
+
+@pytest.fixture
+def catalog_db(tmp_path):
+    path = str(tmp_path / 'catalog.db')
+    conn = standin_db.connect(path)
+    standin_db.create_schema(conn)
+    standin_db.load_tables(conn, generate_catalog(np.random.default_rng(0), 5, 3, employees=6))
+    conn.close()
+    return path
+
+
+def table(path, query):
+    conn = standin_db.connect(path)
+    try:
+        return pd.read_sql(query, conn)
+    finally:
+        conn.close()
+
+
+def test_delete_in_batches_skips_id_gaps(tmp_path):
+    conn = standin_db.connect(str(tmp_path / 'gaps.db'))
+    standin_db.create_schema(conn)
+    conn.executemany("INSERT INTO WUSAP.Sale (saleID, saleDate, employeeID, saleTotal) VALUES (?, '2025-01-01', 1, 0)",
+                     [(i,) for i in (1, 2, 3, 10 ** 9, 2 * 10 ** 9)])
+    conn.commit()
+    statements = []
+    conn.set_trace_callback(statements.append)
+
+    assert inserts.delete_in_batches(conn, 'Sale', 'saleID', batch_size=2) == 5
+    assert conn.execute("SELECT COUNT(*) FROM WUSAP.Sale").fetchone()[0] == 0
+    assert sum(s.startswith('DELETE') for s in statements) == 3
+
+
+def test_sample_keeps_the_original_shape(catalog_db):
+    conn = inserts.connect(catalog_db)
+    try:
+        inserts.seed_sample(conn)
+    finally:
+        conn.close()
+
+    inventory = table(catalog_db, "SELECT productID, storeID, quantity FROM WUSAP.Inventory ORDER BY inventoryID")
+    assert inventory.values.tolist() == [[1, 1, 100], [2, 1, 50], [1, 2, 80], [3, 2, 60]]
+    sales = table(catalog_db, "SELECT * FROM WUSAP.Sale")
+    assert len(sales) == 500 and set(sales['employeeID']) == {1, 5}
+    days = pd.to_datetime(sales['saleDate'])
+    assert (days == days.dt.normalize()).all()
+    assert days.min() >= pd.Timestamp(datetime.date.today() - datetime.timedelta(days=100))
+
+    items = table(catalog_db, "SELECT * FROM WUSAP.SaleItems")
+    per_sale = items.groupby('saleID')
+    assert per_sale.size().between(1, 3).all()
+    assert (per_sale['inventoryID'].nunique() == per_sale.size()).all()  # sin repetir inventario en una venta
+    totals = per_sale['itemTotal'].sum().round(2)
+    np.testing.assert_allclose(sales.set_index('saleID')['saleTotal'].loc[totals.index], totals, atol=0.011)
+
+
+def test_bulk_on_an_empty_file(tmp_path):
+    path = str(tmp_path / 'empty.db')
+    inserts.main(['--sqlite', path, '--bulk', '--products', '6', '--stores', '2', '--employees', '4',
+                  '--sales', '250', '--sales-per-chunk', '100', '--writers', '2', '--seed', '1'])
+
+    sales = table(path, "SELECT S.saleID, S.saleTotal, E.storeID FROM WUSAP.Sale S "
+                        "JOIN WUSAP.Employees E ON S.employeeID = E.employeeID")
+    assert len(sales) == 250 and sales['saleID'].is_unique
+    items = table(path, "SELECT SI.saleID, SI.itemTotal, I.storeID FROM WUSAP.SaleItems SI "
+                        "JOIN WUSAP.Inventory I ON SI.inventoryID = I.inventoryID")
+    merged = items.merge(sales, on='saleID', suffixes=('_item', '_sale'))
+    assert len(merged) == len(items)
+    assert (merged['storeID_item'] == merged['storeID_sale']).all()  # se vende del inventario de la tienda
+    totals = items.groupby('saleID')['itemTotal'].sum().round(2)
+    np.testing.assert_allclose(sales.set_index('saleID')['saleTotal'].loc[totals.index], totals, atol=0.011)
+    assert len(table(path, "SELECT * FROM WUSAP.Inventory")) == 6 * 2
+
+    inserts.main(['--sqlite', path, '--bulk', '--clean', '--products', '6', '--stores', '2',
+                  '--employees', '4', '--sales', '50'])
+    assert len(table(path, "SELECT * FROM WUSAP.Sale")) == 50
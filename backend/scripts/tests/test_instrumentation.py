@@ -0,0 +1,60 @@
+import io
+import json
+import time
+
+import predicciones
+from instrumentation import RunMetrics, activate, emit, stage
+
+
+def test_stage_is_a_no_op_without_active_metrics():
+    with stage('anything') as info:
+        info['rows'] = 5
+    metrics = RunMetrics()
+    with activate(metrics):
+        pass
+    assert metrics.stages == {}
+
+
+def test_nested_stages_report_their_own_time():
+    metrics = RunMetrics()
+    with activate(metrics):
+        for _ in range(2):
+            with stage('outer') as outer:
+                outer['rows'] = 10
+                outer['frame_mb'] = 1.5
+                with stage('inner') as inner:
+                    inner['rows'] = 3
+                    time.sleep(0.05)
+    record = metrics.record(format='json')
+    outer, inner = record['stages']['outer'], record['stages']['inner']
+    assert (outer['calls'], outer['rows'], outer['frame_mb']) == (2, 20, 1.5)
+    assert (inner['calls'], inner['rows']) == (2, 6)
+    assert inner['seconds'] >= 0.1 and outer['seconds'] < 0.05
+    assert record['format'] == 'json' and record['total_seconds'] >= 0.1
+
+
+def test_emit_to_file_and_stream(tmp_path):
+    path = tmp_path / 'metrics.jsonl'
+    emit({'a': 1}, str(path))
+    emit({'a': 2}, str(path))
+    assert [json.loads(line) for line in path.read_text().splitlines()] == [{'a': 1}, {'a': 2}]
+    stream = io.StringIO()
+    emit({'a': 3}, stream=stream)
+    assert json.loads(stream.getvalue()) == {'metrics': {'a': 3}}
+
+
+def test_run_records_every_pipeline_stage(standin, tmp_path):
+    args = predicciones.parse_args(['--sqlite', standin, '--model-path', str(tmp_path / 'model.joblib'),
+                                    '--no-result-cache'])
+    pool = predicciones.get_connection_pool({'sqlite': standin, 'schema': 'WUSAP'}, 4)
+    metrics = RunMetrics()
+    try:
+        with activate(metrics):
+            predicciones.write_alerts(predicciones.run_alerts(pool, 'WUSAP', args), 'ndjson', io.StringIO())
+    finally:
+        pool.close()
+    stages = metrics.record()['stages']
+    assert {'extract', 'extract.sales', 'extract.inventory', 'preprocess', 'model_load', 'grid_build',
+            'predict', 'alerting', 'serialize'} <= set(stages)
+    assert stages['extract.sales']['rows'] == stages['preprocess']['rows'] > 0
+    assert stages['serialize']['rows'] == stages['alerting']['rows']
@@ -0,0 +1,68 @@
+import os
+import sys
+import subprocess
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import LinearRegression
+
+from lean_model import export_linear, load_linear, load_model, sidecar_path
+
+SCRIPTS = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.integers(0, 50, size=(200, 3)), columns=['PRODUCTID', 'STOREID', 'day'])
+    return X, X @ [0.1, -0.3, 0.05] + rng.normal(size=200)
+
+
+def save(model, path):
+    joblib.dump(model, path)
+    return path
+
+
+def test_sidecar_predicts_like_sklearn(data, tmp_path):
+    X, y = data
+    model = LinearRegression().fit(X, y)
+    path = save(model, str(tmp_path / 'model.joblib'))
+    assert export_linear(model, path)
+
+    lean = load_linear(path)
+    np.testing.assert_allclose(lean.predict(X[['day', 'STOREID', 'PRODUCTID']]), model.predict(X), rtol=1e-12)
+    assert list(lean.feature_names_in_) == list(X.columns)
+
+
+def test_replaced_artifact_falls_back_to_joblib(data, tmp_path):
+    X, y = data
+    path = save(LinearRegression().fit(X, y), str(tmp_path / 'model.joblib'))
+    export_linear(joblib.load(path), path)
+    replacement = LinearRegression().fit(X, -y)
+    save(replacement, path)
+    os.utime(path, ns=(0, 0))
+
+    assert load_linear(path) is None
+    np.testing.assert_allclose(load_model(path).predict(X), replacement.predict(X))
+    np.testing.assert_allclose(load_linear(path).predict(X), replacement.predict(X))
+
+
+def test_other_models_have_no_sidecar(data, tmp_path):
+    X, y = data
+    path = save(RandomForestRegressor(n_estimators=2, random_state=0).fit(X, y), str(tmp_path / 'model.joblib'))
+    assert not export_linear(joblib.load(path), path)
+    assert isinstance(load_model(path), RandomForestRegressor)
+    assert not os.path.exists(sidecar_path(path))
+
+
+def test_sidecar_load_does_not_import_sklearn(data, tmp_path):
+    X, y = data
+    model = LinearRegression().fit(X, y)
+    path = save(model, str(tmp_path / 'model.joblib'))
+    export_linear(model, path)
+    code = ("import sys, lean_model; lean_model.load_model(sys.argv[1]); "
+            "sys.exit('sklearn' in sys.modules)")
+    subprocess.run([sys.executable, '-c', code, path], cwd=SCRIPTS, check=True)
@@ -0,0 +1,69 @@
+import time
+import asyncio
+
+import numpy as np
+
+import load_test
+from load_test import MockApi, histogram, latency_stats, summarize
+
+
+def test_latency_percentiles():
+    stats = latency_stats(np.arange(1, 101, dtype=float))
+    assert stats == {'p50': 50.5, 'p95': 95.05, 'p99': 99.01, 'mean': 50.5, 'max': 100.0}
+    assert latency_stats(np.array([])) == {}
+
+
+def test_histogram_buckets():
+    values = np.array([0.4, 0.5, 0.55, 10.0, 1e7])
+    buckets = histogram(values)
+    assert [bound for bound, _ in buckets] == [0.5, 0.59, 11.31, float('inf')]
+    assert [count for _, count in buckets] == [2, 1, 1, 1]
+
+
+def test_summarize_counts_errors():
+    samples = [{'endpoint': 'sales', 'scheduled': 0.0, 'sent': 0.0, 'done': 0.01 * (i + 1),
+                'error': '500' if i < 2 else None} for i in range(10)]
+    result = summarize(samples, 2.0)
+    assert result['requests'] == 10 and result['errors'] == 2 and result['error_rate'] == 0.2
+    assert result['errors_by_kind'] == {'500': 2}
+    assert result['throughput_rps'] == 4.0
+    assert result['latency_ms']['max'] == 100.0
+
+
+def test_run_against_the_mock_api():
+    args = load_test.parse_args(['--mock', '--rate', '100', '--duration', '0.5', '--mock-scale', '0.02',
+                                 '--seed', '1'])
+    result = asyncio.run(load_test.run(args))
+    rate = result['rates'][0]
+    assert rate['requests'] > 0 and rate['errors'] == 0
+    assert set(rate['endpoints']) <= set(load_test.ENDPOINTS)
+    assert sum(count for _, count in rate['histogram_ms']) == rate['requests']
+    latency = rate['latency_ms']
+    assert latency['p50'] <= latency['p95'] <= latency['p99'] <= latency['max']
+
+
+def predicciones_seconds(mock: MockApi, requests: int, wait: float = 0.0) -> float:
+    headers = {'authorization': 'Bearer mock-token'}
+
+    async def go():
+        await mock.start()
+        try:
+            await asyncio.sleep(wait)
+            started = time.perf_counter()
+            await asyncio.gather(*[mock._handle('GET', '/api/predicciones', headers) for _ in range(requests)])
+            return time.perf_counter() - started
+        finally:
+            await mock.stop()
+
+    mock._delay = lambda median_ms: 0.05
+    return asyncio.run(go())
+
+
+def test_mock_workers_serve_one_request_at_a_time():
+    seconds = predicciones_seconds(MockApi(workers=2, refresh_seconds=0), requests=4)
+    assert 0.1 <= seconds < 0.15
+
+
+def test_mock_refresh_takes_a_worker_out_of_rotation():
+    seconds = predicciones_seconds(MockApi(workers=1, refresh_seconds=0.01), requests=1, wait=0.02)
+    assert seconds >= 0.075
@@ -0,0 +1,64 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import predicciones
+from model_registry import ModelRegistry, staleness
+
+FEATURES = ['PRODUCTID', 'STOREID']
+
+
+def fitted_meta(**overrides):
+    return {'features': FEATURES, 'estimator': 'LinearRegression', 'granularity': 'item', 'rows': 1000,
+            'created_at': datetime.datetime.now().isoformat(timespec='seconds'), **overrides}
+
+
+@pytest.mark.parametrize('meta, rows, expected', [
+    (None, 1000, "no model in registry"),
+    (fitted_meta(features=['PRODUCTID']), 1000, "feature list changed"),
+    (fitted_meta(estimator='SegmentedModel[store:linear]'), 1000, "estimator changed"),
+    (fitted_meta(granularity='daily'), 1000, "training data granularity changed"),
+    (fitted_meta(), 900, "sales history shrank"),
+    (fitted_meta(), 1101, "101 new rows since training (> 10%)"),
+    (fitted_meta(), 1100, None),
+    (fitted_meta(created_at='2000-01-01T00:00:00'), 1000, "model older than 30 days"),
+])
+def test_staleness(meta, rows, expected):
+    watermark = {'granularity': 'item', 'rows': rows}
+    assert staleness(meta, watermark, FEATURES, 0.1, 30, 'LinearRegression') == expected
+
+
+def test_versions_and_pruning(tmp_path):
+    from sklearn.linear_model import LinearRegression
+    registry = ModelRegistry(str(tmp_path), keep=2)
+    X = pd.DataFrame({'a': [0.0, 1.0, 2.0, 3.0]})
+    for slope in (1.0, 2.0, 3.0):
+        registry.save(LinearRegression().fit(X, X['a'] * slope), {'rows': 4})
+
+    assert [v['version'] for v in registry._read_index()['versions']] == [2, 3]
+    assert not (tmp_path / 'sales_predictor-v1.joblib').exists()
+    model, meta = registry.load()
+    assert meta['version'] == 3 and np.allclose(model.predict(X), X['a'] * 3)
+    assert np.allclose(registry.load(2)[0].predict(X), X['a'] * 2)
+    with pytest.raises(FileNotFoundError):
+        registry.load(1)
+
+
+def test_retrains_only_once_the_data_drifts(conn, tmp_path):
+    args = predicciones.parse_args(['--model-dir', str(tmp_path / 'models'), '--retrain-threshold', '0.05'])
+    registry = ModelRegistry(args.model_dir)
+    sales = predicciones.preprocess_sales_data(predicciones.get_sales_data(conn, 'WUSAP'))
+
+    _, meta = predicciones.load_registry_model(sales, registry, args)
+    assert meta['version'] == 1 and meta['rows'] == len(sales)
+    assert predicciones.load_registry_model(sales, registry, args, current=meta) == (None, meta)
+
+    grown = pd.concat([sales, sales.head(len(sales) // 25)], ignore_index=True)  # +4%
+    assert predicciones.load_registry_model(grown, registry, args)[1]['version'] == 1
+
+    grown = pd.concat([sales, sales.head(len(sales) // 10)], ignore_index=True)  # +10%
+    model, meta = predicciones.load_registry_model(grown, registry, args)
+    assert meta['version'] == 2 and meta['rows'] == len(grown)
+    assert len(model.predict(grown[predicciones.FEATURE_COLUMNS].head())) == 5
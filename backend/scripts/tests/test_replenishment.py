@@ -0,0 +1,106 @@
+import pandas as pd
+import pytest
+
+from replenishment import suggest_orders, write_draft_orders
+
+
+def frames():
+    alerts = pd.DataFrame({
+        'PRODUCTID': [1, 1, 1, 2],
+        'PRODUCTNAME': ['P1', 'P1', 'P1', 'P2'],
+        'STOREID': [2, 3, 1, 2],
+        'STORENAME': ['T2', 'T3', 'Almacén', 'T2'],
+        'predicted_quantity': [10.0, 20.0, 50.0, 4.0],
+        'QUANTITY': [4, 2, 0, 0],
+        'diff': [6.0, 18.0, 50.0, 4.0],
+        'priority': ['Media', 'Alta', 'Alta', 'Baja'],
+    })
+    inventory = pd.DataFrame({'PRODUCTID': [1, 2], 'STOREID': [1, 1], 'QUANTITY': [25, 0]})
+    prices = pd.DataFrame({'PRODUCTID': [1, 2], 'SUGGESTEDPRICE': [2.5, 9.0]})
+    return alerts, inventory, prices
+
+
+def test_warehouse_stock_goes_to_the_most_urgent_store_first():
+    result = suggest_orders(*frames(), safety_factor=0.1)
+    # Necesidades: tienda 3 ceil(22 - 2) = 20 (Alta), tienda 2 ceil(11 - 4) = 7 (Media); almacén con 25.
+    assert result[['STOREID', 'PRODUCTID', 'suggested_quantity', 'shortfall']].values.tolist() == [
+        [2, 1, 5.0, 2.0],
+        [3, 1, 20.0, 0.0],
+    ]
+    assert result['item_total'].tolist() == [12.5, 50.0]
+    assert 1 not in result['STOREID'].tolist()  # el almacén no se abastece a sí mismo
+
+
+def test_write_draft_orders(conn):
+    suggestions = suggest_orders(*frames(), safety_factor=0.1)
+    order_ids = write_draft_orders(conn, suggestions, employee_id=1)
+
+    orders = pd.read_sql(f"SELECT * FROM WUSAP.Orders WHERE orderID IN ({','.join('?' * len(order_ids))}) "
+                         f"ORDER BY orderID", conn, params=order_ids)
+    assert orders['storeID'].tolist() == [2, 3]
+    assert orders['status'].unique().tolist() == ['Pendiente']
+    assert orders['orderTotal'].tolist() == [12.5, 50.0]
+    items = pd.read_sql("SELECT * FROM WUSAP.OrderItems ORDER BY orderID", conn)
+    assert items[['orderID', 'productID', 'source', 'quantity']].values.tolist() == [
+        [order_ids[0], 1, 'warehouse', 5.0], [order_ids[1], 1, 'warehouse', 20.0]]
+    history = pd.read_sql("SELECT orderID, action FROM WUSAP.OrderHistory ORDER BY orderID", conn)
+    assert history.values.tolist() == [[order_ids[0], 'CREATED'], [order_ids[1], 'CREATED']]
+
+
+def test_write_draft_orders_rolls_back_on_error(conn):
+    suggestions = suggest_orders(*frames(), safety_factor=0.1)
+    conn.execute("DROP TABLE WUSAP.OrderHistory")
+    with pytest.raises(Exception):
+        write_draft_orders(conn, suggestions)
+    assert conn.execute("SELECT COUNT(*) FROM WUSAP.Orders").fetchone()[0] == 0
+    assert conn.execute("SELECT COUNT(*) FROM WUSAP.OrderItems").fetchone()[0] == 0
+
+
+class HanaLike:
+    """hdbcli-style connection over the stand-in: explicit autocommit, LOCK TABLE ignored."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.autocommit = True
+        self.calls = []
+
+    def getautocommit(self):
+        return self.autocommit
+
+    def setautocommit(self, value):
+        self.calls.append(value)
+        self.autocommit = value
+
+    def cursor(self):
+        return HanaLikeCursor(self.conn.cursor())
+
+    def commit(self):
+        self.conn.commit()
+
+    def rollback(self):
+        self.conn.rollback()
+
+
+class HanaLikeCursor:
+    def __init__(self, cursor):
+        self.cursor = cursor
+
+    def execute(self, sql, params=()):
+        if not sql.startswith('LOCK TABLE'):
+            self.cursor.execute(sql, params)
+
+    def __getattr__(self, name):
+        return getattr(self.cursor, name)
+
+
+@pytest.mark.parametrize('drop_history', [False, True])
+def test_write_draft_orders_restores_autocommit(conn, drop_history):
+    suggestions = suggest_orders(*frames(), safety_factor=0.1)
+    if drop_history:
+        conn.execute("DROP TABLE WUSAP.OrderHistory")
+    hana = HanaLike(conn)
+    try:
+        write_draft_orders(hana, suggestions)
+    except Exception:
+        assert drop_history
+    assert hana.calls == [False, True]
@@ -0,0 +1,103 @@
+import os
+import time
+
+import pytest
+
+import predicciones
+from result_cache import ResultCache
+from test_sales_cache import add_sale
+
+
+def age(cache, key, seconds):
+    path = cache._path(key)
+    stamp = time.time() - seconds
+    os.utime(path, (stamp, stamp))
+
+
+def store(cache, key, lines):
+    return list(cache.tee(key, iter(lines)))
+
+
+def test_tee_stores_only_complete_results(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    assert store(cache, 'a', ['1', '2']) == ['1', '2']
+    assert cache.get('a') == ['1', '2']
+
+    partial = cache.tee('b', iter(['1', '2', '3']))
+    next(partial)
+    partial.close()
+    assert cache.get('b') is None
+
+    def failing():
+        yield '1'
+        raise RuntimeError("forecast failed")
+
+    with pytest.raises(RuntimeError):
+        store(cache, 'c', failing())
+    assert cache.get('c') is None
+    assert sorted(os.listdir(tmp_path)) == ['a.ndjson']
+
+
+def test_expired_entries_are_dropped(tmp_path):
+    cache = ResultCache(str(tmp_path), ttl_seconds=60)
+    store(cache, 'old', ['x'])
+    store(cache, 'new', ['y'])
+    age(cache, 'old', 120)
+    assert cache.get('old') is None and not os.path.exists(cache._path('old'))
+    assert cache.get('new') == ['y']
+
+
+def test_oldest_entries_are_evicted_beyond_max_entries(tmp_path):
+    cache = ResultCache(str(tmp_path), ttl_seconds=3600, max_entries=3)
+    for i, key in enumerate('abcd'):
+        store(cache, key, [key])  # tee desaloja al guardar
+        age(cache, key, 100 - i)
+    assert [cache.get(k) for k in 'abcd'] == [None, ['b'], ['c'], ['d']]
+
+    store(cache, 'e', ['e'])
+    assert sorted(os.listdir(tmp_path)) == ['c.ndjson', 'd.ndjson', 'e.ndjson']
+    age(cache, 'c', 4000)
+    assert cache.evict() == 1
+    assert cache.purge() == 2 and cache.get('e') is None
+
+
+def cached_args(standin, tmp_path):
+    return predicciones.parse_args(['--sqlite', standin, '--model-path', str(tmp_path / 'model.joblib'),
+                                    '--result-cache-dir', str(tmp_path / 'results')])
+
+
+def run(standin, args):
+    pool = predicciones.get_connection_pool({'sqlite': standin, 'schema': 'WUSAP'}, 2)
+    try:
+        return list(predicciones.run_alerts(pool, 'WUSAP', args))
+    finally:
+        pool.close()
+
+
+def test_run_alerts_hits_the_cache_until_the_data_changes(conn, standin, tmp_path, capsys):
+    args = cached_args(standin, tmp_path)
+    first = run(standin, args)
+    assert len(os.listdir(tmp_path / 'results')) == 1
+    assert run(standin, args) == first and "Result cache hit." in capsys.readouterr().err
+
+    conn.execute("UPDATE WUSAP.Inventory SET quantity = quantity + 5 WHERE inventoryID = 2")
+    conn.commit()
+    run(standin, args)
+    assert "Result cache hit." not in capsys.readouterr().err
+    assert len(os.listdir(tmp_path / 'results')) == 2
+
+
+def test_sales_added_during_extraction_are_not_cached(conn, standin, tmp_path, monkeypatch, capsys):
+    args = cached_args(standin, tmp_path)
+    load_args_frames = predicciones.load_args_frames
+
+    def extract_then_sell(*a, **kw):
+        frames = load_args_frames(*a, **kw)
+        max_id = conn.execute("SELECT MAX(saleID) FROM WUSAP.Sale").fetchone()[0]
+        add_sale(conn, max_id + 1, '2025-04-01 09:00:00', [(3, 1.0)])
+        return frames
+
+    monkeypatch.setattr(predicciones, 'load_args_frames', extract_then_sell)
+    assert run(standin, args)
+    assert "not caching" in capsys.readouterr().err
+    assert not (tmp_path / 'results').exists() or not os.listdir(tmp_path / 'results')
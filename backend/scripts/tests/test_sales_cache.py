@@ -0,0 +1,85 @@
+import pandas as pd
+import pytest
+
+import predicciones
+from sales_cache import SalesCache
+
+
+def add_sale(conn, sale_id, when, items):
+    conn.execute("INSERT INTO WUSAP.Sale (saleID, saleDate, employeeID, saleTotal) VALUES (?, ?, 1, 0)",
+                 (sale_id, when))
+    conn.executemany("INSERT INTO WUSAP.SaleItems (saleID, inventoryID, quantity, itemTotal) VALUES (?, ?, ?, 0)",
+                     [(sale_id, inventory_id, quantity) for inventory_id, quantity in items])
+    conn.commit()
+
+
+def assert_same_sales(cached, fresh):
+    key = [c for c in ['SALEID', 'SALEITEMID', 'PRODUCTID', 'STOREID', 'SALEDAY'] if c in fresh.columns]
+    pd.testing.assert_frame_equal(cached.sort_values(key, ignore_index=True)[fresh.columns],
+                                  fresh.sort_values(key, ignore_index=True), check_dtype=False)
+
+
+def full_extraction(conn):
+    return predicciones.preprocess_sales_data(predicciones.get_sales_data(conn, 'WUSAP'))
+
+
+def test_save_and_load_round_trip(tmp_path):
+    cache = SalesCache(str(tmp_path))
+    assert cache.load() == (None, None)
+    df = pd.DataFrame({'SALEID': [1, 2], 'SALEDAY': pd.to_datetime(['2025-01-01', '2025-01-02'])})
+    cache.save(df, {'max_sale_id': 2})
+    loaded, meta = cache.load()
+    pd.testing.assert_frame_equal(loaded, df)
+    assert meta['max_sale_id'] == 2 and meta['rows'] == 2
+
+    cache.invalidate()
+    assert cache.load() == (None, None)
+
+
+def test_appends_new_sales(conn, tmp_path, capsys):
+    cache = SalesCache(str(tmp_path / 'cache'))
+    predicciones.get_sales_data_incremental(conn, 'WUSAP', cache)
+    max_id = conn.execute("SELECT MAX(saleID) FROM WUSAP.Sale").fetchone()[0]
+    add_sale(conn, max_id + 1, '2025-04-01 10:00:00', [(1, 3.0), (5, 1.5)])
+    capsys.readouterr()
+
+    df = predicciones.get_sales_data_incremental(conn, 'WUSAP', cache)
+    assert "2 new rows" in capsys.readouterr().err
+    assert_same_sales(df, full_extraction(conn))
+    assert cache.load()[1]['max_sale_id'] == max_id + 1
+
+
+def test_unchanged_database_is_served_from_the_cache(conn, tmp_path, monkeypatch):
+    cache = SalesCache(str(tmp_path / 'cache'))
+    first = predicciones.get_sales_data_incremental(conn, 'WUSAP', cache)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("the sales were extracted again")
+
+    monkeypatch.setattr(predicciones, 'get_sales_data', fail)
+    pd.testing.assert_frame_equal(predicciones.get_sales_data_incremental(conn, 'WUSAP', cache), first)
+
+
+def test_rebuilds_when_history_below_the_watermark_changes(conn, tmp_path, capsys):
+    cache = SalesCache(str(tmp_path / 'cache'))
+    predicciones.get_sales_data_incremental(conn, 'WUSAP', cache)
+    conn.execute("DELETE FROM WUSAP.SaleItems WHERE saleID = 1")
+    conn.commit()
+    capsys.readouterr()
+
+    df = predicciones.get_sales_data_incremental(conn, 'WUSAP', cache)
+    assert "no longer matches" in capsys.readouterr().err
+    assert_same_sales(df, full_extraction(conn))
+
+
+def test_rebuild_invalidates_the_cache_first(conn, tmp_path, monkeypatch):
+    cache = SalesCache(str(tmp_path / 'cache'))
+    predicciones.get_sales_data_incremental(conn, 'WUSAP', cache)
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("extraction failed")
+
+    monkeypatch.setattr(predicciones, 'get_sales_data', fail)
+    with pytest.raises(RuntimeError):
+        predicciones.get_sales_data_incremental(conn, 'WUSAP', cache, rebuild=True)
+    assert cache.load() == (None, None)
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LinearRegression
+from sklearn.model_selection import train_test_split
+
+import predicciones
+from segmented_model import fit_segmented
+
+
+@pytest.fixture
+def sales(conn):
+    return predicciones.preprocess_sales_data(predicciones.get_sales_data(conn, 'WUSAP'))
+
+
+def fit(sales, segment_by, min_rows=30, n_jobs=2):
+    return fit_segmented(sales, predicciones.FEATURE_COLUMNS, segment_by, 'linear', min_rows, n_jobs,
+                         n_clusters=3, global_fit=predicciones.fit_model)
+
+
+def test_each_store_gets_its_own_fit(sales):
+    model, metrics = fit(sales, 'store')
+    X = sales[predicciones.FEATURE_COLUMNS]
+    assert sorted(model.models) == sorted(sales['STOREID'].unique())
+    for store_id in model.models:
+        rows = sales['STOREID'] == store_id
+        X_train, _, y_train, _ = train_test_split(X[rows], np.log1p(sales.loc[rows, 'QUANTITY_SOLD']),
+                                                  random_state=42)
+        expected = LinearRegression().fit(X_train, y_train).predict(X[rows])
+        np.testing.assert_allclose(model.predict(X[rows]), expected)
+    assert metrics['segments'].keys() == {str(k) for k in model.models}
+
+
+def test_sparse_segments_fall_back_to_the_global_model(sales):
+    counts = sales['PRODUCTID'].value_counts()
+    model, metrics = fit(sales, 'product', min_rows=int(counts.median()) + 1)
+    X = sales[predicciones.FEATURE_COLUMNS]
+    sparse = ~sales['PRODUCTID'].isin(list(model.models))
+    assert sparse.any() and metrics['sparse_segments'] == len(counts) - len(model.models)
+    np.testing.assert_allclose(model.predict(X[sparse]), model.global_model.predict(X[sparse]))
+
+    everything_sparse, _ = fit(sales, 'product', min_rows=len(sales) + 1)
+    assert everything_sparse.models == {}
+    global_model = predicciones.train_model(sales)
+    np.testing.assert_allclose(everything_sparse.predict(X), global_model.predict(X))
+
+
+def test_clusters_cover_every_product_and_are_deterministic(sales):
+    model, _ = fit(sales, 'cluster', n_jobs=2)
+    serial, _ = fit(sales, 'cluster', n_jobs=1)
+    assert set(model.clusters) == set(sales['PRODUCTID'].unique())
+    assert len(set(model.clusters.values())) == 3
+    grid = predicciones.build_forecast_grid(*predicciones.forecast_ids(sales), pd.Timestamp('2025-04-01'))
+    np.testing.assert_array_equal(model.predict(grid), serial.predict(grid))
@@ -0,0 +1,60 @@
+import io
+import json
+
+import pandas as pd
+import pytest
+
+import predicciones
+
+
+@pytest.fixture
+def model_frames(conn):
+    sales = predicciones.preprocess_sales_data(predicciones.get_sales_data(conn, 'WUSAP'))
+    frames = {
+        'sales': sales,
+        'inventory': predicciones.get_inventory(conn),
+        'products': predicciones.get_product_names(conn),
+        'stores': predicciones.get_store_names(conn),
+    }
+    return predicciones.train_model(sales), frames
+
+
+def sort_alerts(df):
+    return df.sort_values(['STOREID', 'PRODUCTID'], ignore_index=True)
+
+
+def test_product_blocks_yield_the_same_alerts(model_frames):
+    model, frames = model_frames
+    whole = predicciones.build_alerts(model, frames, chunk_rows=10 ** 6)
+    blocks = list(predicciones.iter_alerts(model, frames, chunk_rows=3 * 7))
+    assert len(blocks) > 1
+    pd.testing.assert_frame_equal(sort_alerts(pd.concat(blocks)), sort_alerts(whole))
+
+
+def test_filters_and_limit(model_frames):
+    model, frames = model_frames
+    whole = predicciones.build_alerts(model, frames)
+    filtered = predicciones.build_alerts(model, frames, stores=[2], products=[1, 2, 3, 4, 5, 6],
+                                         priorities=['Alta', 'Media'])
+    expected = whole[(whole['STOREID'] == 2) & whole['PRODUCTID'].between(1, 6)
+                     & whole['priority'].isin(['Alta', 'Media'])]
+    pd.testing.assert_frame_equal(sort_alerts(filtered), sort_alerts(expected))
+    assert len(predicciones.build_alerts(model, frames, chunk_rows=21, limit=4)) == 4
+
+
+def test_ndjson_carries_the_same_records_as_json(model_frames):
+    model, frames = model_frames
+    pretty, lines = io.StringIO(), io.StringIO()
+    predicciones.write_alerts(predicciones.alert_records(predicciones.iter_alerts(model, frames)), 'json', pretty)
+    predicciones.write_alerts(predicciones.alert_records(predicciones.iter_alerts(model, frames)), 'ndjson', lines)
+    assert [json.loads(line) for line in lines.getvalue().splitlines()] == json.loads(pretty.getvalue())['alerts']
+
+
+def test_request_overrides_cli_options():
+    args = predicciones.parse_args(['--store', '1', '--priority', 'Alta', '--limit', '10', '--horizon', '14'])
+    assert predicciones.alert_options(args) == {
+        'horizon': 14, 'chunk_rows': predicciones.FORECAST_CHUNK_ROWS, 'stores': [1], 'products': None,
+        'priorities': ['Alta'], 'top_n': None, 'limit': 10}
+    options = predicciones.alert_options(args, {'stores': 3, 'priorities': [], 'limit': None, 'top_n': '2'})
+    assert options['stores'] == [3] and options['priorities'] is None
+    assert options['limit'] is None and options['top_n'] == 2 and options['horizon'] == 14
@@ -0,0 +1,90 @@
+import io
+import json
+
+import predicciones
+
+
+def cli_args(standin, tmp_path, *extra):
+    return ['--sqlite', standin, '--model-path', str(tmp_path / 'model.joblib'), '--no-result-cache', *extra]
+
+
+def make_worker(standin, tmp_path, *extra):
+    args = predicciones.parse_args(['--sqlite', standin, '--model-path', str(tmp_path / 'model.joblib'),
+                                    '--serve', *extra])
+    db_config = {**predicciones.load_env(), 'sqlite': standin, 'schema': 'WUSAP'}
+    return predicciones.ForecastWorker(db_config, args)
+
+
+def serve_lines(worker, requests):
+    stdout = io.StringIO()
+    try:
+        predicciones.serve(worker, io.StringIO(''.join(json.dumps(r) + '\n' for r in requests)), stdout)
+    finally:
+        worker.close()
+    return [json.loads(line) for line in stdout.getvalue().splitlines()]
+
+
+def test_worker_round_trip_matches_cli(standin, tmp_path):
+    db_config = {**predicciones.load_env(), 'sqlite': standin, 'schema': 'WUSAP'}
+    pool = predicciones.get_connection_pool(db_config, 1)
+    out = io.StringIO()
+    try:
+        # Lo mismo que main escribe en stdout; entrena y guarda el modelo.
+        records = predicciones.run_alerts(pool, 'WUSAP', predicciones.parse_args(cli_args(standin, tmp_path)))
+        predicciones.write_alerts(records, 'json', out)
+    finally:
+        pool.close()
+    cli_alerts = json.loads(out.getvalue())['alerts']
+    assert cli_alerts
+
+    lines = serve_lines(make_worker(standin, tmp_path), [
+        {'id': 1, 'op': 'ping'},
+        {'id': 2, 'op': 'alerts'},
+        {'id': 3, 'op': 'alerts', 'stream': True, 'limit': 2},
+        {'id': 4, 'op': 'nope'},
+        {'id': 5, 'op': 'shutdown'},
+        {'id': 6, 'op': 'ping'},
+    ])
+    assert lines[0] == {'id': 1, 'success': True}
+    assert lines[1]['id'] == 2 and json.loads(json.dumps(lines[1]['alerts'], default=str)) == cli_alerts
+    assert [line['alert'] for line in lines[2:4]] == lines[1]['alerts'][:2]
+    assert lines[4] == {'id': 3, 'success': True, 'done': True, 'count': 2}
+    assert lines[5]['id'] == 4 and lines[5]['success'] is False
+    assert len(lines) == 6  # nada después de shutdown
+
+
+def test_requests_never_refresh_with_refresh_seconds_zero(standin, tmp_path, monkeypatch):
+    worker = make_worker(standin, tmp_path, '--refresh-seconds', '0')
+    try:
+        assert worker.handle({'op': 'refresh'}) == {'success': True}
+        frames = worker.frames
+        worker.loaded_at = -1e9
+
+        def fail(*args, **kwargs):
+            raise AssertionError("the request path re-extracted the frames")
+
+        monkeypatch.setattr(predicciones, 'load_args_frames', fail)
+        assert worker.handle({'op': 'alerts'})['success']
+        assert worker.frames is frames
+    finally:
+        worker.close()
+
+
+def test_stale_worker_does_not_cache_under_the_new_watermark(conn, standin, tmp_path):
+    cache_dir = tmp_path / 'results'
+    worker = make_worker(standin, tmp_path, '--refresh-seconds', '0', '--result-cache-dir', str(cache_dir))
+    try:
+        worker.handle({'op': 'refresh'})
+        first = worker.handle({'op': 'alerts'})['alerts']
+        assert len(list(cache_dir.iterdir())) == 1
+
+        conn.execute("UPDATE WUSAP.Inventory SET quantity = quantity + 1 WHERE inventoryID = 1")
+        conn.commit()
+        assert worker.handle({'op': 'alerts'})['alerts'] == first  # frames de antes, sin refrescar
+        assert len(list(cache_dir.iterdir())) == 1
+
+        worker.handle({'op': 'refresh'})
+        worker.handle({'op': 'alerts'})
+        assert len(list(cache_dir.iterdir())) == 2
+    finally:
+        worker.close()
@@ -798,23 +798,41 @@
  *       - bearerAuth: []
  *     parameters:
  *       - in: query
- *         name: productId
+ *         name: store
+ *         schema:
+ *           type: integer
+ *         description: Sólo alertas de esta tienda (se puede repetir)
+ *       - in: query
+ *         name: product
  *         schema:
  *           type: integer
- *         description: ID del producto para predicción específica
+ *         description: Sólo alertas de este producto (se puede repetir)
  *       - in: query
- *         name: days
+ *         name: priority
+ *         schema:
+ *           type: string
+ *           enum: ["Alta", "Media", "Baja"]
+ *         description: Sólo alertas con esta prioridad (se puede repetir)
+ *       - in: query
+ *         name: limit
  *         schema:
  *           type: integer
  *           minimum: 1
- *           maximum: 365
- *           default: 30
- *         description: Número de días para la predicción
+ *         description: Número máximo de alertas
  *       - in: query
- *         name: storeId
+ *         name: top_n
+ *         schema:
+ *           type: integer
+ *           minimum: 1
+ *         description: Sólo las N alertas más urgentes de cada tienda
+ *       - in: query
+ *         name: horizon
  *         schema:
  *           type: integer
- *         description: ID de la tienda (opcional, usa la del usuario si no se especifica)
+ *           minimum: 1
+ *           maximum: 365
+ *           default: 7
+ *         description: Número de días para la predicción
  *     responses:
  *       200:
  *         description: Predicciones obtenidas exitosamente
@@ -0,0 +1,128 @@
+"""Fixtures for the role navigation suites.
+
+Each worker (one per pytest-xdist process, or the only one without it) keeps
+a single Chrome and logs in through the form once per role. Every other test
+restores that session into a fresh page (AppShell.open). Per-test timings
+and the page-load report are collected on the controller, so
+``pytest -n 4`` writes one report for all workers.
+"""
+import os
+import json
+
+import pytest
+from selenium import webdriver
+
+from pages import AppShell, LoginPage, base_url, capture_session
+from perf import PerfReport, load_budgets
+
+
+def pytest_addoption(parser):
+    parser.addoption("--base-url", help="Frontend to test (default: WUSAP_BASE_URL or the Vite dev server).")
+    parser.addoption("--budgets", help="Per-route budgets JSON (default: budgets.json).")
+    parser.addoption("--perf-report", default=os.getenv("WUSAP_PERF_REPORT", "perf-report.json"),
+                     help="Where to write the page-load report.")
+    parser.addoption("--timings-file", help="Also write the per-test timings as JSON here.")
+    parser.addoption("--headed", action="store_true", help="Show the browser window.")
+
+
+def is_worker(config):
+    return hasattr(config, "workerinput")
+
+
+class SuiteTimings:
+    """Setup + call + teardown time of every test, with the worker that ran it."""
+
+    def __init__(self, config):
+        self.config = config
+        self.tests = {}
+
+    def pytest_runtest_logreport(self, report):
+        node = getattr(report, "node", None)
+        entry = self.tests.setdefault(report.nodeid, {"seconds": 0.0, "outcome": "passed",
+                                                       "worker": node.gateway.id if node else "main"})
+        entry["seconds"] += report.duration
+        if report.failed or (report.when == "call" and report.skipped):
+            entry["outcome"] = report.outcome
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if not self.tests:
+            return
+        terminalreporter.section("test timings")
+        for nodeid, entry in sorted(self.tests.items(), key=lambda item: -item[1]["seconds"]):
+            terminalreporter.write_line(f"{entry['seconds']:8.2f}s {entry['worker']:<5} {entry['outcome']:<7} {nodeid}")
+        total = sum(entry["seconds"] for entry in self.tests.values())
+        terminalreporter.write_line(f"{total:8.2f}s summed over {len(self.tests)} tests")
+        path = self.config.getoption("--timings-file")
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({nodeid: {**entry, "seconds": round(entry["seconds"], 3)}
+                           for nodeid, entry in self.tests.items()}, f, indent=2)
+                f.write("\n")
+
+
+def pytest_configure(config):
+    config.perf_routes = {}
+    if not is_worker(config):
+        config.pluginmanager.register(SuiteTimings(config), "suite-timings")
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    # Controller de xdist: juntar las rutas medidas por cada worker.
+    node.config.perf_routes.update(json.loads(node.workeroutput.get("perf_routes", "{}")))
+
+
+def pytest_sessionfinish(session):
+    config = session.config
+    if is_worker(config):
+        config.workeroutput["perf_routes"] = json.dumps(config.perf_routes)
+    elif config.perf_routes:
+        report = PerfReport(base_url(config.getoption("--base-url")), {}, routes=config.perf_routes)
+        report.write(config.getoption("--perf-report"))
+
+
+@pytest.fixture(scope="session")
+def base(pytestconfig):
+    return base_url(pytestconfig.getoption("--base-url"))
+
+
+@pytest.fixture(scope="session")
+def perf_report(pytestconfig, base):
+    return PerfReport(base, load_budgets(pytestconfig.getoption("--budgets")), routes=pytestconfig.perf_routes)
+
+
+@pytest.fixture(scope="session")
+def driver(pytestconfig):
+    options = webdriver.ChromeOptions()
+    if not pytestconfig.getoption("--headed"):
+        options.add_argument("--headless=new")
+    options.add_argument("--window-size=1920,1080")
+    driver = webdriver.Chrome(options=options)
+    yield driver
+    driver.quit()
+
+
+@pytest.fixture
+def login_page(driver, base):
+    return LoginPage(driver, base)
+
+
+@pytest.fixture(scope="session")
+def sessions(driver, base):
+    """Stored login per role, filled the first time a worker needs it."""
+    cache = {}
+
+    def get(role):
+        if role not in cache:
+            LoginPage(driver, base).login(role)
+            cache[role] = capture_session(driver)
+        return cache[role]
+    return get
+
+
+@pytest.fixture
+def app(driver, base, sessions):
+    """Open a fresh page already logged in: ``app(role, path)`` returns its AppShell."""
+    def open_page(role, path):
+        return AppShell(driver, base).open(path, sessions(role))
+    return open_page
@@ -0,0 +1,102 @@
+"""Page objects shared by the role navigation suites.
+
+The base URL comes from ``--base-url`` or ``WUSAP_BASE_URL`` (default: the
+Vite dev server), so the same suites run against a local build or a deployment.
+"""
+import os
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+
+DEFAULT_BASE_URL = "http://localhost:5173"
+PASSWORD = os.getenv("WUSAP_TEST_PASSWORD", "WUSAP123")
+
+# What authService.login leaves in localStorage; restoring it skips the form.
+SESSION_KEYS = ("token", "user")
+
+# Landing page of each role after login (getDefaultPageForRole in src/config/rolePermissions.js).
+ROLES = {
+    "admin": {"email": "admin@wusap.com", "landing": "/admin"},
+    "store_manager": {"email": "store_manager@wusap.com", "landing": "/tablero"},
+    "warehouse_manager": {"email": "warehouse_manager@wusap.com", "landing": "/warehouse"},
+}
+
+
+def base_url(value=None):
+    return (value or os.getenv("WUSAP_BASE_URL") or DEFAULT_BASE_URL).rstrip("/")
+
+
+class Page:
+    def __init__(self, driver, base, timeout=10):
+        self.driver = driver
+        self.base = base
+        self.timeout = timeout
+
+    def url(self, path="/"):
+        return self.base + path
+
+    def wait(self, condition, timeout=None):
+        return WebDriverWait(self.driver, timeout or self.timeout).until(condition)
+
+    def wait_for_path(self, path):
+        self.wait(EC.url_contains(path))
+        return self.driver.current_url
+
+
+class LoginPage(Page):
+    def open(self):
+        self.driver.get(self.url("/"))
+        self.wait(EC.presence_of_element_located((By.NAME, "email")))
+        return self
+
+    def login(self, role):
+        """Submit the form as ``role`` and return the app shell once it lands."""
+        self.open()
+        self.driver.find_element(By.NAME, "email").send_keys(ROLES[role]["email"])
+        self.driver.find_element(By.NAME, "password").send_keys(PASSWORD)
+        self.driver.find_element(By.TAG_NAME, "form").submit()
+        self.wait_for_path(ROLES[role]["landing"])
+        return AppShell(self.driver, self.base, self.timeout)
+
+
+def capture_session(driver):
+    """The logged-in session of the current page (localStorage items)."""
+    return {key: driver.execute_script("return window.localStorage.getItem(arguments[0]);", key)
+            for key in SESSION_KEYS}
+
+
+class AppShell(Page):
+    """Any authenticated page: the navbar with its sidebar menu."""
+
+    MENU_ITEMS = (By.CSS_SELECTOR, ".nav-menu .nav-item")
+
+    def open(self, path, session=None):
+        """Load ``path`` in a fresh page, first restoring ``session`` on the app's origin."""
+        if session is not None:
+            self.driver.get(self.url("/"))
+            self.driver.execute_script(
+                "window.localStorage.clear();"
+                "for (const [k, v] of Object.entries(arguments[0])) window.localStorage.setItem(k, v);",
+                {k: v for k, v in session.items() if v is not None})
+        self.driver.get(self.url(path))
+        self.wait_for_path(path)
+        self.wait(EC.element_to_be_clickable((By.CLASS_NAME, "menu-button")))
+        return self
+
+    def open_sidebar(self):
+        self.driver.find_element(By.CLASS_NAME, "menu-button").click()
+        self.wait(EC.visibility_of_element_located((By.CLASS_NAME, "sidebar")))
+
+    def menu_labels(self):
+        return [item.text.strip() for item in self.driver.find_elements(*self.MENU_ITEMS)]
+
+    def go_to(self, label, path):
+        """Click the sidebar option ``label`` and wait until the URL contains ``path``."""
+        self.open_sidebar()
+        self.wait(EC.visibility_of_element_located(self.MENU_ITEMS))
+        for item in self.driver.find_elements(*self.MENU_ITEMS):
+            if item.text.strip() == label:
+                item.click()
+                return self.wait_for_path(path)
+        raise AssertionError(f"Menu option '{label}' not found; available: {self.menu_labels()}")
@@ -0,0 +1,155 @@
+"""Page-load timings for the navigation suites, per-route budgets and reports.
+
+Each route is loaded with a full navigation, so the browser records a fresh
+Navigation Timing entry for it. Once the page has no more API calls (no new
+fetch/XHR Resource Timing entries for ``QUIET_MS``), we read:
+
+    ttfb_ms                time to the first byte of the document
+    dom_content_loaded_ms  end of DOMContentLoaded
+    load_ms                end of the load event
+    api_max_ms             slowest fetch/XHR call
+    settled_ms             end of the last fetch/XHR call (data on screen)
+
+All of them are measured from navigation start. Budgets live in budgets.json: ``default`` plus
+overrides per route path. The report is JSON; compare two builds with
+
+    python perf.py base.json new.json --tolerance 0.2
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import datetime
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BUDGETS_PATH = os.path.join(HERE, "budgets.json")
+METRICS = ["ttfb_ms", "dom_content_loaded_ms", "load_ms", "api_max_ms", "settled_ms"]
+QUIET_MS = 500
+
+TIMINGS_JS = """
+const nav = performance.getEntriesByType('navigation')[0];
+const api = performance.getEntriesByType('resource')
+  .filter(e => e.initiatorType === 'fetch' || e.initiatorType === 'xmlhttprequest')
+  .map(e => ({name: e.name, start: e.startTime, duration: e.duration, end: e.responseEnd}));
+return {nav: nav ? nav.toJSON() : null, api: api, ready: document.readyState};
+"""
+
+
+def wait_until_settled(driver, timeout=30, quiet_ms=QUIET_MS):
+    """Raw timings once the document is loaded and the API calls have stopped."""
+    deadline = time.monotonic() + timeout
+    last_count, quiet_since = -1, time.monotonic()
+    while True:
+        timings = driver.execute_script(TIMINGS_JS)
+        now = time.monotonic()
+        if len(timings["api"]) != last_count:
+            last_count, quiet_since = len(timings["api"]), now
+        if timings["ready"] == "complete" and timings["nav"] and timings["nav"]["loadEventEnd"] > 0 \
+                and (now - quiet_since) * 1000 >= quiet_ms:
+            return timings
+        if now > deadline:
+            raise TimeoutError(f"{driver.current_url} did not settle within {timeout}s")
+        time.sleep(0.1)
+
+
+def summarize(timings):
+    nav = timings["nav"]
+    api = timings["api"]
+    return {
+        "ttfb_ms": round(nav["responseStart"], 1),
+        "dom_content_loaded_ms": round(nav["domContentLoadedEventEnd"], 1),
+        "load_ms": round(nav["loadEventEnd"], 1),
+        "api_max_ms": round(max((call["duration"] for call in api), default=0), 1),
+        "settled_ms": round(max([nav["loadEventEnd"]] + [call["end"] for call in api]), 1),
+        "api_calls": [{"url": call["name"], "duration_ms": round(call["duration"], 1)} for call in api],
+    }
+
+
+def measure(driver, url, timeout=30):
+    """Load ``url`` from scratch and return its timings."""
+    driver.get(url)
+    return summarize(wait_until_settled(driver, timeout))
+
+
+def load_budgets(path=None):
+    with open(path or BUDGETS_PATH, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def budget_for(budgets, path):
+    return {**budgets["default"], **budgets.get("routes", {}).get(path, {})}
+
+
+def violations(metrics, budget):
+    return [f"{name} {metrics[name]:.0f} ms > {budget[name]:.0f} ms"
+            for name in METRICS if name in budget and metrics[name] > budget[name]]
+
+
+class PerfReport:
+    """Route results of one run, written as JSON at the end of the session."""
+
+    def __init__(self, base_url, budgets, build=None, routes=None):
+        self.base_url = base_url
+        self.budgets = budgets
+        self.build = build or os.getenv("WUSAP_BUILD")
+        self.routes = {} if routes is None else routes
+
+    def check(self, driver, role, path, timeout=30):
+        """Measure ``path`` as ``role``, record it and return its budget violations."""
+        metrics = measure(driver, self.base_url + path, timeout)
+        budget = budget_for(self.budgets, path)
+        failed = violations(metrics, budget)
+        self.routes[f"{role} {path}"] = {**metrics, "budget": budget, "violations": failed}
+        return failed
+
+    def to_dict(self):
+        return {
+            "base_url": self.base_url,
+            "build": self.build,
+            "created": datetime.datetime.now().isoformat(timespec="seconds"),
+            "routes": dict(sorted(self.routes.items())),
+        }
+
+    def write(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+            f.write("\n")
+
+
+def compare(base, new, tolerance=0.2, min_delta_ms=50):
+    """Rows of (route, metric, base, new, regressed) for the routes in both reports."""
+    rows = []
+    for route in sorted(set(base["routes"]) & set(new["routes"])):
+        for name in METRICS:
+            old, cur = base["routes"][route][name], new["routes"][route][name]
+            regressed = cur - old > max(min_delta_ms, old * tolerance)
+            rows.append((route, name, old, cur, regressed))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare two page-load reports of the navigation suites.")
+    parser.add_argument("base")
+    parser.add_argument("new")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Relative increase that counts as a regression.")
+    parser.add_argument("--min-delta-ms", type=float, default=50,
+                        help="Ignore increases smaller than this (timer noise).")
+    args = parser.parse_args(argv)
+    reports = []
+    for path in (args.base, args.new):
+        with open(path, encoding="utf-8") as f:
+            reports.append(json.load(f))
+
+    rows = compare(reports[0], reports[1], args.tolerance, args.min_delta_ms)
+    for route, name, old, cur, regressed in rows:
+        flag = "REGRESSION" if regressed else ""
+        print(f"{route:<40} {name:<22} {old:>9.1f} {cur:>9.1f} {cur - old:>+9.1f} {flag}")
+    regressions = sum(row[4] for row in rows)
+    print(f"{regressions} regressions in {len(rows)} metrics.", file=sys.stderr)
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()